@@ -2,6 +2,8 @@ from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import reviews, smart_recommendations, menu_api, menu_parser_api, menu_parsing, users, places, behavioral_tracking
 from app.require_user import require_user
+from app.services.google_client import google_api
+from app.services.ttl_cache import cache_stats
 from dotenv import load_dotenv
 import os
 import logging
@@ -42,6 +44,20 @@ async def startup_event():
     logger.info("GOOGLE_GEMINI_API_KEY: %s", "set" if os.getenv("GOOGLE_GEMINI_API_KEY") else "NOT SET")
     logger.info("Binding to host 0.0.0.0 on port %s", port)
     logger.info("=" * 50)
+    google_api.start()
+    if behavioral_tracking.view_buffer is not None:
+        behavioral_tracking.view_buffer.start()
+    if behavioral_tracking.feedback_worker is not None:
+        behavioral_tracking.feedback_worker.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered tracking rows and stop background workers before the process exits"""
+    if behavioral_tracking.view_buffer is not None:
+        behavioral_tracking.view_buffer.close()
+    if behavioral_tracking.feedback_worker is not None:
+        behavioral_tracking.feedback_worker.stop()
+    google_api.close()
 
 _DEFAULT_ORIGINS = [
     "http://localhost:19006",
@@ -63,6 +79,11 @@ _is_dev = api_env == "dev"
 def health():
     return {"ok": True}
 
+@app.get("/health/caches")
+def health_caches():
+    """Hit rate, size and evictions for every named in-process cache"""
+    return cache_stats()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"] if _is_dev else ALLOWED_ORIGINS,
@@ -1,4 +1,5 @@
 # app/require_user.py
+import hmac
 import os
 import logging
 from fastapi import Header, HTTPException
@@ -8,6 +9,8 @@ logger = logging.getLogger(__name__)
 
 JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "")
 DEV = (os.getenv("API_ENV") or "prod").lower() == "dev"
+# Shared secret for operator-only endpoints; they are disabled while unset
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
 
 logger.info("[auth] Supabase JWT validator configured (dev=%s)", DEV)
 
@@ -40,3 +43,12 @@ async def require_user(authorization: str = Header(None)):
             logger.warning("Dev mode: Falling back to dev-user")
             return {"sub": "dev-user", "email": "dev@example.com"}
         raise HTTPException(status_code=401, detail="Invalid token")
+
+
+async def require_admin(x_admin_token: str = Header(None)):
+    """Operator/service callers only: X-Admin-Token must match ADMIN_API_TOKEN."""
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    return {"sub": "admin"}
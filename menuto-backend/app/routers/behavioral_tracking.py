@@ -8,6 +8,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional, List
 from pydantic import BaseModel
 from app.require_user import require_user
+from app.services.dish_stats import DishStats, get_dish_stats as fetch_dish_stats
+from app.services.event_buffer import WriteBehindBuffer
+from app.services.feedback_analysis import FeedbackAnalysisWorker
+from app.services.recommendation_cache import invalidate_user_recommendations
+from app.services.ttl_cache import TTLCache
 from supabase import create_client, Client
 import logging
 import json
@@ -22,6 +27,42 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
 sb: Client | None = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
 
+# Views are fire-and-forget: queue them and bulk-insert in the background.
+# Started/stopped by app.main's startup/shutdown hooks.
+view_buffer: WriteBehindBuffer | None = WriteBehindBuffer(
+    "dish_views",
+    writer=lambda rows: sb.table("dish_views").insert(rows).execute(),
+    batch_size=int(os.getenv("VIEW_BUFFER_BATCH_SIZE", "100")),
+    flush_interval_s=float(os.getenv("VIEW_BUFFER_FLUSH_SECONDS", "2")),
+    # Stats caches are dropped once the views are actually stored, not when queued
+    on_written=lambda rows: _invalidate_dish_caches(
+        {r["dish_id"] for r in rows}, {r["restaurant_place_id"] for r in rows},
+    ),
+) if sb else None
+
+# Taste-signal extraction for rating feedback runs off the request path.
+feedback_worker: FeedbackAnalysisWorker | None = FeedbackAnalysisWorker(sb) if sb else None
+
+# Read-side caches for the stats endpoints; /track/* handlers invalidate them.
+_dish_stats_cache = TTLCache(
+    maxsize=2048,
+    ttl_seconds=float(os.getenv("DISH_STATS_CACHE_TTL_SECONDS", "30")),
+    name="dish_stats",
+)
+_popular_dishes_cache = TTLCache(
+    maxsize=512,
+    ttl_seconds=float(os.getenv("POPULAR_DISHES_CACHE_TTL_SECONDS", "60")),
+    name="popular_dishes",
+)
+
+
+def _invalidate_dish_caches(dish_ids, restaurant_place_ids) -> None:
+    for dish_id in dish_ids:
+        _dish_stats_cache.discard(dish_id)
+    places = set(restaurant_place_ids)
+    if places:
+        _popular_dishes_cache.discard_where(lambda key: key[0] in places)
+
 
 def _get_supabase() -> Client:
     """Get Supabase client or raise if not configured."""
@@ -30,6 +71,39 @@ def _get_supabase() -> Client:
     return sb
 
 
+def _parse_dish_id(dish_id: str) -> int:
+    try:
+        return int(dish_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="dish_id must be a valid integer")
+
+
+def _order_row(user_id: str, dish_id: int, restaurant_place_id: str,
+               hunger_level: Optional[int] = None, cravings: Optional[List[str]] = None) -> dict:
+    row = {
+        "user_id": user_id,
+        "dish_id": dish_id,
+        "restaurant_place_id": restaurant_place_id,
+    }
+    if hunger_level is not None:
+        row["hunger_level"] = hunger_level
+    if cravings is not None:
+        row["cravings"] = json.dumps(cravings)
+    return row
+
+
+def _view_row(user_id: str, dish_id: int, restaurant_place_id: str,
+              view_duration_seconds: Optional[int] = None) -> dict:
+    row = {
+        "user_id": user_id,
+        "dish_id": dish_id,
+        "restaurant_place_id": restaurant_place_id,
+    }
+    if view_duration_seconds is not None:
+        row["view_duration_seconds"] = view_duration_seconds
+    return row
+
+
 class TrackOrderRequest(BaseModel):
     dish_id: str  # Will be converted to BigInteger
     restaurant_place_id: str
@@ -59,6 +133,23 @@ class TrackFavoriteRequest(BaseModel):
     action: str  # "add" or "remove"
 
 
+class TrackBatchEvent(BaseModel):
+    type: str  # "view", "order" or "favorite"
+    dish_id: str
+    restaurant_place_id: str
+    hunger_level: Optional[int] = None  # order
+    cravings: Optional[List[str]] = None  # order
+    view_duration_seconds: Optional[int] = None  # view
+    action: Optional[str] = None  # favorite: "add" or "remove"
+
+
+class TrackBatchRequest(BaseModel):
+    events: List[TrackBatchEvent]
+
+
+MAX_BATCH_EVENTS = 200
+
+
 @router.post("/track/order")
 async def track_dish_order(
     request: TrackOrderRequest,
@@ -71,20 +162,10 @@ async def track_dish_order(
     user_id = user.get("sub")
     supabase = _get_supabase()
 
-    try:
-        dish_id_int = int(request.dish_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="dish_id must be a valid integer")
-
-    row = {
-        "user_id": user_id,
-        "dish_id": dish_id_int,
-        "restaurant_place_id": request.restaurant_place_id,
-    }
-    if request.hunger_level is not None:
-        row["hunger_level"] = request.hunger_level
-    if request.cravings is not None:
-        row["cravings"] = json.dumps(request.cravings)
+    row = _order_row(
+        user_id, _parse_dish_id(request.dish_id), request.restaurant_place_id,
+        hunger_level=request.hunger_level, cravings=request.cravings,
+    )
 
     try:
         supabase.table("dish_orders").insert(row).execute()
@@ -92,6 +173,8 @@ async def track_dish_order(
         logger.error("Failed to track order: %s", e)
         raise HTTPException(status_code=500, detail="Failed to track order")
 
+    invalidate_user_recommendations(user_id)
+    _invalidate_dish_caches([row["dish_id"]], [row["restaurant_place_id"]])
     logger.info("Tracked order: user=%s, dish=%s", user_id, request.dish_id)
     return {"status": "tracked", "type": "order"}
 
@@ -104,28 +187,27 @@ async def track_dish_view(
     """
     Track when a user views a dish detail page.
     Call this when user opens dish details or spends time viewing.
+    The row is queued and bulk-inserted in the background (see view_buffer).
+    Views don't invalidate the user's cached recommendations: impressions are
+    too frequent, and the cache TTL bounds how stale view counts can get.
     """
     user_id = user.get("sub")
     supabase = _get_supabase()
 
-    try:
-        dish_id_int = int(request.dish_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="dish_id must be a valid integer")
-
-    row = {
-        "user_id": user_id,
-        "dish_id": dish_id_int,
-        "restaurant_place_id": request.restaurant_place_id,
-    }
-    if request.view_duration_seconds is not None:
-        row["view_duration_seconds"] = request.view_duration_seconds
+    row = _view_row(
+        user_id, _parse_dish_id(request.dish_id), request.restaurant_place_id,
+        view_duration_seconds=request.view_duration_seconds,
+    )
 
-    try:
-        supabase.table("dish_views").insert(row).execute()
-    except Exception as e:
-        logger.error("Failed to track view: %s", e)
-        raise HTTPException(status_code=500, detail="Failed to track view")
+    if view_buffer is not None:
+        view_buffer.add(row)
+    else:
+        try:
+            supabase.table("dish_views").insert(row).execute()
+        except Exception as e:
+            logger.error("Failed to track view: %s", e)
+            raise HTTPException(status_code=500, detail="Failed to track view")
+        _invalidate_dish_caches([row["dish_id"]], [row["restaurant_place_id"]])
 
     return {"status": "tracked", "type": "view"}
 
@@ -139,8 +221,9 @@ async def track_dish_rating(
     Track user rating after eating.
     Call this in your PostMealFeedback screen.
 
-    If feedback_text is provided, Gemini extracts taste signals (liked/disliked
-    keywords, spice/portion feedback) and stores them for future recommendations.
+    If feedback_text is provided, the rating is queued for Gemini analysis:
+    FeedbackAnalysisWorker extracts taste signals (liked/disliked keywords,
+    spice/portion feedback) in the background and stores them on the row.
 
     If recommendation_scores is provided (the component breakdown from when the
     dish was recommended), Thompson Sampling weight priors are updated so the
@@ -165,6 +248,9 @@ async def track_dish_rating(
     }
     if request.feedback_text is not None:
         row["feedback_text"] = request.feedback_text
+    analysis_queued = bool(request.feedback_text and request.feedback_text.strip())
+    if analysis_queued:
+        row["taste_signals_status"] = "pending"
     if request.would_order_again is not None:
         row["would_order_again"] = request.would_order_again
     if request.hunger_level_when_ordered is not None:
@@ -173,68 +259,18 @@ async def track_dish_rating(
         row["recommendation_scores"] = json.dumps(request.recommendation_scores)
 
     try:
-        result = supabase.table("dish_ratings").insert(row).execute()
-        rating_id = result.data[0]["id"] if result.data else None
+        supabase.table("dish_ratings").insert(row).execute()
     except Exception as e:
         logger.error("Failed to track rating: %s", e)
         raise HTTPException(status_code=500, detail="Failed to track rating")
 
+    invalidate_user_recommendations(user_id)
+    _invalidate_dish_caches([dish_id_int], [request.restaurant_place_id])
     logger.info("Tracked rating: user=%s, dish=%s, rating=%s", user_id, request.dish_id, request.rating)
 
-    # ---- Semantic feedback analysis with Gemini ----
-    taste_signals = None
-    if request.feedback_text and request.feedback_text.strip() and rating_id:
-        try:
-            # Look up dish name for the prompt
-            dish_name = request.dish_id  # fallback
-            try:
-                dish_result = supabase.table("parsed_dishes").select("name").eq("id", dish_id_int).maybe_single().execute()
-                if dish_result.data and dish_result.data.get("name"):
-                    dish_name = dish_result.data["name"]
-            except Exception:
-                pass
-
-            api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
-            if api_key:
-                from google import genai
-
-                client = genai.Client(api_key=api_key)
-                prompt = f"""Analyze this restaurant dish feedback and extract taste signals.
-
-Dish: {dish_name}
-Rating: {request.rating}/5
-Feedback: "{request.feedback_text}"
-
-Return JSON:
-{{
-    "liked": ["specific things they liked, e.g. creamy texture, fresh basil"],
-    "disliked": ["specific things they disliked, e.g. too salty, overcooked"],
-    "spice_feedback": "perfect" | "too_mild" | "too_hot" | null,
-    "portion_feedback": "too_small" | "just_right" | "too_large" | null,
-    "flavor_keywords": ["rich", "tangy", "smoky"],
-    "would_recommend_to": ["spice_lovers", "comfort_food_fans"]
-}}
-
-Only include fields with actual information from the feedback. Return ONLY JSON."""
-
-                response = client.models.generate_content(
-                    model='gemini-2.5-flash',
-                    contents=prompt,
-                    config=genai.types.GenerateContentConfig(
-                        temperature=0.1,
-                        response_mime_type="application/json",
-                    ),
-                )
-                taste_signals = json.loads(response.text)
-
-                # Update the rating record with analyzed signals
-                supabase.table("dish_ratings").update({
-                    "taste_signals": json.dumps(taste_signals),
-                }).eq("id", rating_id).execute()
-
-                logger.info("Analyzed feedback for dish %s: %s", dish_name, taste_signals)
-        except Exception as e:
-            logger.warning("Feedback analysis failed (non-blocking): %s", e)
+    # ---- Semantic feedback analysis: queued, done by feedback_worker ----
+    if analysis_queued and feedback_worker is not None:
+        feedback_worker.notify()
 
     # ---- Thompson Sampling weight update ----
     if request.recommendation_scores and user_id:
@@ -255,7 +291,8 @@ Only include fields with actual information from the feedback. Return ONLY JSON.
     return {
         "status": "tracked",
         "type": "rating",
-        "taste_signals_extracted": taste_signals is not None,
+        "taste_signals_extracted": False,
+        "taste_signals_status": "pending" if analysis_queued else None,
     }
 
 
@@ -296,6 +333,7 @@ async def track_dish_favorite(
             }
             try:
                 supabase.table("dish_favorites").insert(row).execute()
+                invalidate_user_recommendations(user_id)
                 logger.info("Added favorite: user=%s, dish=%s", user_id, request.dish_id)
             except Exception as e:
                 logger.error("Failed to add favorite: %s", e)
@@ -319,6 +357,7 @@ async def track_dish_favorite(
                     .update({"removed_at": datetime.utcnow().isoformat()}) \
                     .eq("id", fav_id) \
                     .execute()
+                invalidate_user_recommendations(user_id)
                 logger.info("Removed favorite: user=%s, dish=%s", user_id, request.dish_id)
         except Exception as e:
             logger.error("Failed to remove favorite: %s", e)
@@ -327,6 +366,110 @@ async def track_dish_favorite(
         return {"status": "tracked", "action": "removed"}
 
 
+@router.post("/track/batch")
+async def track_batch(
+    request: TrackBatchRequest,
+    user: dict = Depends(require_user),
+):
+    """
+    Track many view/order/favorite events in one request.
+    The whole batch is validated first (any bad event rejects the batch), then
+    written with one bulk insert per table. Ratings stay on /track/rating since
+    each one triggers feedback analysis.
+    """
+    user_id = user.get("sub")
+
+    if len(request.events) > MAX_BATCH_EVENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_EVENTS} events per batch")
+
+    order_rows: List[dict] = []
+    view_rows: List[dict] = []
+    favorite_actions: dict = {}  # dish_id -> (action, restaurant_place_id); last event wins
+
+    for i, event in enumerate(request.events):
+        try:
+            dish_id_int = int(event.dish_id)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail=f"events[{i}]: dish_id must be a valid integer")
+
+        if event.type == "order":
+            order_rows.append(_order_row(
+                user_id, dish_id_int, event.restaurant_place_id,
+                hunger_level=event.hunger_level, cravings=event.cravings,
+            ))
+        elif event.type == "view":
+            view_rows.append(_view_row(
+                user_id, dish_id_int, event.restaurant_place_id,
+                view_duration_seconds=event.view_duration_seconds,
+            ))
+        elif event.type == "favorite":
+            if event.action not in ["add", "remove"]:
+                raise HTTPException(status_code=400, detail=f"events[{i}]: action must be 'add' or 'remove'")
+            favorite_actions[dish_id_int] = (event.action, event.restaurant_place_id)
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"events[{i}]: type must be 'view', 'order' or 'favorite'",
+            )
+
+    if not (order_rows or view_rows or favorite_actions):
+        return {"status": "tracked", "orders": 0, "views": 0, "favorites": 0}
+
+    supabase = _get_supabase()
+
+    try:
+        if order_rows:
+            supabase.table("dish_orders").insert(order_rows).execute()
+        if view_rows:
+            supabase.table("dish_views").insert(view_rows).execute()
+
+        if favorite_actions:
+            existing = supabase.table("dish_favorites") \
+                .select("dish_id") \
+                .eq("user_id", user_id) \
+                .in_("dish_id", list(favorite_actions)) \
+                .is_("removed_at", "null") \
+                .execute()
+            active = {r["dish_id"] for r in (existing.data or [])}
+
+            favorite_rows = [
+                {"user_id": user_id, "dish_id": dish_id, "restaurant_place_id": place_id}
+                for dish_id, (action, place_id) in favorite_actions.items()
+                if action == "add" and dish_id not in active
+            ]
+            removed_ids = [
+                dish_id for dish_id, (action, _) in favorite_actions.items()
+                if action == "remove" and dish_id in active
+            ]
+            if favorite_rows:
+                supabase.table("dish_favorites").insert(favorite_rows).execute()
+            if removed_ids:
+                supabase.table("dish_favorites") \
+                    .update({"removed_at": datetime.utcnow().isoformat()}) \
+                    .eq("user_id", user_id) \
+                    .in_("dish_id", removed_ids) \
+                    .is_("removed_at", "null") \
+                    .execute()
+    except Exception as e:
+        logger.error("Failed to track event batch: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to track events")
+
+    if order_rows or favorite_actions:  # views alone don't (see track_dish_view)
+        invalidate_user_recommendations(user_id)
+    counted = order_rows + view_rows
+    _invalidate_dish_caches({r["dish_id"] for r in counted}, {r["restaurant_place_id"] for r in counted})
+    logger.info(
+        "Tracked batch: user=%s, orders=%d, views=%d, favorites=%d",
+        user_id, len(order_rows), len(view_rows), len(favorite_actions),
+    )
+    return {
+        "status": "tracked",
+        "orders": len(order_rows),
+        "views": len(view_rows),
+        "favorites": len(favorite_actions),
+    }
+
+
 @router.get("/dish/{dish_id}/stats")
 async def get_dish_stats(dish_id: str):
     """
@@ -340,58 +483,37 @@ async def get_dish_stats(dish_id: str):
     except ValueError:
         raise HTTPException(status_code=400, detail="dish_id must be a valid integer")
 
-    try:
-        # Order count
-        orders = supabase.table("dish_orders") \
-            .select("id", count="exact") \
-            .eq("dish_id", dish_id_int) \
-            .execute()
-        order_count = orders.count if orders.count is not None else 0
-
-        # View count
-        views = supabase.table("dish_views") \
-            .select("id", count="exact") \
-            .eq("dish_id", dish_id_int) \
-            .execute()
-        view_count = views.count if views.count is not None else 0
-
-        # Rating stats
-        ratings = supabase.table("dish_ratings") \
-            .select("rating") \
-            .eq("dish_id", dish_id_int) \
-            .execute()
-        rating_values = [r["rating"] for r in (ratings.data or [])]
-        rating_count = len(rating_values)
-        avg_rating = sum(rating_values) / rating_count if rating_count > 0 else 0.0
-
-        # Recent orders (last 30 days)
-        thirty_days_ago = (datetime.utcnow() - timedelta(days=30)).isoformat()
-        recent_orders = supabase.table("dish_orders") \
-            .select("id", count="exact") \
-            .eq("dish_id", dish_id_int) \
-            .gte("ordered_at", thirty_days_ago) \
-            .execute()
-        recent_order_count = recent_orders.count if recent_orders.count is not None else 0
+    cached = _dish_stats_cache.get(dish_id_int)
+    if cached is not None:
+        return cached
 
+    try:
+        stats = fetch_dish_stats(supabase, dish_id_int)
     except Exception as e:
         logger.error("Failed to get dish stats for %s: %s", dish_id, e)
         raise HTTPException(status_code=500, detail="Failed to get dish stats")
 
-    return {
+    response = {
         "dish_id": dish_id,
-        "order_count": order_count,
-        "view_count": view_count,
-        "avg_rating": round(avg_rating, 2),
-        "rating_count": rating_count,
-        "recent_order_count": recent_order_count,
-        "is_trending": recent_order_count > order_count * 0.5 if order_count > 0 else False,
+        "order_count": stats.order_count,
+        "view_count": stats.view_count,
+        "avg_rating": round(stats.avg_rating, 2),
+        "rating_count": stats.rating_count,
+        "recent_order_count": stats.recent_order_count,
+        "is_trending": stats.is_trending,
+        "orders_last_7_days": stats.orders_last_7_days(),
+        "trend_slope": round(stats.buckets.slope(14), 3),
+        "trend_score": round(stats.trend_score(), 3),
     }
+    _dish_stats_cache.set(dish_id_int, response)
+    return response
 
 
 @router.get("/restaurant/{restaurant_place_id}/popular-dishes")
 async def get_popular_dishes(
     restaurant_place_id: str,
     limit: int = 10,
+    offset: int = 0,
 ):
     """
     Get popular dishes for a restaurant, sorted by popularity score.
@@ -402,127 +524,65 @@ async def get_popular_dishes(
     - View count (interest signal, weight: 0.3)
     - Recent orders boost (trending, weight: 0.2)
 
-    Returns dishes sorted by popularity score (highest first).
+    Scores are computed in Postgres (dish_popularity view, migration 010);
+    page with limit/offset. Returns dishes sorted by popularity score (highest first).
     """
+    if limit < 1 or limit > 100 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be 1-100 and offset >= 0")
+
+    cache_key = (restaurant_place_id, limit, offset)
+    cached = _popular_dishes_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     supabase = _get_supabase()
 
     try:
-        # Get menus for this restaurant
-        menus_resp = supabase.table("parsed_menus") \
-            .select("id") \
+        page = supabase.table("dish_popularity") \
+            .select(
+                "dish_id, name, description, category, price, order_count, view_count, "
+                "avg_rating, rating_count, recent_order_boost, popularity_score, "
+                "order_buckets, buckets_day",
+                count="exact",
+            ) \
             .eq("place_id", restaurant_place_id) \
+            .order("popularity_score", desc=True) \
+            .order("dish_id") \
+            .range(offset, offset + limit - 1) \
             .execute()
 
-        if not menus_resp.data:
-            return {
-                "restaurant_place_id": restaurant_place_id,
-                "popular_dishes": [],
-                "total_dishes": 0,
-            }
-
-        menu_ids = [m["id"] for m in menus_resp.data]
-
-        # Get all dishes for these menus
-        dishes_resp = supabase.table("parsed_dishes") \
-            .select("id, name, description, category, price") \
-            .in_("menu_id", menu_ids) \
-            .execute()
-
-        dishes = dishes_resp.data or []
-        if not dishes:
-            return {
-                "restaurant_place_id": restaurant_place_id,
-                "popular_dishes": [],
-                "total_dishes": 0,
-            }
-
-        thirty_days_ago = (datetime.utcnow() - timedelta(days=30)).isoformat()
-        dish_ids = [d["id"] for d in dishes]
-
-        # Fetch all behavioral data for these dishes in bulk
-        all_orders = supabase.table("dish_orders") \
-            .select("dish_id, ordered_at") \
-            .in_("dish_id", dish_ids) \
-            .execute()
-        all_views = supabase.table("dish_views") \
-            .select("dish_id") \
-            .in_("dish_id", dish_ids) \
-            .execute()
-        all_ratings = supabase.table("dish_ratings") \
-            .select("dish_id, rating") \
-            .in_("dish_id", dish_ids) \
-            .execute()
-
-        # Aggregate signals per dish
-        from collections import defaultdict
-        order_counts = defaultdict(int)
-        recent_order_counts = defaultdict(int)
-        view_counts = defaultdict(int)
-        rating_sums = defaultdict(float)
-        rating_counts = defaultdict(int)
-
-        for o in (all_orders.data or []):
-            did = o["dish_id"]
-            order_counts[did] += 1
-            if o.get("ordered_at") and o["ordered_at"] >= thirty_days_ago:
-                recent_order_counts[did] += 1
-
-        for v in (all_views.data or []):
-            view_counts[v["dish_id"]] += 1
-
-        for r in (all_ratings.data or []):
-            did = r["dish_id"]
-            rating_sums[did] += r["rating"]
-            rating_counts[did] += 1
-
-        # Score each dish
         popular_dishes = []
-        for dish in dishes:
-            did = dish["id"]
-            oc = order_counts[did]
-            vc = view_counts[did]
-            rc = rating_counts[did]
-            avg_r = rating_sums[did] / rc if rc > 0 else 0.0
-            roc = recent_order_counts[did]
-            recent_boost = min(roc / max(oc, 1), 1.0) * 0.3 if oc > 0 else 0.0
-
-            # Popularity score (same formula as EnhancedRecommendationAlgorithm)
-            order_score = min(oc / 10.0, 1.0) * 1.0
-            rating_score = ((avg_r - 1.0) / 4.0) * 0.8 if rc >= 3 else 0.0
-            view_score = min(vc / 50.0, 1.0) * 0.3
-            trending_boost = recent_boost * 0.2
-            popularity_score = min(order_score + rating_score + view_score + trending_boost, 1.0)
-
-            if oc == 0 and vc == 0 and rc == 0:
-                continue  # Skip dishes with no signals
-
+        for row in (page.data or []):
+            stats = DishStats.from_row(row)
             popular_dishes.append({
-                "id": str(did),
-                "name": dish["name"],
-                "description": dish.get("description") or "",
-                "category": dish.get("category") or "main",
-                "price": float(dish["price"]) if dish.get("price") else None,
-                "popularity_score": round(popularity_score, 3),
+                "id": str(row["dish_id"]),
+                "name": row["name"],
+                "description": row.get("description") or "",
+                "category": row.get("category") or "main",
+                "price": float(row["price"]) if row.get("price") else None,
+                "popularity_score": round(row["popularity_score"], 3),
                 "signals": {
-                    "order_count": oc,
-                    "view_count": vc,
-                    "avg_rating": round(avg_r, 2) if avg_r > 0 else None,
-                    "rating_count": rc,
-                    "recent_order_boost": round(recent_boost, 3),
+                    "order_count": row["order_count"],
+                    "view_count": row["view_count"],
+                    "avg_rating": round(row["avg_rating"], 2) if row["avg_rating"] > 0 else None,
+                    "rating_count": row["rating_count"],
+                    "recent_order_boost": round(row["recent_order_boost"], 3),
+                    "trend_score": round(stats.trend_score(), 3),
                 },
             })
 
-        # Sort by popularity score (highest first)
-        popular_dishes.sort(key=lambda x: x["popularity_score"], reverse=True)
-        popular_dishes = popular_dishes[:limit]
-
     except Exception as e:
         logger.error("Failed to get popular dishes for %s: %s", restaurant_place_id, e)
         raise HTTPException(status_code=500, detail="Failed to get popular dishes")
 
-    return {
+    total = page.count if page.count is not None else len(popular_dishes)
+    response = {
         "restaurant_place_id": restaurant_place_id,
         "popular_dishes": popular_dishes,
-        "total_dishes": len(dishes),
+        "total_dishes": total,
         "returned_count": len(popular_dishes),
+        "offset": offset,
+        "has_more": offset + len(popular_dishes) < total,
     }
+    _popular_dishes_cache.set(cache_key, response)
+    return response
@@ -23,6 +23,8 @@ from pydantic import BaseModel
 from supabase import create_client, Client
 
 from app.services.menu_parsing_utils import infer_menu_period_from_url, infer_menu_type_from_content
+from app.services.place_index import place_index
+from app.services.recommendation_cache import invalidate_restaurant_recommendations
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -473,6 +475,8 @@ async def _run_ingest_job(job: IngestJob):
                     failed += 1
                     continue
                 menu_id = menu_result.data[0]["id"]
+                place_index.mark_stale(menu_result.data[0].get("place_id"), job.restaurant_name)
+                invalidate_restaurant_recommendations(menu_result.data[0].get("place_id"))
 
             # Insert dishes (dedup by name within this menu)
             existing_dish_names: set[str] = set()
@@ -652,6 +656,8 @@ async def _run_text_ingest_job(job: IngestJob, menu_text: str):
             return
 
         menu_id = menu_result.data[0]["id"]
+        place_index.mark_stale(menu_result.data[0].get("place_id"), job.restaurant_name)
+        invalidate_restaurant_recommendations(menu_result.data[0].get("place_id"))
 
         # Insert dishes
         for i, dish in enumerate(dishes_data):
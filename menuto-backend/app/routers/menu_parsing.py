@@ -1,12 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, Form, File, UploadFile, Query
 from fastapi.responses import JSONResponse
 from typing import List, Dict, Optional
+import asyncio
 import logging
 import json
 from datetime import datetime
 import os
 from uuid import uuid4
 from supabase import create_client, Client
+
+from app.services.place_index import place_index
+from app.services.recommendation_cache import invalidate_restaurant_recommendations
 # from sqlalchemy.orm import Session
 # from ..database import get_db
 # Mock database for now - replace with actual implementation later
@@ -208,6 +212,8 @@ async def parse_and_store_menu(
             )
         
         menu_id = supabase_menu.data[0]["id"]
+        place_index.mark_stale(supabase_menu.data[0].get("place_id"), restaurant_name)
+        invalidate_restaurant_recommendations(supabase_menu.data[0].get("place_id"))
         
         # Create dish records in Supabase
         for dish_data in dishes_data:
@@ -409,6 +415,8 @@ async def parse_menu_from_screenshot(
                 )
             
             menu_id = supabase_menu.data[0]["id"]
+            place_index.mark_stale(supabase_menu.data[0].get("place_id"), restaurant_name)
+            invalidate_restaurant_recommendations(supabase_menu.data[0].get("place_id"))
             
             # Create dish records in Supabase
             for dish_data in dishes_data:
@@ -586,6 +594,8 @@ async def store_parsed_dishes(dishes_data: List[Dict], restaurant_name: str, res
                 )
             
             menu_id = supabase_menu.data[0]["id"]
+            place_index.mark_stale(supabase_menu.data[0].get("place_id"), restaurant_name)
+            invalidate_restaurant_recommendations(supabase_menu.data[0].get("place_id"))
             
             # Add dishes
             for dish_data in dishes_data:
@@ -750,25 +760,28 @@ async def search_restaurants_by_name(
     Search restaurants by name and return their LLM-extracted cuisine types.
     """
     try:
-        # Search in parsed_menus table for restaurants matching the query
-        menus = supabase.table("parsed_menus").select("*").ilike("restaurant_name", f"%{query}%").limit(limit).execute()
-        
-        # Deduplicate by restaurant name
-        seen_names = set()
-        restaurants = []
-        for menu in menus.data:
-            restaurant_name = menu["restaurant_name"]
-            if restaurant_name not in seen_names:
-                seen_names.add(restaurant_name)
-                restaurants.append({
-                    "place_id": f"menu_{menu['id']}",  # Generate a unique ID
-                    "name": restaurant_name,
-                    "vicinity": menu.get("restaurant_url", "Menu available"),  # Use restaurant URL as address
-                    "cuisine_type": menu.get("cuisine_type", "restaurant"),
-                    "rating": 4.0,  # Default rating
-                    "price_level": None,
-                    "has_menu": True
-                })
+        if await asyncio.to_thread(place_index.ensure_fresh, supabase):
+            restaurants = [entry.as_search_result() for entry, _ in place_index.search(query, limit)]
+        else:
+            # Index unavailable: fall back to scanning parsed_menus
+            menus = supabase.table("parsed_menus").select("*").ilike("restaurant_name", f"%{query}%").limit(limit).execute()
+
+            # Deduplicate by restaurant name
+            seen_names = set()
+            restaurants = []
+            for menu in menus.data:
+                restaurant_name = menu["restaurant_name"]
+                if restaurant_name not in seen_names:
+                    seen_names.add(restaurant_name)
+                    restaurants.append({
+                        "place_id": f"menu_{menu['id']}",  # Generate a unique ID
+                        "name": restaurant_name,
+                        "vicinity": menu.get("restaurant_url", "Menu available"),  # Use restaurant URL as address
+                        "cuisine_type": menu.get("cuisine_type", "restaurant"),
+                        "rating": 4.0,  # Default rating
+                        "price_level": None,
+                        "has_menu": True
+                    })
         
         return JSONResponse({
             "query": query,
@@ -1,9 +1,15 @@
 # app/routers/places.py
-import os, httpx
+import asyncio
+import os
 from fastapi import APIRouter, HTTPException, Query, Header
 from typing import Optional
 from supabase import create_client, Client
 
+from app.services.google_client import TEXT_SEARCH_URL, google_api
+from app.services.place_index import place_index
+from app.services.place_search_cache import place_search_cache
+from app.services.user_profile_cache import aget_home_base
+
 API_KEY = os.getenv("GOOGLE_MAPS_API_KEY") or os.getenv("GOOGLE_PLACES_API_KEY")
 router = APIRouter(prefix="/api/places", tags=["places"])
 
@@ -25,16 +31,6 @@ POPULAR_CITIES = {
     "Portland": "45.5152,-122.6784",
 }
 
-def _get_user_home_base(user_id: str) -> str | None:
-    """Get user's home_base city name"""
-    if not sb:
-        return None
-    try:
-        r = sb.table("user_profiles").select("home_base").eq("id", user_id).maybe_single().execute()
-        return r.data.get("home_base") if r.data else None
-    except Exception:
-        return None
-
 async def _get_user_optional(authorization: Optional[str] = None) -> dict | None:
     """Get user if authenticated, return None if not (doesn't throw)"""
     if not authorization or not authorization.startswith("Bearer "):
@@ -63,6 +59,20 @@ async def search_places(
     location: str | None = None,
     authorization: Optional[str] = Header(None, alias="Authorization")
 ):
+    # Restaurants we already have menus for, from the in-memory index
+    # (name matches only, so they're merged with the location-aware Google results)
+    local = []
+    if await asyncio.to_thread(place_index.ensure_fresh, sb):
+        local = [entry.as_search_result() for entry, _ in place_index.search(query, 20)]
+
+    if local and not API_KEY:
+        return {
+            "query": query,
+            "restaurants": local,
+            "total": len(local),
+            "source": "local_index",
+            "home_base_prioritized": None
+        }
     if not API_KEY:
         raise HTTPException(404, "Google Places not configured")
     
@@ -72,13 +82,29 @@ async def search_places(
     user = await _get_user_optional(authorization)
     if user:
         user_id = user.get("sub")
-        user_home_base = _get_user_home_base(user_id) if user_id else None
+        user_home_base = await aget_home_base(sb, user_id) if user_id else None
         if user_home_base and user_home_base in POPULAR_CITIES:
             home_base_coords = POPULAR_CITIES[user_home_base]
             # Use home_base as location if no location specified
             if not location:
                 location = home_base_coords
     
+    cache_key = place_search_cache.key(query, location, user_home_base)
+    restaurants, cache_status = place_search_cache.get(cache_key)
+    if restaurants is None:
+        restaurants = await _google_text_search(query, location, user_home_base, cache_key)
+
+    restaurants = place_index.merge_results(local, restaurants)
+    return {
+        "query": query,
+        "restaurants": restaurants,
+        "total": len(restaurants),
+        "source": "google_places" if len(restaurants) > len(local) else "local_index",
+        "cache": cache_status,
+        "home_base_prioritized": user_home_base if user_home_base else None
+    }
+
+async def _google_text_search(query: str, location: str | None, user_home_base: str | None, cache_key) -> list:
     # Use textsearch API to get multiple results (up to 20)
     params = {
         "query": query,
@@ -89,52 +115,42 @@ async def search_places(
         params["location"] = location
         params["radius"] = "50000"  # 50km radius
     
-    async with httpx.AsyncClient(timeout=10) as c:
-        r = await c.get(
-            "https://maps.googleapis.com/maps/api/place/textsearch/json",
-            params=params,
-        )
-        r.raise_for_status()
-        data = r.json()
-        
-        # Transform Google Places response
-        restaurants = []
-        if data.get("status") == "OK" and data.get("results"):
-            for result in data["results"][:20]:  # Limit to 20 results
-                address = result.get("formatted_address", "")
-                restaurants.append({
-                    "place_id": result["place_id"],
-                    "name": result["name"],
-                    "vicinity": address,
-                    "cuisine_type": "Restaurant",  # Default since we don't have cuisine info
-                    "rating": result.get("rating", 4.0),
-                    "price_level": result.get("price_level"),
-                    "has_menu": True,
-                    "_address": address,  # Temporary field for city matching
-                })
-        
-        # Re-rank: prioritize restaurants in user's home_base city
-        if user_home_base and restaurants:
-            home_city_restaurants = []
-            other_restaurants = []
-            
-            for restaurant in restaurants:
-                if _extract_city_from_address(restaurant["_address"], user_home_base):
-                    home_city_restaurants.append(restaurant)
-                else:
-                    other_restaurants.append(restaurant)
-            
-            # Surface home_base restaurants first
-            restaurants = home_city_restaurants + other_restaurants
+    data = await google_api.aget_json(TEXT_SEARCH_URL, params)
+
+    # Transform Google Places response
+    restaurants = []
+    if data.get("status") == "OK" and data.get("results"):
+        for result in data["results"][:20]:  # Limit to 20 results
+            address = result.get("formatted_address", "")
+            restaurants.append({
+                "place_id": result["place_id"],
+                "name": result["name"],
+                "vicinity": address,
+                "cuisine_type": "Restaurant",  # Default since we don't have cuisine info
+                "rating": result.get("rating", 4.0),
+                "price_level": result.get("price_level"),
+                "has_menu": False,  # set from the place index when merging
+                "_address": address,  # Temporary field for city matching
+            })
+    
+    # Re-rank: prioritize restaurants in user's home_base city
+    if user_home_base and restaurants:
+        home_city_restaurants = []
+        other_restaurants = []
         
-        # Remove the temporary field before returning
         for restaurant in restaurants:
-            restaurant.pop("_address", None)
+            if _extract_city_from_address(restaurant["_address"], user_home_base):
+                home_city_restaurants.append(restaurant)
+            else:
+                other_restaurants.append(restaurant)
         
-        return {
-            "query": query,
-            "restaurants": restaurants,
-            "total": len(restaurants),
-            "source": "google_places",
-            "home_base_prioritized": user_home_base if user_home_base else None
-        }
+        # Surface home_base restaurants first
+        restaurants = home_city_restaurants + other_restaurants
+    
+    # Remove the temporary field before returning
+    for restaurant in restaurants:
+        restaurant.pop("_address", None)
+
+    if data.get("status") in ("OK", "ZERO_RESULTS"):
+        place_search_cache.set(cache_key, restaurants)
+    return restaurants
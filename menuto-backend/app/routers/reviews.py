@@ -1,15 +1,77 @@
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+import os
+import time
+import uuid
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
 
+from app.require_user import require_admin
 from app.services.review_ingestion import (
     get_reviews_for_restaurant,
     get_dish_sentiment_scores,
+    refresh_reviews,
 )
+from app.services.review_warmup import warm_review_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Job status lives in this process only: poll the instance that accepted the
+# job. Finished jobs are dropped after REVIEW_WARMUP_JOB_TTL_SECONDS.
+REVIEW_WARMUP_JOB_TTL_SECONDS = float(os.getenv("REVIEW_WARMUP_JOB_TTL_SECONDS", "3600"))
+_warmup_jobs: Dict[str, Dict[str, Any]] = {}
+
+
+def _prune_warmup_jobs() -> None:
+    cutoff = time.time() - REVIEW_WARMUP_JOB_TTL_SECONDS
+    for job_id, job in list(_warmup_jobs.items()):
+        if job.get("finished_at", float("inf")) < cutoff:
+            _warmup_jobs.pop(job_id, None)
+
+
+class WarmupRequest(BaseModel):
+    place_ids: Optional[List[str]] = None  # omit to warm every restaurant with a parsed menu
+    force: bool = False
+
+
+def _run_warmup_job(job_id: str, place_ids: Optional[List[str]], force: bool) -> None:
+    job = _warmup_jobs[job_id]
+    job["status"] = "running"
+    try:
+        job["result"] = warm_review_cache(place_ids, force=force).as_dict()
+        job["status"] = "done"
+    except Exception as e:
+        logger.exception("Review warm-up %s failed", job_id)
+        job["status"] = "failed"
+        job["error"] = str(e)
+    job["finished_at"] = time.time()
+
+
+@router.post("/warm-up")
+async def warm_up_reviews(body: WarmupRequest, background_tasks: BackgroundTasks, admin=Depends(require_admin)):
+    """
+    Pre-populate the review cache for a list of place_ids (or every parsed menu)
+    in the background. Poll GET /reviews/warm-up/{job_id} for the summary.
+    Requires the X-Admin-Token header (each run spends Places and Gemini quota).
+    """
+    _prune_warmup_jobs()
+    job_id = uuid.uuid4().hex[:12]
+    _warmup_jobs[job_id] = {"job_id": job_id, "status": "pending", "started_at": time.time()}
+    place_ids = [p.strip() for p in body.place_ids if p.strip()] if body.place_ids is not None else None
+    background_tasks.add_task(_run_warmup_job, job_id, place_ids, body.force)
+    return _warmup_jobs[job_id]
+
+
+@router.get("/warm-up/{job_id}")
+async def get_warm_up_status(job_id: str, admin=Depends(require_admin)):
+    _prune_warmup_jobs()
+    job = _warmup_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Warm-up job not found")
+    return job
+
 
 @router.get("/{place_id}/reviews")
 async def get_reviews(
@@ -22,18 +84,11 @@ async def get_reviews(
     Pass ?force_refresh=true to bypass cache.
     """
     try:
+        # A miss can wait on (or run) a Google + Gemini refresh: keep it off the event loop
         if force_refresh:
-            # Import internals to force a cache miss
-            from app.services.review_ingestion import _fetch_google_reviews, _enrich_reviews_batch, _cache_reviews
-            raw = _fetch_google_reviews(place_id)
-            if raw:
-                enriched = _enrich_reviews_batch(raw, place_id)
-                _cache_reviews(place_id, enriched)
-                reviews = enriched
-            else:
-                reviews = []
+            reviews = await asyncio.to_thread(refresh_reviews, place_id)
         else:
-            reviews = get_reviews_for_restaurant(place_id)
+            reviews = await asyncio.to_thread(get_reviews_for_restaurant, place_id)
 
         return {
             "place_id": place_id,
@@ -52,7 +107,7 @@ async def get_dish_sentiments(place_id: str):
     Useful for understanding which dishes are most praised.
     """
     try:
-        sentiments = get_dish_sentiment_scores(place_id)
+        sentiments = await asyncio.to_thread(get_dish_sentiment_scores, place_id)
         return {
             "place_id": place_id,
             "dish_sentiments": sentiments,
@@ -1,20 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Request
 
+from app.services.dish_name_index import DishNameIndex
+from app.services.dish_stats import get_restaurant_stats_by_name, popularity_by_name
+from app.services.local_ranker import LocalRanker, validate_weights
 from app.services.menu_data_service import MenuDataService
+from app.services.recommendation_cache import (
+    cache_response,
+    get_cached_response,
+    recommendation_cache_key,
+)
 from app.services.recommendation_engine import RecommendationEngine
 from app.services.recommendation_types import HungerLevel, RecommendationContext
-from app.services.review_ingestion import get_dish_sentiment_scores, get_review_based_popularity
-from app.services.smart_recommendation_algorithm import SmartRecommendationAlgorithm
+from app.services.review_ingestion import aget_review_signals
+from app.services.smart_recommendation_algorithm import RANKER_MODES, SmartRecommendationAlgorithm
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Callers may tighten the "auto" budget, not hold a worker for minutes
+_MAX_LATENCY_BUDGET_MS = 60_000
+
 
 def _map_hunger_level(raw: int | float | None) -> HungerLevel:
     if raw is None:
@@ -39,12 +51,33 @@ async def generate_smart_recommendations(
         user_dietary_constraints = data.get("user_dietary_constraints", []) or []
         context_weights = data.get("context_weights", {}) or {}
         friend_selections = data.get("friend_selections", []) or []
+        ranker = data.get("ranker") or "auto"  # "auto" (budgeted), "agent" or "local" (no LLM)
+        ranker_weights = data.get("ranker_weights") or None
+        latency_budget_ms = data.get("latency_budget_ms")
 
         if not restaurant_place_id or not restaurant_name:
             raise HTTPException(
                 status_code=400,
                 detail="restaurant_place_id and restaurant_name are required",
             )
+        if ranker not in RANKER_MODES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"ranker must be one of: {', '.join(RANKER_MODES)}",
+            )
+        if latency_budget_ms is not None and (
+            isinstance(latency_budget_ms, bool)
+            or not isinstance(latency_budget_ms, (int, float))
+            or not 0 < latency_budget_ms <= _MAX_LATENCY_BUDGET_MS
+        ):
+            raise HTTPException(
+                status_code=400,
+                detail=f"latency_budget_ms must be a positive number no greater than {_MAX_LATENCY_BUDGET_MS}",
+            )
+        try:
+            ranker_weights = validate_weights(ranker_weights)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         hunger_raw = context_weights.get("hungerLevel")
         spice_raw = context_weights.get("spiceTolerance")
@@ -76,6 +109,25 @@ async def generate_smart_recommendations(
             else "late_night"
         )
 
+        # Identical request inputs → reuse the recent response before any Supabase read.
+        # DB-side inputs (ratings, orders, favorites, feedback, menus) invalidate it.
+        cache_key = recommendation_cache_key(
+            restaurant_place_id=restaurant_place_id,
+            user_id=data.get("user_id"),
+            context_weights=context_weights,
+            user_favorite_dishes=user_favorite_dishes,
+            user_dietary_constraints=user_dietary_constraints,
+            friend_selections=friend_selections,
+            meal_period=meal_period,
+            hunger=hunger_raw,
+            ranker=ranker,
+            ranker_weights=ranker_weights,
+        )
+        cached = get_cached_response(cache_key)
+        if cached is not None:
+            logger.info("Recommendation cache hit for %s (user %s)", restaurant_name, data.get("user_id"))
+            return {**cached, "cache_hit": True}
+
         # Create Supabase client once for all user-data fetches
         from supabase import create_client
         sb_url = os.getenv("SUPABASE_URL")
@@ -154,32 +206,25 @@ async def generate_smart_recommendations(
                 logger.warning("Failed to fetch behavioral signals: %s", e)
 
         # Fetch dish popularity from two sources:
-        # 1. Cross-user order counts from Menuto app (dish_orders table)
+        # 1. Cross-user activity from Menuto app (dish_stats rollup, shared popularity score)
         # 2. Review mention frequency from Google (free — already cached)
         dish_popularity: dict[str, float] = {}
+        dish_trends: dict[str, float] = {}
         try:
-            # Source 1: Menuto user orders
+            # Source 1: Menuto user activity
             if sb:
-                pop_result = sb.table("dish_orders").select(
-                    "dish_id, parsed_dishes(name)"
-                ).eq("restaurant_place_id", restaurant_place_id).execute()
-
-                dish_order_counts: dict[str, int] = {}
-                for r in (pop_result.data or []):
-                    dish = r.get("parsed_dishes")
-                    if dish and dish.get("name"):
-                        name = dish["name"]
-                        dish_order_counts[name] = dish_order_counts.get(name, 0) + 1
-
-                if dish_order_counts:
-                    max_orders = max(dish_order_counts.values())
-                    dish_popularity = {
-                        name: count / max_orders
-                        for name, count in dish_order_counts.items()
-                    }
+                restaurant_stats = get_restaurant_stats_by_name(sb, restaurant_place_id)
+                # Same score as the popular-dishes endpoint: orders, ratings, views, trend
+                dish_popularity = popularity_by_name(restaurant_stats)
+                # Week-over-month momentum from the daily order buckets
+                dish_trends = {
+                    name: round(trend, 3)
+                    for name, trend in ((n, s.trend_score()) for n, s in restaurant_stats.items())
+                    if trend > 0
+                }
 
             # Source 2: Google review mention frequency (free, no extra API calls)
-            review_popularity = get_review_based_popularity(restaurant_place_id)
+            review_popularity = dict((await aget_review_signals(restaurant_place_id)).popularity)
             if review_popularity:
                 # Merge: if we have order data, blend 60/40 (orders are stronger signal).
                 # If no order data, review mentions are the sole popularity signal.
@@ -194,9 +239,9 @@ async def generate_smart_recommendations(
 
             if dish_popularity:
                 logger.info(
-                    "Popularity data: %d dishes (%d from orders, %d from reviews) at %s",
+                    "Popularity data: %d dishes (%d from Menuto activity, %d from reviews) at %s",
                     len(dish_popularity),
-                    len(dish_order_counts) if sb else 0,
+                    len(restaurant_stats) if sb else 0,
                     len(review_popularity),
                     restaurant_name,
                 )
@@ -255,6 +300,7 @@ async def generate_smart_recommendations(
             user_dish_ratings=user_ratings_map,
             user_behavioral_signals=behavioral_signals,
             dish_popularity=dish_popularity,
+            dish_trends=dish_trends,
             user_id=user_id,
             dining_occasion=dining_occasion,
             party_size=party_size,
@@ -267,6 +313,7 @@ async def generate_smart_recommendations(
         algorithm = SmartRecommendationAlgorithm(
             menu_data_service=menu_service,
             legacy_engine=legacy_engine,
+            local_ranker=LocalRanker(weights=ranker_weights),
         )
 
         menu_items = menu_service.get_menu_items_with_features(
@@ -310,20 +357,19 @@ async def generate_smart_recommendations(
 
         # Enrich menu items with review-based sentiment scores
         try:
-            dish_sentiments = get_dish_sentiment_scores(restaurant_place_id)
+            dish_sentiments = (await aget_review_signals(restaurant_place_id)).sentiment  # memoized: same fetch as popularity
             if dish_sentiments:
                 logger.info(
                     "Enriching %d menu items with %d dish sentiment scores from reviews",
                     len(menu_items), len(dish_sentiments),
                 )
+                # Fuzzy match: reviewed dish name inside the item name or vice versa
+                sentiment_index = DishNameIndex(dish_sentiments)
                 for item in menu_items:
-                    # Fuzzy match: check if any reviewed dish name appears in the item name
-                    item_name_lower = item.name.lower()
-                    for dish_name, score in dish_sentiments.items():
-                        if dish_name.lower() in item_name_lower or item_name_lower in dish_name.lower():
-                            # Override the default 0.65 sentiment with real review data
-                            item.sentiment_score = score
-                            break
+                    score = sentiment_index.lookup(item.name)
+                    if score is not None:
+                        # Override the default 0.65 sentiment with real review data
+                        item.sentiment_score = score
         except Exception as e:
             logger.warning("Review enrichment failed, using defaults: %s", e)
 
@@ -349,14 +395,19 @@ async def generate_smart_recommendations(
             }
             logger.info("Cold-start user — using popularity/sentiment-weighted scoring")
 
-        scored_recommendations = algorithm.generate_recommendations_from_payload(
+        # Blocks for up to the latency budget: keep it off the event loop
+        scored_recommendations = await asyncio.to_thread(
+            algorithm.generate_recommendations_from_payload,
             menu_items=menu_items,
             restaurant_place_id=restaurant_place_id,
             restaurant_name=restaurant_name,
             user_favorite_dishes=user_favorite_dishes,
             user_dietary_constraints=user_dietary_constraints,
             context=context,
+            ranker=ranker,
+            latency_budget_s=latency_budget_ms / 1000.0 if latency_budget_ms is not None else None,
         )
+        served_by = algorithm.last_served_by
 
         recommendations_payload = [
             {
@@ -376,7 +427,7 @@ async def generate_smart_recommendations(
             for scored in scored_recommendations
         ]
 
-        return {
+        response = {
             "restaurant": {
                 "place_id": restaurant_place_id,
                 "name": restaurant_name,
@@ -386,7 +437,12 @@ async def generate_smart_recommendations(
             "message": f"Found {len(recommendations_payload)} personalized recommendations based on real menu items",
             "menu_stale": menu_stale,
             "menu_age_days": age_days if menu_stale else None,
+            "served_by": served_by,
         }
+        # Don't pin degraded (budget/fallback) answers for the cache TTL
+        if recommendations_payload and served_by in ("agent", "local"):
+            cache_response(cache_key, response)
+        return {**response, "cache_hit": False}
 
     except HTTPException:
         raise
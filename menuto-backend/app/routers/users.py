@@ -1,12 +1,13 @@
 # app/users.py
 import logging
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from supabase import create_client, Client
 from app.require_user import require_user
+from app.services.user_profile_cache import get_user_profile, invalidate_user_profile, remember_user_profile
 
 logger = logging.getLogger(__name__)
 
@@ -39,11 +40,8 @@ class UserPreferences(BaseModel):
     top_3_restaurants: List[Dict] = []
     home_base: Optional[str] = None
 
-def _get_user(user_id: str):
-    if not sb:
-        return None
-    r = sb.table(TABLE).select("*").eq("id", user_id).maybe_single().execute()
-    return r.data if r else None
+def _get_user(user_id: str, fresh: bool = False):
+    return get_user_profile(sb, user_id, fresh=fresh)
 
 def _upsert(row: dict):
     if not sb:
@@ -51,7 +49,9 @@ def _upsert(row: dict):
     # First upsert the data
     sb.table(TABLE).upsert(row, on_conflict="id").execute()
     # Then fetch the updated record
+    invalidate_user_profile(row["id"])
     r = sb.table(TABLE).select("*").eq("id", row["id"]).maybe_single().execute()
+    remember_user_profile(r.data if r else None)
     return r.data
 
 @router.get("/{user_id}/preferences")
@@ -77,7 +77,7 @@ async def create_user_preferences(user_id: str, prefs: UserPreferences, user=Dep
 async def update_user_preferences(user_id: str, prefs: UserPreferences, user=Depends(require_user)):
     if not DEV and user["sub"] != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
-    current = _get_user(user_id) or {"id": user_id}
+    current = _get_user(user_id, fresh=True) or {"id": user_id}
     row = {**current, **prefs.model_dump(exclude_none=True)}
     return _upsert(row)
 
@@ -88,6 +88,7 @@ async def update_top_3_restaurants(user_id: str, restaurants: List[Dict], user=D
     if not sb:
         return {"success": True, "message": "Mock mode - not saved to database"}
     r = sb.table(TABLE).update({"top_3_restaurants": restaurants}).eq("id", user_id).execute()
+    invalidate_user_profile(user_id)
     return {"success": bool(r.data)}
 
 @router.post("/{user_id}/favorite-dishes")
@@ -96,9 +97,10 @@ async def add_favorite_dish(user_id: str, dish_data: Dict, user=Depends(require_
         raise HTTPException(status_code=403, detail="Access denied")
     if not sb:
         return {"success": True, "message": "Mock mode - not saved to database"}
-    current = _get_user(user_id) or {"id": user_id}
+    current = _get_user(user_id, fresh=True) or {"id": user_id}
     favs = (current.get("favorite_dishes") or []) + [dish_data]
     r = sb.table(TABLE).update({"favorite_dishes": favs}).eq("id", user_id).execute()
+    invalidate_user_profile(user_id)
     return {"success": bool(r.data)}
 
 @router.get("/{user_id}/favorite-dishes")
@@ -108,11 +110,44 @@ async def get_favorite_dishes(user_id: str, user=Depends(require_user)):
     current = _get_user(user_id) or {}
     return current.get("favorite_dishes", [])
 
+_DISH_LOOKUP_CHUNK = 200
+_NO_TIMESTAMP = datetime.min.replace(tzinfo=timezone.utc)
+
+def _parse_ts(value) -> datetime:
+    """Aware datetime for a Supabase timestamp (string or datetime); oldest possible if missing/bad."""
+    if not value:
+        return _NO_TIMESTAMP
+    try:
+        ts = datetime.fromisoformat(value.replace('Z', '+00:00')) if isinstance(value, str) else value
+    except Exception as e:
+        logger.error("Error parsing date %r: %s", value, e)
+        return _NO_TIMESTAMP
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+def _unknown_dish(dish_id: str, dish_info: dict) -> dict:
+    return {
+        "id": dish_id,
+        "name": "Unknown Dish",
+        "description": None,
+        "category": None,
+        "price": None,
+        "price_text": None,
+        "restaurant_place_id": dish_info["restaurant_place_id"],
+        "rating": dish_info["rating"],
+        "tried_at": dish_info["tried_at"],
+    }
+
 @router.get("/{user_id}/tried-dishes")
-async def get_tried_dishes(user_id: str, user=Depends(require_user)):
+async def get_tried_dishes(
+    user_id: str,
+    limit: int = Query(100, ge=1, le=500, description="Max dishes to return, most recent first"),
+    offset: int = Query(0, ge=0, description="Number of dishes to skip"),
+    user=Depends(require_user),
+):
     """
-    Get dishes the user has tried (ordered or rated).
+    Get dishes the user has tried (ordered or rated), most recent first.
     Combines data from dish_orders and dish_ratings tables, joined with parsed_dishes.
+    Dish details are fetched only for the requested page, in batched `in` queries.
     """
     if not DEV and user["sub"] != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
@@ -120,10 +155,9 @@ async def get_tried_dishes(user_id: str, user=Depends(require_user)):
     if not sb:
         return []
 
-    tried_dishes = []
-
     # Query orders and ratings from Supabase
     # First, get orders
+    order_dict = {}
     try:
         orders_response = sb.table("dish_orders") \
             .select("dish_id, restaurant_place_id, ordered_at") \
@@ -131,17 +165,16 @@ async def get_tried_dishes(user_id: str, user=Depends(require_user)):
             .order("ordered_at", desc=True) \
             .execute()
 
-        order_dict = {}
-        if orders_response.data:
-            for order in orders_response.data:
-                dish_id = str(order.get("dish_id"))
-                if dish_id not in order_dict:
-                    order_dict[dish_id] = {
-                        "dish_id": dish_id,
-                        "restaurant_place_id": order.get("restaurant_place_id"),
-                        "tried_at": order.get("ordered_at"),
-                        "rating": None,
-                    }
+        for order in orders_response.data or []:
+            dish_id = str(order.get("dish_id"))
+            if dish_id not in order_dict:
+                order_dict[dish_id] = {
+                    "dish_id": dish_id,
+                    "restaurant_place_id": order.get("restaurant_place_id"),
+                    "tried_at": order.get("ordered_at"),
+                    "tried_ts": _parse_ts(order.get("ordered_at")),
+                    "rating": None,
+                }
     except Exception as e:
         logger.error("Error querying dish_orders for user %s: %s", user_id, e)
         order_dict = {}
@@ -154,83 +187,67 @@ async def get_tried_dishes(user_id: str, user=Depends(require_user)):
             .order("rated_at", desc=True) \
             .execute()
 
-        if ratings_response.data:
-            for rating in ratings_response.data:
-                dish_id = str(rating.get("dish_id"))
-                rated_at = rating.get("rated_at")
-
-                if dish_id in order_dict:
-                    # Update existing order entry with rating
-                    existing_date = order_dict[dish_id]["tried_at"]
-                    if existing_date and rated_at:
-                        try:
-                            existing_dt = datetime.fromisoformat(existing_date.replace('Z', '+00:00')) if isinstance(existing_date, str) else existing_date
-                            rated_dt = datetime.fromisoformat(rated_at.replace('Z', '+00:00')) if isinstance(rated_at, str) else rated_at
-                            if rated_dt > existing_dt:
-                                order_dict[dish_id]["tried_at"] = rated_at
-                        except Exception as e:
-                            logger.error("Error parsing date for dish %s: %s", dish_id, e)
-                    order_dict[dish_id]["rating"] = rating.get("rating")
-                else:
-                    # New entry from rating only
-                    order_dict[dish_id] = {
-                        "dish_id": dish_id,
-                        "restaurant_place_id": rating.get("restaurant_place_id"),
-                        "tried_at": rated_at,
-                        "rating": rating.get("rating"),
-                    }
+        for rating in ratings_response.data or []:
+            dish_id = str(rating.get("dish_id"))
+            rated_at = rating.get("rated_at")
+            rated_ts = _parse_ts(rated_at)
+
+            if dish_id in order_dict:
+                existing = order_dict[dish_id]
+                if existing["rating"] is not None:
+                    continue  # already have this dish's most recent rating
+                # Update existing order entry with rating
+                if rated_ts > existing["tried_ts"]:
+                    existing["tried_at"], existing["tried_ts"] = rated_at, rated_ts
+                existing["rating"] = rating.get("rating")
+            else:
+                # New entry from rating only
+                order_dict[dish_id] = {
+                    "dish_id": dish_id,
+                    "restaurant_place_id": rating.get("restaurant_place_id"),
+                    "tried_at": rated_at,
+                    "tried_ts": rated_ts,
+                    "rating": rating.get("rating"),
+                }
     except Exception as e:
         logger.error("Error querying dish_ratings for user %s: %s", user_id, e)
 
-    # Fetch dish details from parsed_dishes
-    for dish_id, dish_info in order_dict.items():
+    # Most recent first, then only the requested page needs dish details
+    page = sorted(order_dict.values(), key=lambda d: d["tried_ts"], reverse=True)[offset:offset + limit]
+
+    numeric_ids = [int(d["dish_id"]) for d in page if d["dish_id"].isdigit()]
+    dishes_by_id = {}
+    failed_ids = set()
+    for i in range(0, len(numeric_ids), _DISH_LOOKUP_CHUNK):
+        chunk = numeric_ids[i:i + _DISH_LOOKUP_CHUNK]
         try:
             dish_response = sb.table("parsed_dishes") \
                 .select("id, name, description, category, price, price_text") \
-                .eq("id", int(dish_id)) \
-                .maybe_single() \
+                .in_("id", chunk) \
                 .execute()
-
-            if dish_response.data:
-                dish_data = dish_response.data
-                tried_dishes.append({
-                    "id": str(dish_data.get("id")),
-                    "name": dish_data.get("name", "Unknown Dish"),
-                    "description": dish_data.get("description"),
-                    "category": dish_data.get("category"),
-                    "price": dish_data.get("price"),
-                    "price_text": dish_data.get("price_text"),
-                    "restaurant_place_id": dish_info["restaurant_place_id"],
-                    "rating": dish_info["rating"],
-                    "tried_at": dish_info["tried_at"],
-                })
+            dishes_by_id.update({str(d["id"]): d for d in dish_response.data or []})
         except Exception as e:
-            logger.error("Error fetching dish details for %s: %s", dish_id, e)
-            # Include basic info even if dish details fail
+            logger.error("Error fetching dish details for %d dishes: %s", len(chunk), e)
+            failed_ids.update(str(dish_id) for dish_id in chunk)
+
+    tried_dishes = []
+    for dish_info in page:
+        dish_id = dish_info["dish_id"]
+        dish_data = dishes_by_id.get(dish_id)
+        if dish_data:
             tried_dishes.append({
-                "id": dish_id,
-                "name": "Unknown Dish",
-                "description": None,
-                "category": None,
-                "price": None,
-                "price_text": None,
+                "id": str(dish_data.get("id")),
+                "name": dish_data.get("name", "Unknown Dish"),
+                "description": dish_data.get("description"),
+                "category": dish_data.get("category"),
+                "price": dish_data.get("price"),
+                "price_text": dish_data.get("price_text"),
                 "restaurant_place_id": dish_info["restaurant_place_id"],
                 "rating": dish_info["rating"],
                 "tried_at": dish_info["tried_at"],
             })
-
-    # Sort by tried_at descending (most recent first)
-    def get_tried_at_timestamp(dish):
-        tried_at = dish.get("tried_at")
-        if not tried_at:
-            return datetime.min
-        try:
-            if isinstance(tried_at, str):
-                return datetime.fromisoformat(tried_at.replace('Z', '+00:00'))
-            return tried_at
-        except Exception:
-            return datetime.min
-
-    tried_dishes.sort(key=get_tried_at_timestamp, reverse=True)
+        elif dish_id in failed_ids or not dish_id.isdigit():
+            # Include basic info even if dish details fail
+            tried_dishes.append(_unknown_dish(dish_id, dish_info))
 
     return tried_dishes
@@ -0,0 +1,101 @@
+"""
+menuto-backend/app/services/dish_name_index.py
+
+What this is:
+- A small in-memory index for the "fuzzy" dish-name matching used during
+  recommendation enrichment: a known name matches a menu item when either
+  lowercased string contains the other.
+
+Why we keep it:
+- Enrichment used to scan every known name (popularity, ratings, behavior,
+  review sentiment) for every menu item — O(candidates × history).
+- Indexing known names by character trigrams narrows each lookup to the few
+  names that can possibly match, then verifies with the exact substring rule,
+  so results are identical to the nested scan (first match in insertion order).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Generic, List, Mapping, Optional, Set, TypeVar
+
+V = TypeVar("V")
+
+_GRAM = 3
+
+
+def normalize_dish_name(name: str) -> str:
+    return (name or "").lower()
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+class DishNameIndex(Generic[V]):
+    """
+    Maps known dish names to values and answers "which known name matches
+    this menu item?" without scanning every name.
+
+    Build once per request (or per restaurant) and reuse for every candidate.
+    """
+
+    def __init__(self, entries: Mapping[str, V]) -> None:
+        self._names: List[str] = []
+        self._values: List[V] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._gram_counts: List[int] = []
+        self._short: List[int] = []  # names shorter than one trigram
+
+        for name, value in entries.items():
+            idx = len(self._names)
+            norm = normalize_dish_name(name)
+            self._names.append(norm)
+            self._values.append(value)
+
+            grams = _grams(norm)
+            self._gram_counts.append(len(grams))
+            if not grams:
+                self._short.append(idx)
+            for g in grams:
+                self._postings.setdefault(g, []).append(idx)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def lookup(self, name: str, default: Optional[V] = None) -> Optional[V]:
+        """Return the value of the first known name matching `name`."""
+        idx = self._first_match(normalize_dish_name(name))
+        return self._values[idx] if idx is not None else default
+
+    # ------------------------------------------------------------------
+
+    def _first_match(self, query: str) -> Optional[int]:
+        if not self._names:
+            return None
+
+        query_grams = _grams(query)
+        if not query_grams:
+            # Very short query: it is a substring of most names, just scan.
+            return self._scan(query, range(len(self._names)))
+
+        # Known name inside the query: every trigram of the name must occur in
+        # the query. Count trigram hits per name and keep the complete ones.
+        hits: Dict[int, int] = {}
+        for g in query_grams:
+            for idx in self._postings.get(g, ()):
+                hits[idx] = hits.get(idx, 0) + 1
+        candidates = {idx for idx, n in hits.items() if n == self._gram_counts[idx]}
+
+        # Query inside a known name: the name must contain every query trigram,
+        # i.e. it is a complete hit from the query's side.
+        candidates.update(idx for idx, n in hits.items() if n == len(query_grams))
+        candidates.update(self._short)
+
+        return self._scan(query, sorted(candidates))
+
+    def _scan(self, query: str, indices) -> Optional[int]:
+        for idx in indices:
+            known = self._names[idx]
+            if known in query or query in known:
+                return idx
+        return None
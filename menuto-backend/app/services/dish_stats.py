@@ -0,0 +1,139 @@
+"""
+menuto-backend/app/services/dish_stats.py
+
+What this is:
+- Readers for the `dish_stats` rollup (migrations 006/007): per-dish order/view
+  counters, rating sum/count and a 30-day ring of daily order buckets, kept
+  current by triggers on every tracking insert.
+
+Why we keep it:
+- Popularity endpoints and smart recommendations used to recount raw
+  dish_orders / dish_views / dish_ratings rows on each call (O(events)).
+  Reading one rollup row per dish keeps them O(dishes).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+from supabase import Client
+
+from app.services.popularity import popularity_scores
+from app.services.rolling_counters import DailyBuckets
+
+STATS_COLUMNS = (
+    "dish_id, order_count, view_count, rating_sum, rating_count, "
+    "recent_order_count, order_buckets, buckets_day"
+)
+
+# Fewer orders than this in the last 7 days is noise, not a trend.
+TREND_MIN_WEEKLY_ORDERS = 3
+
+
+@dataclass
+class DishStats:
+    dish_id: int
+    order_count: int = 0
+    view_count: int = 0
+    rating_sum: float = 0.0
+    rating_count: int = 0
+    recent_order_count: int = 0
+    buckets: DailyBuckets = field(default_factory=DailyBuckets)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any], today: Optional[date] = None) -> "DishStats":
+        buckets = DailyBuckets(row.get("order_buckets") or [], row.get("buckets_day"))
+        return cls(
+            dish_id=int(row["dish_id"]),
+            order_count=row.get("order_count") or 0,
+            view_count=row.get("view_count") or 0,
+            rating_sum=float(row.get("rating_sum") or 0.0),
+            rating_count=row.get("rating_count") or 0,
+            # The ring re-windows itself on read; the stored column only moves on writes.
+            recent_order_count=(
+                buckets.window(30, today) if buckets.day else row.get("recent_order_count") or 0
+            ),
+            buckets=buckets,
+        )
+
+    @property
+    def avg_rating(self) -> float:
+        return self.rating_sum / self.rating_count if self.rating_count > 0 else 0.0
+
+    @property
+    def recent_order_boost(self) -> float:
+        """Share of orders in the last 30 days, scaled to max 0.3 (trending)."""
+        if self.order_count <= 0:
+            return 0.0
+        return min(self.recent_order_count / self.order_count, 1.0) * 0.3
+
+    @property
+    def is_trending(self) -> bool:
+        return self.order_count > 0 and self.recent_order_count > self.order_count * 0.5
+
+    def orders_last_7_days(self, today: Optional[date] = None) -> int:
+        return self.buckets.window(7, today)
+
+    def trend_score(self, today: Optional[date] = None) -> float:
+        """0..1 — how much faster the dish sold this week than the rest of the month."""
+        if self.buckets.window(7, today) < TREND_MIN_WEEKLY_ORDERS:
+            return 0.0
+        return max(0.0, self.buckets.momentum(7, today))
+
+
+def get_dish_stats(sb: Client, dish_id: int) -> DishStats:
+    result = sb.table("dish_stats") \
+        .select(STATS_COLUMNS) \
+        .eq("dish_id", dish_id) \
+        .maybe_single() \
+        .execute()
+    row = result.data if result else None
+    return DishStats.from_row(row) if row else DishStats(dish_id=dish_id)
+
+
+def get_dish_stats_many(sb: Client, dish_ids: Iterable[int]) -> Dict[int, DishStats]:
+    """Rollup rows for the given dishes; dishes with no events are absent."""
+    ids: List[int] = list(dish_ids)
+    if not ids:
+        return {}
+    result = sb.table("dish_stats") \
+        .select(STATS_COLUMNS) \
+        .in_("dish_id", ids) \
+        .execute()
+    return {int(r["dish_id"]): DishStats.from_row(r) for r in (result.data or [])}
+
+
+def get_restaurant_stats_by_name(sb: Client, restaurant_place_id: str) -> Dict[str, DishStats]:
+    """{dish_name: DishStats} for every dish with activity at a restaurant."""
+    result = sb.table("dish_stats") \
+        .select(f"{STATS_COLUMNS}, parsed_dishes(name)") \
+        .eq("restaurant_place_id", restaurant_place_id) \
+        .execute()
+
+    stats: Dict[str, DishStats] = {}
+    for r in (result.data or []):
+        dish = r.get("parsed_dishes")
+        if not dish or not dish.get("name"):
+            continue
+        row_stats = DishStats.from_row(r)
+        # Same dish name on several menus (re-parses): keep the busiest row
+        current = stats.get(dish["name"])
+        if current is None or row_stats.order_count > current.order_count:
+            stats[dish["name"]] = row_stats
+    return stats
+
+
+def popularity_by_name(stats: Dict[str, DishStats]) -> Dict[str, float]:
+    """Shared popularity score (app.services.popularity) for each named dish."""
+    names = list(stats)
+    rows = [stats[n] for n in names]
+    scores = popularity_scores(
+        [s.order_count for s in rows],
+        [s.view_count for s in rows],
+        [s.rating_sum for s in rows],
+        [s.rating_count for s in rows],
+        [s.recent_order_count for s in rows],
+    )
+    return {name: float(score) for name, score in zip(names, scores) if score > 0}
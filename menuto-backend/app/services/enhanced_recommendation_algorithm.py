@@ -13,9 +13,11 @@ Combines multiple signals:
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, text
+from sqlalchemy import bindparam, func, and_, text
 from datetime import datetime, timedelta
 from app.models import ParsedDish, ParsedMenu
+from app.services.popularity import popularity_scores
+import numpy as np
 import logging
 import json
 
@@ -32,6 +34,7 @@ class DishSignals:
     avg_rating: float = 0.0
     rating_count: int = 0
     recent_order_boost: float = 0.0  # Boost for recent orders (trending)
+    recent_order_count: int = 0  # Orders in the last 30 days
     price: Optional[float] = None
     categories: List[str] = None  # categories from dish.category
     
@@ -83,54 +86,70 @@ class EnhancedRecommendationAlgorithm:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_dish_signals(self, restaurant_place_id: str) -> Dict[str, DishSignals]:
-        """
-        Get aggregated behavioral signals for all dishes at a restaurant.
-        Returns dict mapping dish_id (as string) to DishSignals.
-        """
-        # Get all dishes for this restaurant
-        dishes = self.db.query(ParsedDish).join(
+    def get_restaurant_dishes(self, restaurant_place_id: str) -> List[ParsedDish]:
+        """All parsed dishes across the restaurant's menus."""
+        return self.db.query(ParsedDish).join(
             ParsedMenu, ParsedDish.menu_id == ParsedMenu.id
         ).filter(
             ParsedMenu.place_id == restaurant_place_id
         ).all()
-        
+
+    def get_dish_signals(
+        self,
+        restaurant_place_id: str,
+        dishes: Optional[List[ParsedDish]] = None,
+    ) -> Dict[str, DishSignals]:
+        """
+        Get aggregated behavioral signals for all dishes at a restaurant.
+        Returns dict mapping dish_id (as string) to DishSignals.
+
+        One GROUP BY dish_id query per event table (orders, views, ratings),
+        joined in memory — 3 round trips regardless of menu size. Pass
+        `dishes` to reuse an already loaded dish list.
+        """
+        if dishes is None:
+            dishes = self.get_restaurant_dishes(restaurant_place_id)
+
         if not dishes:
             logger.warning(f"No dishes found for restaurant {restaurant_place_id}")
             return {}
-        
-        signals = {}
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-
-        for dish in dishes:
-            dish_id_str = str(dish.id)
 
-            # Get order count (raw SQL — behavioral ORM models removed)
-            order_count = self.db.execute(
-                text("SELECT COUNT(*) FROM dish_orders WHERE dish_id = :did"),
-                {"did": dish.id}
-            ).scalar() or 0
-
-            # Get view count
-            view_count = self.db.execute(
-                text("SELECT COUNT(*) FROM dish_views WHERE dish_id = :did"),
-                {"did": dish.id}
-            ).scalar() or 0
+        dish_ids = [dish.id for dish in dishes]
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
 
-            # Get rating stats
-            rating_row = self.db.execute(
-                text("SELECT AVG(rating), COUNT(*) FROM dish_ratings WHERE dish_id = :did"),
-                {"did": dish.id}
-            ).first()
+        # Raw SQL — behavioral ORM models removed
+        order_rows = self.db.execute(
+            text(
+                "SELECT dish_id, COUNT(*), "
+                "SUM(CASE WHEN ordered_at >= :since THEN 1 ELSE 0 END) "
+                "FROM dish_orders WHERE dish_id IN :ids GROUP BY dish_id"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": dish_ids, "since": thirty_days_ago},
+        ).all()
+        view_rows = self.db.execute(
+            text(
+                "SELECT dish_id, COUNT(*) "
+                "FROM dish_views WHERE dish_id IN :ids GROUP BY dish_id"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": dish_ids},
+        ).all()
+        rating_rows = self.db.execute(
+            text(
+                "SELECT dish_id, AVG(rating), COUNT(*) "
+                "FROM dish_ratings WHERE dish_id IN :ids GROUP BY dish_id"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": dish_ids},
+        ).all()
 
-            avg_rating = float(rating_row[0]) if rating_row and rating_row[0] else 0.0
-            rating_count = (rating_row[1] if rating_row else 0) or 0
+        orders = {row[0]: (row[1] or 0, row[2] or 0) for row in order_rows}
+        views = {row[0]: row[1] or 0 for row in view_rows}
+        ratings = {row[0]: (float(row[1]) if row[1] else 0.0, row[2] or 0) for row in rating_rows}
 
-            # Recent order boost (orders in last 30 days)
-            recent_orders = self.db.execute(
-                text("SELECT COUNT(*) FROM dish_orders WHERE dish_id = :did AND ordered_at >= :since"),
-                {"did": dish.id, "since": thirty_days_ago}
-            ).scalar() or 0
+        signals = {}
+        for dish in dishes:
+            dish_id_str = str(dish.id)
+            order_count, recent_orders = orders.get(dish.id, (0, 0))
+            avg_rating, rating_count = ratings.get(dish.id, (0.0, 0))
 
             recent_order_boost = min(recent_orders / max(order_count, 1), 1.0) * 0.3  # Max 0.3 boost
 
@@ -144,10 +163,11 @@ class EnhancedRecommendationAlgorithm:
                 dish_id=dish_id_str,
                 dish_name=dish.name,
                 order_count=order_count,
-                view_count=view_count,
+                view_count=views.get(dish.id, 0),
                 avg_rating=avg_rating,
                 rating_count=rating_count,
                 recent_order_boost=recent_order_boost,
+                recent_order_count=recent_orders,
                 price=float(dish.price) if dish.price else None,
                 categories=categories
             )
@@ -158,25 +178,20 @@ class EnhancedRecommendationAlgorithm:
     def calculate_popularity_score(self, signals: DishSignals) -> float:
         """
         Calculate popularity score from behavioral signals.
-        Higher = more popular.
+        Higher = more popular. See app.services.popularity for the formula.
         """
-        # Orders are strongest signal (weight: 1.0)
-        order_score = min(signals.order_count / 10.0, 1.0) * 1.0
-        
-        # Ratings are gold standard (weight: 0.8, but only if we have enough ratings)
-        rating_score = 0.0
-        if signals.rating_count >= 3:  # Need at least 3 ratings to trust it
-            normalized_rating = (signals.avg_rating - 1.0) / 4.0  # Scale 1-5 to 0-1
-            rating_score = normalized_rating * 0.8
-        
-        # Views show interest (weight: 0.3)
-        view_score = min(signals.view_count / 50.0, 1.0) * 0.3
-        
-        # Recent orders show trending (weight: 0.2)
-        trending_boost = signals.recent_order_boost * 0.2
-        
-        total = order_score + rating_score + view_score + trending_boost
-        return min(total, 1.0)  # Cap at 1.0
+        return float(self.calculate_popularity_scores([signals])[0])
+
+    @staticmethod
+    def calculate_popularity_scores(signals: List[DishSignals]) -> np.ndarray:
+        """Popularity for many dishes in one vectorized pass."""
+        return popularity_scores(
+            [s.order_count for s in signals],
+            [s.view_count for s in signals],
+            [s.avg_rating * s.rating_count for s in signals],
+            [s.rating_count for s in signals],
+            [s.recent_order_count for s in signals],
+        )
     
     def calculate_taste_match_score(
         self, 
@@ -293,31 +308,29 @@ class EnhancedRecommendationAlgorithm:
             cravings = []
         
         # Get all dishes for restaurant
-        dishes = self.db.query(ParsedDish).join(
-            ParsedMenu, ParsedDish.menu_id == ParsedMenu.id
-        ).filter(
-            ParsedMenu.place_id == restaurant_place_id
-        ).all()
+        dishes = self.get_restaurant_dishes(restaurant_place_id)
         
         if not dishes:
             logger.warning(f"No dishes found for restaurant {restaurant_place_id}")
             return []
         
-        # Get behavioral signals
-        signals_dict = self.get_dish_signals(restaurant_place_id)
+        # Get behavioral signals (reuses the dish list — no second dish query)
+        signals_dict = self.get_dish_signals(restaurant_place_id, dishes=dishes)
         
+        dish_signals = [
+            signals_dict.get(str(dish.id), DishSignals(dish_id=str(dish.id), dish_name=dish.name))
+            for dish in dishes
+        ]
+        # Popularity for the whole menu at once
+        popularity = self.calculate_popularity_scores(dish_signals)
+
         # Score each dish
         scored_dishes = []
         
-        for dish in dishes:
+        for dish, signals, popularity_score in zip(dishes, dish_signals, popularity.tolist()):
             dish_id_str = str(dish.id)
-            signals = signals_dict.get(dish_id_str, DishSignals(
-                dish_id=dish_id_str,
-                dish_name=dish.name
-            ))
             
             # Calculate component scores
-            popularity_score = self.calculate_popularity_score(signals)
             taste_match_score = self.calculate_taste_match_score(dish, user_favorites, taste_profile)
             contextual_score = self.calculate_contextual_score(dish, hunger_level, cravings)
             
@@ -0,0 +1,187 @@
+"""
+menuto-backend/app/services/event_buffer.py
+
+What this is:
+- `WriteBehindBuffer`: an in-process, bounded write-behind queue for
+  low-value rows (dish views). Rows are accepted immediately and written in
+  bulk by a background thread when the batch fills up or the flush interval
+  elapses.
+
+Why we keep it:
+- View tracking is fire-and-forget for the app, yet each request used to wait
+  on a Supabase insert. Buffering makes the endpoint return without I/O and
+  turns N single-row inserts into a handful of bulk inserts.
+
+Notes:
+- Backpressure: once `max_pending` rows are queued (DB slow or down), the
+  oldest rows are dropped with a warning and the flusher is woken; `add()`
+  never does I/O itself once the buffer is started.
+- A failed bulk insert is bisected to isolate bad rows (e.g. a foreign-key
+  violation) so the rest of the batch still lands. A row that fails on its
+  own is retried on later cycles and dropped after `max_row_attempts`.
+  Bisection is capped per flush so an outage doesn't multiply writes.
+- `on_written` is called with each batch after it is stored, e.g. to
+  invalidate caches derived from the table.
+- `close()` stops the thread and flushes what's left — call it on shutdown.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+
+# Extra writer calls one flush may spend isolating bad rows
+_BISECT_BUDGET = 16
+
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        name: str,
+        writer: Callable[[List[Row]], Any],
+        batch_size: int = 100,
+        flush_interval_s: float = 2.0,
+        max_pending: int = 5000,
+        max_row_attempts: int = 3,
+        on_written: Optional[Callable[[List[Row]], Any]] = None,
+    ) -> None:
+        self.name = name
+        self._writer = writer
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_pending = max_pending
+        self.max_row_attempts = max_row_attempts
+        self._on_written = on_written
+
+        self._pending: List[Row] = []
+        # id(row) -> times it failed on its own; entries leave with their row
+        self._attempts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one writer at a time
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"write-behind-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def add(self, row: Row) -> None:
+        """Queue one row. Never raises and, once started, never blocks on I/O."""
+        with self._lock:
+            self._pending.append(row)
+            pending = len(self._pending)
+
+        if self._thread is None:
+            # Not started (tests/scripts): write now.
+            self.flush()
+            return
+        if not self._thread.is_alive() and not self._stopped.is_set():
+            self.start()
+        if pending > self.max_pending:
+            self._trim()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything queued. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            budget = [_BISECT_BUDGET]
+            written: List[Row] = []
+            failed: List[Row] = []
+            for i in range(0, len(batch), self.batch_size):
+                self._write(batch[i:i + self.batch_size], written, failed, budget)
+
+            if written:
+                for row in written:
+                    self._attempts.pop(id(row), None)
+                if self._on_written is not None:
+                    try:
+                        self._on_written(written)
+                    except Exception as e:
+                        logger.warning("%s buffer: on_written callback failed: %s", self.name, e)
+            if failed:
+                self._requeue(failed)
+            return len(written)
+
+    def _write(self, rows: List[Row], written: List[Row], failed: List[Row], budget: List[int]) -> None:
+        """Write `rows`, bisecting on failure while budget remains."""
+        try:
+            self._writer(rows)
+            written.extend(rows)
+            return
+        except Exception as e:
+            error = e
+
+        if len(rows) == 1:
+            row = rows[0]
+            attempts = self._attempts.get(id(row), 0) + 1
+            if attempts >= self.max_row_attempts:
+                self._attempts.pop(id(row), None)
+                logger.warning("%s buffer: dropping row after %d failed attempts: %s (%s)",
+                               self.name, attempts, row, error)
+            else:
+                self._attempts[id(row)] = attempts
+                failed.append(row)
+            return
+
+        if budget[0] < 2:
+            # Out of isolation budget (likely an outage): retry the whole chunk next cycle
+            logger.warning("%s buffer: flush of %d rows failed: %s", self.name, len(rows), error)
+            failed.extend(rows)
+            return
+        budget[0] -= 2
+        mid = len(rows) // 2
+        self._write(rows[:mid], written, failed, budget)
+        self._write(rows[mid:], written, failed, budget)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the background thread and flush remaining rows."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.flush()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _requeue(self, rows: List[Row]) -> None:
+        with self._lock:
+            self._pending = rows + self._pending
+        self._trim()
+
+    def _trim(self) -> None:
+        with self._lock:
+            overflow = len(self._pending) - self.max_pending
+            if overflow <= 0:
+                return
+            dropped, self._pending = self._pending[:overflow], self._pending[overflow:]
+            for row in dropped:
+                self._attempts.pop(id(row), None)
+        logger.warning("%s buffer full: dropped %d oldest rows", self.name, overflow)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:  # keep the flusher alive no matter what
+                logger.warning("%s buffer: flush cycle failed: %s", self.name, e)
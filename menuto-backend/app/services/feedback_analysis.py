@@ -0,0 +1,233 @@
+"""
+menuto-backend/app/services/feedback_analysis.py
+
+What this is:
+- Background extraction of taste signals (liked/disliked keywords,
+  spice/portion feedback) from rating feedback text with Gemini.
+- `FeedbackAnalysisWorker` drains `dish_ratings` rows whose
+  taste_signals_status is 'pending' (migration 008), several per Gemini call.
+
+Why we keep it:
+- /track/rating used to call Gemini before responding, so submitting a rating
+  took seconds. The rating is now stored immediately and analyzed here.
+- dish_ratings is the queue: pending work survives restarts and is shared by
+  every API instance; claims use the next-attempt timestamp as a lease.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from supabase import Client
+
+from app.services.recommendation_cache import invalidate_user_recommendations
+
+logger = logging.getLogger(__name__)
+
+FEEDBACK_BATCH_SIZE = int(os.getenv("FEEDBACK_ANALYSIS_BATCH_SIZE", "8"))
+FEEDBACK_POLL_SECONDS = float(os.getenv("FEEDBACK_ANALYSIS_POLL_SECONDS", "30"))
+FEEDBACK_MAX_ATTEMPTS = int(os.getenv("FEEDBACK_ANALYSIS_MAX_ATTEMPTS", "5"))
+# Wait this long after a new rating so concurrent submissions share one call
+FEEDBACK_LINGER_SECONDS = 1.0
+# A claimed row is invisible to other workers for this long
+CLAIM_LEASE_SECONDS = 120
+
+_SIGNALS_SCHEMA = """{
+    "liked": ["specific things they liked, e.g. creamy texture, fresh basil"],
+    "disliked": ["specific things they disliked, e.g. too salty, overcooked"],
+    "spice_feedback": "perfect" | "too_mild" | "too_hot" | null,
+    "portion_feedback": "too_small" | "just_right" | "too_large" | null,
+    "flavor_keywords": ["rich", "tangy", "smoky"],
+    "would_recommend_to": ["spice_lovers", "comfort_food_fans"]
+}"""
+
+
+def build_batch_prompt(items: List[Dict[str, Any]]) -> str:
+    """items: [{"id", "dish_name", "rating", "feedback_text"}]"""
+    entries = "\n\n".join(
+        f'[{item["id"]}]\nDish: {item["dish_name"]}\nRating: {item["rating"]}/5\n'
+        f'Feedback: "{item["feedback_text"]}"'
+        for item in items
+    )
+    return f"""Analyze each restaurant dish feedback below and extract taste signals.
+
+{entries}
+
+Return one JSON object keyed by the id in brackets, each value shaped like:
+{_SIGNALS_SCHEMA}
+
+Only include fields with actual information from that feedback. Return ONLY JSON."""
+
+
+def analyze_feedback_batch(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """One Gemini call for many feedback texts. Returns {str(rating_id): signals}."""
+    api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
+    if not api_key:
+        raise RuntimeError("GOOGLE_GEMINI_API_KEY not set")
+
+    from google import genai
+
+    client = genai.Client(api_key=api_key)
+    response = client.models.generate_content(
+        model='gemini-2.5-flash',
+        contents=build_batch_prompt(items),
+        config=genai.types.GenerateContentConfig(
+            temperature=0.1,
+            response_mime_type="application/json",
+        ),
+    )
+    parsed = json.loads(response.text)
+    if not isinstance(parsed, dict):
+        raise ValueError("expected a JSON object keyed by rating id")
+    return {str(k).strip("[]"): v for k, v in parsed.items() if isinstance(v, dict)}
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(30 * 2 ** attempts, 6 * 3600))
+
+
+class FeedbackAnalysisWorker:
+    def __init__(
+        self,
+        sb: Client,
+        batch_size: int = FEEDBACK_BATCH_SIZE,
+        poll_interval_s: float = FEEDBACK_POLL_SECONDS,
+        max_attempts: int = FEEDBACK_MAX_ATTEMPTS,
+        analyze=analyze_feedback_batch,
+    ) -> None:
+        self.sb = sb
+        self.batch_size = batch_size
+        self.poll_interval_s = poll_interval_s
+        self.max_attempts = max_attempts
+        self._analyze = analyze
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="feedback-analysis", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop after the current batch; unfinished rows stay pending in the table."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def notify(self) -> None:
+        """A new pending rating was stored — process it soon."""
+        self._wake.set()
+
+    def run_once(self) -> int:
+        """Claim and analyze one batch. Returns the number of rows claimed."""
+        claimed = self._claim()
+        rows = [r for r in claimed if (r.get("feedback_text") or "").strip()]
+        for r in claimed:
+            if r not in rows:
+                # Nothing to analyze — take it off the queue
+                self.sb.table("dish_ratings").update({"taste_signals_status": None}).eq("id", r["id"]).execute()
+        if not rows:
+            return len(claimed)
+
+        dish_names = self._dish_names({r["dish_id"] for r in rows})
+        items = [
+            {
+                "id": r["id"],
+                "dish_name": dish_names.get(r["dish_id"], str(r["dish_id"])),
+                "rating": r["rating"],
+                "feedback_text": r["feedback_text"],
+            }
+            for r in rows
+        ]
+
+        try:
+            results = self._analyze(items)
+        except Exception as e:
+            logger.warning("Feedback analysis batch of %d failed: %s", len(rows), e)
+            results = {}
+
+        for r in rows:
+            signals = results.get(str(r["id"]))
+            try:
+                if signals is not None:
+                    self.sb.table("dish_ratings").update({
+                        "taste_signals": json.dumps(signals),
+                        "taste_signals_status": "done",
+                    }).eq("id", r["id"]).execute()
+                    invalidate_user_recommendations(r.get("user_id"))
+                else:
+                    self._record_failure(r)
+            except Exception as e:
+                logger.warning("Failed to store taste signals for rating %s: %s", r["id"], e)
+
+        logger.info(
+            "Analyzed feedback batch: %d/%d rows got taste signals",
+            sum(1 for r in rows if str(r["id"]) in results), len(rows),
+        )
+        return len(claimed)
+
+    def _claim(self) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        due = self.sb.table("dish_ratings") \
+            .select("id") \
+            .eq("taste_signals_status", "pending") \
+            .lte("taste_signals_next_attempt_at", now.isoformat()) \
+            .order("taste_signals_next_attempt_at") \
+            .limit(self.batch_size) \
+            .execute()
+        ids = [r["id"] for r in (due.data or [])]
+        if not ids:
+            return []
+
+        # Conditional update = atomic claim; rows another worker took are not returned
+        claimed = self.sb.table("dish_ratings") \
+            .update({"taste_signals_next_attempt_at": (now + timedelta(seconds=CLAIM_LEASE_SECONDS)).isoformat()}) \
+            .in_("id", ids) \
+            .eq("taste_signals_status", "pending") \
+            .lte("taste_signals_next_attempt_at", now.isoformat()) \
+            .execute()
+        return claimed.data or []
+
+    def _dish_names(self, dish_ids) -> Dict[int, str]:
+        try:
+            result = self.sb.table("parsed_dishes").select("id, name").in_("id", list(dish_ids)).execute()
+            return {d["id"]: d["name"] for d in (result.data or []) if d.get("name")}
+        except Exception as e:
+            logger.warning("Dish name lookup for feedback analysis failed: %s", e)
+            return {}
+
+    def _record_failure(self, row: Dict[str, Any]) -> None:
+        attempts = (row.get("taste_signals_attempts") or 0) + 1
+        update: Dict[str, Any] = {"taste_signals_attempts": attempts}
+        if attempts >= self.max_attempts:
+            update["taste_signals_status"] = "failed"
+        else:
+            update["taste_signals_next_attempt_at"] = (
+                datetime.now(timezone.utc) + _retry_delay(attempts)
+            ).isoformat()
+        self.sb.table("dish_ratings").update(update).eq("id", row["id"]).execute()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            woken = self._wake.wait(self.poll_interval_s)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            if woken:
+                self._stopped.wait(FEEDBACK_LINGER_SECONDS)
+            try:
+                # Drain full batches back to back
+                while self.run_once() >= self.batch_size and not self._stopped.is_set():
+                    pass
+            except Exception as e:
+                logger.warning("Feedback analysis worker cycle failed: %s", e)
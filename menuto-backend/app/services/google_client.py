@@ -0,0 +1,185 @@
+"""
+menuto-backend/app/services/google_client.py
+
+What this is:
+- One shared `httpx.AsyncClient` for Google Maps/Places web APIs, with
+  connection pooling, timeouts, retry with jittered backoff, and a rate
+  limiter that also slows down when Google reports quota pressure.
+- The client runs on its own event-loop thread so sync callers (review
+  ingestion, the legacy RecommendationEngine) and async routes (places
+  search) can share the same pool: `get_json()` blocks, `aget_json()` awaits.
+
+Why we keep it:
+- Each call site used to open its own client (or bare `requests.get` with no
+  timeout), paying a TLS handshake per call and retrying nothing. Started and
+  closed with the app in main.py; starts lazily for scripts and tests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_API_TIMEOUT_SECONDS = float(os.getenv("GOOGLE_API_TIMEOUT_SECONDS", "10"))
+GOOGLE_API_MAX_CONNECTIONS = int(os.getenv("GOOGLE_API_MAX_CONNECTIONS", "20"))
+GOOGLE_API_MAX_RETRIES = int(os.getenv("GOOGLE_API_MAX_RETRIES", "3"))
+GOOGLE_API_REQUESTS_PER_SECOND = float(os.getenv("GOOGLE_API_REQUESTS_PER_SECOND", "20"))
+
+PLACE_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+TEXT_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+
+_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Google reports these in the JSON body with HTTP 200
+_RETRY_API_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+_MAX_BACKOFF_SECONDS = 8.0
+
+
+class _AsyncRateLimiter:
+    """Evenly spaced request slots; `penalize` pushes every slot back after a quota error."""
+
+    def __init__(self, rate_per_s: float) -> None:
+        self.interval = 1.0 / rate_per_s if rate_per_s > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, seconds: float) -> None:
+        self._next = max(self._next, time.monotonic() + seconds)
+
+
+class GoogleApiClient:
+    def __init__(
+        self,
+        timeout_s: float = GOOGLE_API_TIMEOUT_SECONDS,
+        max_connections: int = GOOGLE_API_MAX_CONNECTIONS,
+        max_retries: int = GOOGLE_API_MAX_RETRIES,
+        requests_per_second: float = GOOGLE_API_REQUESTS_PER_SECOND,
+        backoff_base_s: float = 0.5,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.timeout_s = timeout_s
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.requests_per_second = requests_per_second
+        self.backoff_base_s = backoff_base_s
+        self._transport = transport
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limiter: Optional[_AsyncRateLimiter] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                self._client = httpx.AsyncClient(
+                    timeout=self.timeout_s,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                    transport=self._transport,
+                )
+                self._limiter = _AsyncRateLimiter(self.requests_per_second)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._loop = loop
+            self._thread = threading.Thread(target=run, name="google-api", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def close(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if not loop or not thread:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result(timeout)
+            except Exception as e:
+                logger.warning("Closing Google API client failed: %s", e)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            loop.close()
+            self._loop = self._thread = self._client = self._limiter = None
+
+    def get_json(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Blocking GET from any thread. Raises once retries are exhausted."""
+        return self._submit(url, params).result()
+
+    async def aget_json(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Awaitable GET from any event loop."""
+        return await asyncio.wrap_future(self._submit(url, params))
+
+    def _submit(self, url: str, params: Dict[str, Any]) -> Future:
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._get_json(url, params), self._loop)
+
+    async def _get_json(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            await self._limiter.acquire()
+            retry_after: Optional[float] = None
+            try:
+                resp = await self._client.get(url, params=params)
+                if resp.status_code not in _RETRY_STATUS_CODES:
+                    resp.raise_for_status()
+                    data = resp.json()
+                    if data.get("status") not in _RETRY_API_STATUSES:
+                        return data
+                    reason: Any = data.get("status")
+                else:
+                    reason = resp.status_code
+                    retry_after = _retry_after_seconds(resp)
+                if attempt >= self.max_retries:
+                    if isinstance(reason, int):
+                        resp.raise_for_status()
+                    return data
+            except httpx.TransportError as e:
+                reason = type(e).__name__
+                if attempt >= self.max_retries:
+                    raise
+
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            if reason in (429, "OVER_QUERY_LIMIT"):
+                self._limiter.penalize(delay)  # quota pressure: slow every caller, not just this one
+            logger.info("Google API %s, retrying in %.2fs (attempt %d)", reason, delay, attempt + 1)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps concurrent retries from re-synchronizing
+        return random.uniform(0, min(self.backoff_base_s * 2 ** attempt, _MAX_BACKOFF_SECONDS))
+
+
+def _retry_after_seconds(resp: httpx.Response) -> Optional[float]:
+    try:
+        return min(float(resp.headers["Retry-After"]), _MAX_BACKOFF_SECONDS)
+    except (KeyError, ValueError):
+        return None
+
+
+google_api = GoogleApiClient()
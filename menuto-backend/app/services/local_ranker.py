@@ -0,0 +1,333 @@
+"""
+menuto-backend/app/services/local_ranker.py
+
+What this is:
+- Fast, deterministic scoring of enriched recommendation candidates (the dicts
+  built by SmartRecommendationAlgorithm._enrich_with_signals).
+- `prerank`: the top-K shortlist shown to the Gemini agent.
+- `LocalRanker`: a complete LLM-free ranker (weighted scorer + meal-structure
+  aware MMR rerank + templated explanations).
+
+Why we keep it:
+- The Gemini agent only sees a shortlist of the menu. Picking that shortlist by
+  local signals (taste similarity, popularity, cravings, feedback keywords,
+  history) instead of menu row order keeps strong dishes in the prompt and lets
+  us shrink the shortlist to cut prompt tokens and agent latency.
+- When Gemini is slow or over quota, LocalRanker still respects cravings,
+  course structure, behavior and dislikes, with bounded latency.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from app.services.recommendation_types import (
+    HungerLevel,
+    ItemFeatures,
+    RecommendationContext,
+    ScoredItem,
+)
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "taste_similarity": 0.35,
+    "popularity": 0.20,
+    "trending": 0.05,
+    "review_sentiment": 0.15,
+    "craving": 0.15,
+    "liked_keywords": 0.05,
+    "disliked_keywords": -0.20,
+    "past_rating": 0.10,
+    "behavior": 0.10,
+}
+
+
+def validate_weights(weights: Any) -> Optional[Dict[str, float]]:
+    """
+    Caller-supplied overrides of DEFAULT_WEIGHTS as {name: float}, or None.
+    Raises ValueError for unknown names or non-numeric / non-finite values.
+    """
+    if weights is None:
+        return None
+    if not isinstance(weights, dict):
+        raise ValueError("ranker_weights must be an object of weight name -> number")
+    unknown = sorted(str(k) for k in weights if k not in DEFAULT_WEIGHTS)
+    if unknown:
+        raise ValueError(
+            f"unknown ranker_weights: {', '.join(unknown)} "
+            f"(allowed: {', '.join(DEFAULT_WEIGHTS)})"
+        )
+    validated: Dict[str, float] = {}
+    for name, value in weights.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"ranker_weights.{name} must be a finite number")
+        validated[name] = float(value)
+    return validated
+
+
+def _behavior_signal(behavior: Optional[Dict[str, Any]]) -> float:
+    """-1..1: favorites/reorders are positive, repeated views without an order negative."""
+    if not behavior:
+        return 0.0
+    orders = behavior.get("orders", 0)
+    views = behavior.get("views", 0)
+    if behavior.get("favorited"):
+        return 1.0
+    if orders >= 2:
+        return 0.8
+    if orders == 1:
+        return 0.4
+    if views >= 3:
+        return -0.5
+    return 0.0
+
+
+def _past_rating_signal(rating: Optional[float]) -> float:
+    """-1..1 centred on a 3-star rating."""
+    if rating is None:
+        return 0.0
+    return max(-1.0, min(1.0, (rating - 3.0) / 2.0))
+
+
+def score_candidate(e: Dict[str, Any], weights: Optional[Dict[str, float]] = None) -> float:
+    w = weights or DEFAULT_WEIGHTS
+    return (
+        w.get("taste_similarity", 0.0) * e["taste_similarity"]
+        + w.get("popularity", 0.0) * e["popularity"]
+        + w.get("trending", 0.0) * e.get("trending", 0.0)
+        + w.get("review_sentiment", 0.0) * (e["review_sentiment"] or 0.0)
+        + w.get("craving", 0.0) * (1.0 if e["craving_match"] else 0.0)
+        + w.get("liked_keywords", 0.0) * min(len(e["liked_keywords_found"]), 3)
+        + w.get("disliked_keywords", 0.0) * min(len(e["disliked_keywords_found"]), 3)
+        + w.get("past_rating", 0.0) * _past_rating_signal(e["past_rating"])
+        + w.get("behavior", 0.0) * _behavior_signal(e["behavior"])
+    )
+
+
+def prerank(
+    enriched: List[Dict[str, Any]],
+    k: int,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Pick the top-k candidates by local score, keeping the best dish of every
+    course in the shortlist so the agent can still build a full meal.
+    Returned in descending score order.
+    """
+    if k <= 0 or len(enriched) <= k:
+        return sorted(enriched, key=lambda e: -score_candidate(e, weights))
+
+    ranked = sorted(enriched, key=lambda e: -score_candidate(e, weights))
+
+    chosen: List[int] = []
+    seen_courses: set[str] = set()
+    for i, e in enumerate(ranked):
+        if e["course"] not in seen_courses:
+            seen_courses.add(e["course"])
+            chosen.append(i)
+    chosen = chosen[:k]
+
+    picked = set(chosen)
+    for i in range(len(ranked)):
+        if len(chosen) >= k:
+            break
+        if i not in picked:
+            chosen.append(i)
+
+    return [ranked[i] for i in sorted(chosen)]
+
+
+# ---------------------------------------------------------------------------
+# Full local ranking
+# ---------------------------------------------------------------------------
+
+# How many dishes of each course make a sensible meal, by hunger level.
+# Courses not listed (e.g. "unknown", "pasta") are capped by "other".
+_COURSE_CAPS: Dict[HungerLevel, Dict[str, int]] = {
+    HungerLevel.LIGHT: {"starter": 2, "side": 2, "main": 1, "dessert": 1, "drink": 0, "other": 2},
+    HungerLevel.NORMAL: {"starter": 1, "side": 1, "main": 3, "dessert": 1, "drink": 0, "other": 2},
+    HungerLevel.STARVING: {"starter": 2, "side": 1, "main": 3, "dessert": 1, "drink": 0, "other": 2},
+}
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def _name_tokens(e: Dict[str, Any]) -> Set[str]:
+    return {w for w in _WORD_RE.findall(e["item"].name.lower()) if len(w) > 2}
+
+
+def lexical_taste_similarity(
+    candidates: List[ItemFeatures],
+    liked_dish_names: List[str],
+) -> Dict[str, float]:
+    """
+    LLM-free stand-in for embedding similarity: word overlap between each
+    dish and the user's liked dishes, on the same 0-1 scale. No overlap is
+    0.5, the neutral score used for dishes without an embedding; word overlap
+    only raises it (absence of shared words is no evidence of dislike).
+    """
+    liked = [
+        {w for w in _WORD_RE.findall(name.lower()) if len(w) > 2}
+        for name in liked_dish_names
+    ]
+    liked = [tokens for tokens in liked if tokens]
+    if not liked:
+        return {}
+
+    scores: Dict[str, float] = {}
+    for item in candidates:
+        words = {
+            w for w in _WORD_RE.findall(f"{item.name} {item.description}".lower())
+            if len(w) > 2
+        }
+        overlap = max(
+            (len(words & tokens) / min(len(words), len(tokens)) for tokens in liked if words),
+            default=0.0,
+        )
+        scores[item.item_id] = round(0.5 + 0.5 * overlap, 3)
+    return scores
+
+
+def _dish_similarity(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    """0..1 — how redundant two dishes are on the same plate."""
+    sim = 0.0
+    if a["course"] == b["course"]:
+        sim += 0.4
+    pa, pb = a["item"].protein, b["item"].protein
+    if pa and pa == pb:
+        sim += 0.3
+    ta, tb = _name_tokens(a), _name_tokens(b)
+    if ta and tb:
+        sim += 0.3 * len(ta & tb) / len(ta | tb)
+    return min(sim, 1.0)
+
+
+class LocalRanker:
+    """
+    Deterministic ranker used when the agent is skipped or fails.
+
+    1. Weighted score per candidate (see DEFAULT_WEIGHTS); dishes the user
+       rated 2★ or lower are dropped.
+    2. MMR selection: relevance vs. redundancy with already-picked dishes,
+       under per-course caps derived from hunger level, with a bonus for
+       the first craving match.
+    """
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        diversity: float = 0.3,
+    ) -> None:
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.diversity = diversity
+
+    def rank(
+        self,
+        enriched: List[Dict[str, Any]],
+        context: RecommendationContext,
+        limit: int,
+    ) -> List[ScoredItem]:
+        pool = [
+            e for e in enriched
+            if e["past_rating"] is None or e["past_rating"] > 2
+        ] or list(enriched)
+        scores = {id(e): score_candidate(e, self.weights) for e in pool}
+
+        caps = _COURSE_CAPS.get(context.hunger_level, _COURSE_CAPS[HungerLevel.NORMAL])
+        picked: List[Dict[str, Any]] = []
+        course_counts: Dict[str, int] = {}
+        has_craving = False
+        relaxed = False
+
+        def cap_for(course: str) -> int:
+            return caps.get(course, caps["other"])
+
+        while len(picked) < limit:
+            best, best_value = None, float("-inf")
+            for e in pool:
+                if any(e is p for p in picked):
+                    continue
+                course = e["course"]
+                if course_counts.get(course, 0) >= cap_for(course):
+                    continue
+                redundancy = max((_dish_similarity(e, p) for p in picked), default=0.0)
+                value = (1 - self.diversity) * scores[id(e)] - self.diversity * redundancy
+                if e["craving_match"] and not has_craving:
+                    value += self.weights.get("craving", 0.0)
+                if value > best_value:
+                    best, best_value = e, value
+            if best is None:
+                # Course caps exhausted — relax them rather than return too few.
+                if relaxed:
+                    break
+                relaxed = True
+                caps = {k: len(pool) for k in caps}
+                continue
+            picked.append(best)
+            course_counts[best["course"]] = course_counts.get(best["course"], 0) + 1
+            has_craving = has_craving or best["craving_match"]
+
+        discovery = self._pick_discovery(picked)
+        return [
+            ScoredItem(
+                item=e["item"],
+                components={
+                    "taste_similarity": e["taste_similarity"],
+                    "popularity": e["popularity"],
+                    "review_sentiment": e["review_sentiment"] or 0,
+                },
+                score=round(scores[id(e)], 3),
+                explanations=[self._explain(e, context)],
+                is_discovery=e is discovery,
+            )
+            for e in picked
+        ]
+
+    @staticmethod
+    def _pick_discovery(picked: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """A dish outside their usual taste that the crowd rates highly."""
+        for e in picked:
+            untried = e["behavior"] is None and e["past_rating"] is None
+            crowd = max(e["popularity"], e["review_sentiment"] or 0.0)
+            # 0.5 is neutral (no overlap with their favorites, or no embedding)
+            if untried and e["taste_similarity"] <= 0.5 and crowd >= 0.6:
+                return e
+        return None
+
+    @staticmethod
+    def _explain(e: Dict[str, Any], context: RecommendationContext) -> str:
+        reasons: List[str] = []
+        behavior = e["behavior"] or {}
+        if e["craving_match"]:
+            craving = next(
+                (c for c in context.craving_tags
+                 if c.lower() in f"{e['item'].name} {e['item'].description}".lower()),
+                None,
+            )
+            reasons.append(f"hits your craving for {craving.lower()}" if craving else "matches what you're craving")
+        if behavior.get("favorited"):
+            reasons.append("it's one of your favorites")
+        elif e["past_rating"] is not None and e["past_rating"] >= 4:
+            reasons.append(f"you gave it {e['past_rating']:g}★ last time")
+        elif behavior.get("orders", 0) >= 2:
+            reasons.append("you keep coming back to it")
+        if e["liked_keywords_found"]:
+            reasons.append(f"it's {', '.join(e['liked_keywords_found'][:2])} — flavors you've loved before")
+        if e["taste_similarity"] >= 0.6:
+            reasons.append("it's close to the dishes you usually love")
+        if e["popularity"] >= 0.5:
+            reasons.append("it's one of the most ordered dishes here")
+        elif e.get("trending", 0.0) >= 0.5:
+            reasons.append("it's been trending here this week")
+        if (e["review_sentiment"] or 0) >= 0.7:
+            reasons.append("reviewers rave about it")
+
+        if not reasons:
+            reasons.append("it rounds out the meal nicely")
+        text = reasons[0][0].upper() + reasons[0][1:]
+        if len(reasons) > 1:
+            text += ", and " + reasons[1]
+        if e["course"] == "dessert":
+            text += " — save it for after"
+        return text + "."
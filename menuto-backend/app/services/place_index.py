@@ -0,0 +1,246 @@
+"""
+menuto-backend/app/services/place_index.py
+
+What this is:
+- In-memory trigram index over restaurant names in `parsed_menus`, rebuilt
+  from Supabase every PLACE_INDEX_REFRESH_SECONDS (in the background once
+  built). Search scores by trigram overlap with a bonus for word-prefix matches.
+- The authority on `has_menu`: a place is marked as having a menu only if a
+  parsed menu exists for its place_id (or, lacking one, its exact name).
+
+Why we keep it:
+- Restaurant search used to run `ilike '%query%'` over parsed_menus on every
+  keystroke, and places search claimed every Google result had a menu. Local
+  matches are by name only, so with a Places key they are merged with the
+  location-aware Google results rather than replacing them.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+PLACE_INDEX_REFRESH_SECONDS = float(os.getenv("PLACE_INDEX_REFRESH_SECONDS", "300"))
+# After a failed build/refresh, don't hit Supabase again for this long
+PLACE_INDEX_RETRY_SECONDS = float(os.getenv("PLACE_INDEX_RETRY_SECONDS", "60"))
+# Weaker trigram matches are not returned at all
+_MIN_MATCH_SCORE = 0.3
+_PAGE_SIZE = 1000
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(re.findall(r"\w+", (name or "").lower()))
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class PlaceEntry:
+    key: str  # Google place_id, or menu_<id> for menus saved without one
+    name: str
+    place_id: Optional[str]
+    menu_id: int
+    cuisine_type: str
+    vicinity: str
+
+    def as_search_result(self) -> Dict[str, Any]:
+        return {
+            "place_id": self.key,
+            "name": self.name,
+            "vicinity": self.vicinity or "Menu available",
+            "cuisine_type": self.cuisine_type or "restaurant",
+            "rating": 4.0,  # Default rating
+            "price_level": None,
+            "has_menu": True,
+        }
+
+
+class PlaceIndex:
+    def __init__(
+        self,
+        refresh_seconds: float = PLACE_INDEX_REFRESH_SECONDS,
+        retry_seconds: float = PLACE_INDEX_RETRY_SECONDS,
+    ) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self._entries: List[PlaceEntry] = []
+        self._norm_names: List[str] = []
+        self._grams: Dict[str, List[int]] = {}
+        self._place_ids: Set[str] = set()
+        self._names: Set[str] = set()
+        self._built_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._stale = False
+        self._refreshing = threading.Lock()
+
+    # -- building ---------------------------------------------------------
+
+    def build(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Replace the index with parsed_menus rows (newest menu per place wins)."""
+        by_key: Dict[str, PlaceEntry] = {}
+        for row in rows:
+            name = (row.get("restaurant_name") or "").strip()
+            if not name:
+                continue
+            place_id = row.get("place_id") or None
+            key = place_id or f"name:{normalize_name(name)}"
+            current = by_key.get(key)
+            if current is None or row["id"] > current.menu_id:
+                by_key[key] = PlaceEntry(
+                    key=place_id or f"menu_{row['id']}",
+                    name=name,
+                    place_id=place_id,
+                    menu_id=row["id"],
+                    cuisine_type=row.get("cuisine_type") or "restaurant",
+                    vicinity=row.get("restaurant_url") or "",
+                )
+
+        entries = list(by_key.values())
+        norm_names = [normalize_name(e.name) for e in entries]
+        grams: Dict[str, List[int]] = defaultdict(list)
+        for i, norm in enumerate(norm_names):
+            for g in trigrams(norm):
+                grams[g].append(i)
+
+        # Swap in one go so concurrent searches see either the old or the new index
+        self._entries, self._norm_names, self._grams = entries, norm_names, dict(grams)
+        self._place_ids = {e.place_id for e in entries if e.place_id}
+        self._names = {n for e, n in zip(entries, norm_names) if not e.place_id}
+        self._built_at = time.monotonic()
+
+    def refresh(self, sb: Optional[Client]) -> None:
+        if not sb:
+            return
+        # Cleared up front so a menu saved while we page through still marks us stale
+        self._stale = False
+        rows: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = (
+                sb.table("parsed_menus")
+                # "*": older databases have no place_id column (build() treats it as None)
+                .select("*")
+                .order("id")
+                .range(offset, offset + _PAGE_SIZE - 1)
+                .execute()
+            ).data or []
+            rows.extend(page)
+            if len(page) < _PAGE_SIZE:
+                break
+            offset += _PAGE_SIZE
+        self.build(rows)
+        logger.info("Place index rebuilt: %d restaurants from %d menus", len(self._entries), len(rows))
+
+    def ensure_fresh(self, sb: Optional[Client]) -> bool:
+        """Build on first use (blocking); afterwards refresh stale indexes in the background.
+        Failures back off for retry_seconds. Returns False if there is no usable index."""
+        if self._built_at is None:
+            if self._backing_off():
+                return False
+            with self._refreshing:
+                if self._built_at is None and not self._backing_off():
+                    self._refresh_logged(sb)
+            return self._built_at is not None
+
+        expired = self._stale or time.monotonic() - self._built_at > self.refresh_seconds
+        if expired and not self._backing_off() and self._refreshing.acquire(blocking=False):
+            def run() -> None:
+                try:
+                    self._refresh_logged(sb)
+                finally:
+                    self._refreshing.release()
+
+            threading.Thread(target=run, name="place-index-refresh", daemon=True).start()
+        return True
+
+    def mark_stale(self, place_id: Optional[str] = None, name: Optional[str] = None) -> None:
+        """A menu was just saved: answer has_menu for it now and rebuild on next use."""
+        if place_id:
+            self._place_ids = self._place_ids | {place_id}
+        elif name:
+            self._names = self._names | {normalize_name(name)}
+        self._stale = True
+
+    def _refresh_logged(self, sb: Optional[Client]) -> None:
+        try:
+            self.refresh(sb)
+            self._failed_at = None
+        except Exception as e:
+            self._failed_at = time.monotonic()
+            self._stale = True
+            logger.warning("Place index refresh failed (retrying in %.0fs): %s", self.retry_seconds, e)
+
+    def _backing_off(self) -> bool:
+        return self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_seconds
+
+    # -- querying ---------------------------------------------------------
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[PlaceEntry, float]]:
+        """Best matches as (entry, score in 0..1), highest first."""
+        norm = normalize_name(query)
+        if not norm:
+            return []
+        entries, norm_names, grams = self._entries, self._norm_names, self._grams
+
+        if len(norm) < 3:
+            # Too short for trigrams: word-prefix match only
+            hits = [(i, 1.0) for i, n in enumerate(norm_names) if any(w.startswith(norm) for w in n.split())]
+        else:
+            q_grams = trigrams(norm)
+            overlap: Dict[int, int] = defaultdict(int)
+            for g in q_grams:
+                for i in grams.get(g, ()):
+                    overlap[i] += 1
+            hits = []
+            for i, shared in overlap.items():
+                score = shared / len(q_grams)
+                if norm in norm_names[i]:
+                    score = 1.0
+                hits.append((i, score))
+
+        def rank(hit: Tuple[int, float]) -> Tuple[float, bool, int]:
+            i, score = hit
+            words = norm_names[i].split()
+            prefix = norm_names[i].startswith(norm) or any(w.startswith(norm) for w in words)
+            return (-score, not prefix, len(norm_names[i]))
+
+        hits = sorted((h for h in hits if h[1] >= _MIN_MATCH_SCORE), key=rank)
+        return [(entries[i], score) for i, score in hits[:limit]]
+
+    def has_menu(self, place_id: Optional[str], name: Optional[str] = None) -> bool:
+        if place_id and place_id in self._place_ids:
+            return True
+        return bool(name) and normalize_name(name) in self._names
+
+    def merge_results(self, local: List[Dict[str, Any]], remote: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Local menu matches first, then remote (Google) results not already
+        listed, each remote one marked has_menu from the index."""
+        seen = {r["place_id"] for r in local}
+        # Menus saved without a place_id can only be matched to Google by name
+        unplaced_names = {normalize_name(r["name"]) for r in local if r["place_id"].startswith("menu_")}
+        merged = list(local)
+        for r in remote:
+            if r["place_id"] in seen or normalize_name(r.get("name")) in unplaced_names:
+                continue
+            seen.add(r["place_id"])
+            merged.append({**r, "has_menu": self.has_menu(r["place_id"], r.get("name"))})
+        return merged
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+place_index = PlaceIndex()
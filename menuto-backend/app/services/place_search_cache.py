@@ -0,0 +1,112 @@
+"""
+menuto-backend/app/services/place_search_cache.py
+
+What this is:
+- Cache for /api/places/search results keyed by normalized query, the geohash
+  cell of the search location, and the user's home_base.
+- While someone types, a longer query can be answered from a cached shorter
+  one ("pizz" from "piz") when enough of the cached results still match.
+
+Why we keep it:
+- Search runs on every keystroke and each call is a billed Google text
+  search; the same query near the same spot returns nearly the same list.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.ttl_cache import TTLCache
+
+PLACES_SEARCH_CACHE_TTL_SECONDS = float(os.getenv("PLACES_SEARCH_CACHE_TTL_SECONDS", "600"))
+PLACES_SEARCH_CACHE_SIZE = int(os.getenv("PLACES_SEARCH_CACHE_SIZE", "2048"))
+# Precision 5 cells are ~4.9km x 4.9km
+PLACES_SEARCH_GEOHASH_PRECISION = int(os.getenv("PLACES_SEARCH_GEOHASH_PRECISION", "5"))
+# A prefix entry is reused only if at least this many of its results still match
+PLACES_PREFIX_MIN_RESULTS = int(os.getenv("PLACES_PREFIX_MIN_RESULTS", "5"))
+_MIN_PREFIX_LENGTH = 3
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+SearchKey = Tuple[str, str, str]
+
+
+def geohash(lat: float, lng: float, precision: int = PLACES_SEARCH_GEOHASH_PRECISION) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        ch <<= 1
+        if value >= mid:
+            ch |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def location_cell(location: Optional[str]) -> str:
+    """Geohash cell of a "lat,lng" string; "" for no (or unparseable) location."""
+    if not location:
+        return ""
+    try:
+        lat, lng = (float(part) for part in location.split(","))
+    except ValueError:
+        return location.strip()
+    return geohash(lat, lng)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _matches(restaurant: Dict[str, Any], query: str) -> bool:
+    """Every query token starts a word of the restaurant's name."""
+    words = re.findall(r"\w+", (restaurant.get("name") or "").lower())
+    return all(any(w.startswith(token) for w in words) for token in re.findall(r"\w+", query))
+
+
+class PlaceSearchCache:
+    def __init__(
+        self,
+        maxsize: int = PLACES_SEARCH_CACHE_SIZE,
+        ttl_seconds: float = PLACES_SEARCH_CACHE_TTL_SECONDS,
+        prefix_min_results: int = PLACES_PREFIX_MIN_RESULTS,
+    ) -> None:
+        self._cache = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds, name="places_search")
+        self.prefix_min_results = prefix_min_results
+
+    @staticmethod
+    def key(query: str, location: Optional[str], home_base: Optional[str]) -> SearchKey:
+        return normalize_query(query), location_cell(location), (home_base or "").lower()
+
+    def get(self, key: SearchKey) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+        """(restaurants, "hit" | "prefix" | "miss"). Returned dicts are copies."""
+        restaurants = self._cache.get(key)
+        if restaurants is not None:
+            return [dict(r) for r in restaurants], "hit"
+
+        query, cell, home_base = key
+        for end in range(len(query) - 1, _MIN_PREFIX_LENGTH - 1, -1):
+            cached = self._cache.peek((query[:end], cell, home_base))
+            if cached is None:
+                continue
+            narrowed = [dict(r) for r in cached if _matches(r, query)]
+            if len(narrowed) >= self.prefix_min_results:
+                return narrowed, "prefix"
+            break  # only the longest cached prefix is considered; shorter ones are less specific
+        return None, "miss"
+
+    def set(self, key: SearchKey, restaurants: List[Dict[str, Any]]) -> None:
+        self._cache.set(key, [dict(r) for r in restaurants])
+
+
+place_search_cache = PlaceSearchCache()
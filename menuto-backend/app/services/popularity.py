@@ -0,0 +1,81 @@
+"""
+menuto-backend/app/services/popularity.py
+
+What this is:
+- The one popularity formula for dishes, computed for a whole restaurant in
+  a single NumPy pass over columnar counts.
+
+Why we keep it:
+- The formula used to be re-implemented per dish in several places
+  (EnhancedRecommendationAlgorithm, the popular-dishes endpoint). Keeping it
+  here stops the copies from drifting. The `dish_popularity` SQL view
+  (migration 010) mirrors it for the paged endpoint; change both together.
+
+Formula (capped at 1.0):
+  min(orders / 10, 1) * 1.0                          orders (strongest signal)
++ ((avg_rating - 1) / 4) * 0.8, only with 3+ ratings ratings (gold standard)
++ min(views / 50, 1) * 0.3                           views (interest)
++ recent_order_boost * 0.2                           trending
+  where recent_order_boost = min(orders_30d / orders, 1) * 0.3
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import numpy as np
+
+ORDER_SATURATION = 10.0
+VIEW_SATURATION = 50.0
+MIN_RATINGS = 3
+
+ORDER_WEIGHT = 1.0
+RATING_WEIGHT = 0.8
+VIEW_WEIGHT = 0.3
+TRENDING_WEIGHT = 0.2
+MAX_RECENT_BOOST = 0.3
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+def recent_order_boosts(order_counts: ArrayLike, recent_order_counts: ArrayLike) -> np.ndarray:
+    orders = np.asarray(order_counts, dtype=float)
+    recent = np.asarray(recent_order_counts, dtype=float)
+    share = np.minimum(recent / np.maximum(orders, 1.0), 1.0)
+    return np.where(orders > 0, share * MAX_RECENT_BOOST, 0.0)
+
+
+def popularity_scores(
+    order_counts: ArrayLike,
+    view_counts: ArrayLike,
+    rating_sums: ArrayLike,
+    rating_counts: ArrayLike,
+    recent_order_counts: ArrayLike,
+) -> np.ndarray:
+    """0..1 popularity for every dish; all inputs are aligned per-dish columns."""
+    orders = np.asarray(order_counts, dtype=float)
+    views = np.asarray(view_counts, dtype=float)
+    r_sums = np.asarray(rating_sums, dtype=float)
+    r_counts = np.asarray(rating_counts, dtype=float)
+
+    avg_rating = np.divide(r_sums, r_counts, out=np.zeros_like(r_sums), where=r_counts > 0)
+
+    order_score = np.minimum(orders / ORDER_SATURATION, 1.0) * ORDER_WEIGHT
+    rating_score = np.where(r_counts >= MIN_RATINGS, (avg_rating - 1.0) / 4.0 * RATING_WEIGHT, 0.0)
+    view_score = np.minimum(views / VIEW_SATURATION, 1.0) * VIEW_WEIGHT
+    trending = recent_order_boosts(orders, recent_order_counts) * TRENDING_WEIGHT
+
+    return np.minimum(order_score + rating_score + view_score + trending, 1.0)
+
+
+def popularity_score(
+    order_count: int,
+    view_count: int,
+    rating_sum: float,
+    rating_count: int,
+    recent_order_count: int,
+) -> float:
+    """Single-dish convenience wrapper around popularity_scores."""
+    return float(popularity_scores(
+        [order_count], [view_count], [rating_sum], [rating_count], [recent_order_count],
+    )[0])
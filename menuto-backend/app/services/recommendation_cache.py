@@ -0,0 +1,116 @@
+"""
+menuto-backend/app/services/recommendation_cache.py
+
+What this is:
+- Short-lived cache of /smart-recommendations/generate responses, keyed by a
+  canonical hash of the request inputs and the user's generation, so a hit
+  is answered before any Supabase read.
+
+Why we keep it:
+- App re-renders and back-navigation resend near-identical payloads, each of
+  which would otherwise pay for embeddings plus an agent call.
+- What the key can't see is handled by invalidation: a new order, rating,
+  favorite or analyzed feedback bumps that user's generation, and a saved
+  menu drops the restaurant's entries. Views don't (too frequent); the TTL
+  covers them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.ttl_cache import TTLCache
+
+RECOMMENDATION_CACHE_TTL_SECONDS = float(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", "120"))
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "512"))
+# Users whose generation is remembered; only needs to cover the cache TTL
+RECOMMENDATION_GENERATIONS_SIZE = int(os.getenv("RECOMMENDATION_GENERATIONS_SIZE", "10000"))
+
+RecommendationKey = Tuple[str, str]  # (restaurant_place_id, digest)
+
+_cache = TTLCache(
+    maxsize=RECOMMENDATION_CACHE_SIZE,
+    ttl_seconds=RECOMMENDATION_CACHE_TTL_SECONDS,
+    name="recommendations",
+)
+# user_id -> generation. An entry only matters while responses cached before
+# the bump can still be live (computed before it, stored up to a budget later)
+_user_generations = TTLCache(
+    maxsize=RECOMMENDATION_GENERATIONS_SIZE,
+    ttl_seconds=2 * RECOMMENDATION_CACHE_TTL_SECONDS,
+    name="recommendation_generations",
+)
+
+
+def _digest(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _norm_list(values: Optional[List[Any]]) -> List[str]:
+    return sorted({str(v).strip().lower() for v in (values or []) if v is not None})
+
+
+def recommendation_cache_key(
+    restaurant_place_id: str,
+    user_id: Optional[str],
+    context_weights: Dict[str, Any],
+    user_favorite_dishes: List[Dict[str, Any]],
+    user_dietary_constraints: List[str],
+    friend_selections: List[Dict[str, Any]],
+    meal_period: str,
+    hunger: Any = None,
+    ranker: str = "agent",
+    ranker_weights: Optional[Dict[str, float]] = None,
+) -> RecommendationKey:
+    """Canonical key over the request body alone: cosmetic payload differences
+    (order, case, spacing) hash the same. `hunger` is the resolved level (the
+    default depends on the time of day)."""
+    user_key = user_id or "anonymous"
+    mood = context_weights.get("freeTextMood") or ""
+    return restaurant_place_id, _digest({
+        "user": user_key,
+        "generation": _user_generations.get(user_key, 0),
+        "hunger": hunger,
+        "cravings": _norm_list(context_weights.get("selectedCravings")),
+        "spice": context_weights.get("spiceTolerance"),
+        "meal_period": meal_period,
+        "preference_level": context_weights.get("preferenceLevel"),
+        "mood": " ".join(str(mood).lower().split()),
+        "occasion": str(context_weights.get("diningOccasion") or "").lower(),
+        "party_size": context_weights.get("partySize", 1),
+        "friends": _norm_list(fs.get("id") for fs in friend_selections if isinstance(fs, dict)),
+        "dietary": _norm_list(user_dietary_constraints),
+        "favorites": _norm_list(
+            d.get("dish_name") for d in user_favorite_dishes if isinstance(d, dict)
+        ),
+        "ranker": ranker,
+        "ranker_weights": sorted((ranker_weights or {}).items()),
+    })
+
+
+def get_cached_response(key: RecommendationKey) -> Optional[Dict[str, Any]]:
+    return _cache.get(key)
+
+
+def cache_response(key: RecommendationKey, response: Dict[str, Any]) -> None:
+    _cache.set(key, response)
+
+
+def invalidate_user_recommendations(user_id: Optional[str]) -> None:
+    """Orphans the user's cached responses (new order, rating, favorite or feedback signals)."""
+    if not user_id:
+        return
+    # A fresh token rather than +1: an expired entry reads as 0 again, and a
+    # counter could then repeat a value some live response still carries
+    _user_generations.set(user_id, time.monotonic_ns())
+
+
+def invalidate_restaurant_recommendations(restaurant_place_id: Optional[str]) -> None:
+    """A menu was saved for this place: drop every cached response for it."""
+    if restaurant_place_id:
+        _cache.discard_where(lambda key: key[0] == restaurant_place_id)
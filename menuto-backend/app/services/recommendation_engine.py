@@ -13,8 +13,8 @@ from google import genai
 import os
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
+from app.services.google_client import PLACE_DETAILS_URL, google_api
 # Legacy Restaurant/Dish models removed (tables don't exist in Supabase)
-import requests
 from dotenv import load_dotenv
 
 try:
@@ -99,16 +99,13 @@ class RecommendationEngine:
         """
         try:
             # Get place details with reviews
-            url = "https://maps.googleapis.com/maps/api/place/details/json"
             params = {
                 'place_id': place_id,
                 'fields': 'reviews,name,types',
                 'key': self.google_api_key
             }
             
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = google_api.get_json(PLACE_DETAILS_URL, params)
             
             if 'result' in data and 'reviews' in data['result']:
                 # Extract review texts, focusing on recent ones
@@ -32,7 +32,9 @@ class RecommendationContext:
     user_behavioral_signals: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     # Maps dish_name -> {"views": 3, "orders": 1, "favorited": True}
     dish_popularity: Dict[str, float] = field(default_factory=dict)
-    # Maps dish_name -> 0.0-1.0 normalized popularity (most ordered = 1.0)
+    # Maps dish_name -> 0.0-1.0 popularity (app.services.popularity, blended with review mentions)
+    dish_trends: Dict[str, float] = field(default_factory=dict)
+    # Maps dish_name -> 0.0-1.0 week-over-month order momentum (only rising dishes)
     user_id: Optional[str] = None
     dining_occasion: Optional[str] = None  # "date", "business", "family", "friends", "solo"
     party_size: int = 1
@@ -2,28 +2,70 @@
 menuto-backend/app/services/review_ingestion.py
 
 Review ingestion pipeline:
-1. Check Supabase cache (reviews < 14 days old)
-2. If stale/missing, fetch from Google Places API (5 reviews per restaurant, free tier)
+1. Check cache (reviews < 14 days old): in-process LRU first, then Supabase.
+   Stale reviews (up to REVIEW_MAX_STALENESS_DAYS) are served as-is while a
+   background refresh runs; only older/missing rows block on steps 2-4
+2. If stale/missing, fetch from Google Places API (5 reviews per restaurant, free tier).
+   Refreshes are single-flight per place_id: one in this process (concurrent
+   callers share its result) and one across workers (a Supabase lease row)
 3. Extract dish mentions + sentiment via Gemini
 4. Cache everything in Supabase for reuse
 """
 
+import asyncio
 import json
 import logging
 import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from google import genai
-import httpx
 from supabase import Client, create_client
 
+from app.services.google_client import PLACE_DETAILS_URL, google_api
+from app.services.ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
 CACHE_TTL_DAYS = 14
+# Past CACHE_TTL_DAYS reviews are refreshed in the background; past this they are a hard miss
+REVIEW_MAX_STALENESS_DAYS = float(os.getenv("REVIEW_MAX_STALENESS_DAYS", "60"))
+REVIEW_SIGNALS_TTL_SECONDS = float(os.getenv("REVIEW_SIGNALS_TTL_SECONDS", "300"))
+
+REVIEW_MEMORY_CACHE_SIZE = int(os.getenv("REVIEW_MEMORY_CACHE_SIZE", "256"))
+REVIEW_MEMORY_TTL_SECONDS = float(os.getenv("REVIEW_MEMORY_TTL_SECONDS", "300"))
+REVIEW_REFRESH_LEASE_SECONDS = int(os.getenv("REVIEW_REFRESH_LEASE_SECONDS", "60"))
+REVIEW_REFRESH_WAIT_SECONDS = float(os.getenv("REVIEW_REFRESH_WAIT_SECONDS", "20"))
+_REFRESH_POLL_SECONDS = 0.5
+# After a background refresh fails or finds no reviews, serve stale without retrying for this long
+REVIEW_REFRESH_BACKOFF_SECONDS = float(os.getenv("REVIEW_REFRESH_BACKOFF_SECONDS", "600"))
+# Identifies this worker's leases in review_refresh_leases (migration 011)
+_LEASE_HOLDER = f"{socket.gethostname()}:{os.getpid()}"
+
+# Stale-while-revalidate refreshes run here, off the request thread
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="review-refresh")
+
+# In-process tier above the Supabase review_cache:
+# place_id -> fetched_at, trusted without a round trip for REVIEW_MEMORY_TTL_SECONDS
+_review_heads = TTLCache(maxsize=4096, ttl_seconds=REVIEW_MEMORY_TTL_SECONDS, name="review_heads")
+# (place_id, fetched_at) -> parsed reviews; a new fetched_at is a new key
+_review_blobs = TTLCache(
+    maxsize=REVIEW_MEMORY_CACHE_SIZE, ttl_seconds=REVIEW_MAX_STALENESS_DAYS * 86400, name="review_blobs",
+)
+
+# place_id -> True while a failed/empty background refresh is backing off
+_refresh_backoff = TTLCache(maxsize=4096, ttl_seconds=REVIEW_REFRESH_BACKOFF_SECONDS, name="review_refresh_backoff")
+
+# Derived per-restaurant signals (one review fetch feeds all of them)
+_signals_cache = TTLCache(maxsize=1024, ttl_seconds=REVIEW_SIGNALS_TTL_SECONDS, name="review_signals")
 
 # Supabase client
 _sb: Client | None = None
@@ -43,7 +85,8 @@ if gemini_key:
 
 def get_reviews_for_restaurant(place_id: str) -> List[Dict[str, Any]]:
     """
-    Get reviews for a restaurant. Uses Supabase cache if fresh,
+    Get reviews for a restaurant. Uses Supabase cache if fresh; serves stale
+    cache (within REVIEW_MAX_STALENESS_DAYS) while refreshing in the background;
     otherwise fetches from Google Places API and caches.
 
     Returns list of review dicts with: platform, rating, text, author,
@@ -54,18 +97,64 @@ def get_reviews_for_restaurant(place_id: str) -> List[Dict[str, Any]]:
         logger.info("Cache hit for %s (%d reviews)", place_id, len(cached))
         return cached
 
-    logger.info("Cache miss for %s, fetching from Google", place_id)
-    raw_reviews = _fetch_google_reviews(place_id)
-    if not raw_reviews:
-        return []
+    stale = _get_cached_reviews(place_id, max_age_days=REVIEW_MAX_STALENESS_DAYS)
+    if stale is not None:
+        logger.info("Serving stale reviews for %s, refreshing in background", place_id)
+        _schedule_refresh(place_id)
+        return stale
+
+    logger.info("Cache miss for %s, refreshing", place_id)
+    return _single_flight(place_id, lambda: _refresh_reviews(place_id))
+
+
+def refresh_reviews(place_id: str) -> List[Dict[str, Any]]:
+    """Re-fetch and re-cache reviews even if the cache is fresh (single-flight)."""
+    return _single_flight(place_id, lambda: _refresh_reviews(place_id, force=True))
+
+
+@dataclass
+class ReviewSignals:
+    """Everything recommendations derive from a restaurant's reviews."""
+    place_id: str
+    review_count: int
+    popularity: Dict[str, float]  # {dish_name: share of reviews mentioning it}
+    sentiment: Dict[str, float]  # {dish_name: 0.0-1.0}
+    attributes: Dict[str, List[str]]  # {dish_name: ["thin crust", ...]}
+
+    @classmethod
+    def from_reviews(cls, place_id: str, reviews: List[Dict[str, Any]]) -> "ReviewSignals":
+        return cls(
+            place_id=place_id,
+            review_count=len(reviews),
+            popularity=_popularity_from_reviews(reviews),
+            sentiment=_sentiment_from_reviews(reviews),
+            attributes=_attributes_from_reviews(reviews),
+        )
 
-    # Extract dish mentions + sentiment via LLM
-    enriched = _enrich_reviews_batch(raw_reviews, place_id)
 
-    # Cache in Supabase
-    _cache_reviews(place_id, enriched)
+def get_review_signals(place_id: str) -> ReviewSignals:
+    """
+    Popularity, sentiment and attributes from a single review fetch,
+    memoized per place_id for REVIEW_SIGNALS_TTL_SECONDS (dropped when the
+    reviews are re-cached).
+    """
+    signals = _signals_cache.get(place_id)
+    if signals is None:
+        signals = ReviewSignals.from_reviews(place_id, get_reviews_for_restaurant(place_id))
+        _signals_cache.set(place_id, signals)
+    return signals
 
-    return enriched
+
+async def aget_review_signals(place_id: str) -> ReviewSignals:
+    """
+    `get_review_signals` for async routes. A miss may wait on another
+    caller's refresh (or run one), so it goes to a worker thread instead of
+    blocking the event loop.
+    """
+    signals = _signals_cache.peek(place_id)
+    if signals is not None:
+        return signals
+    return await asyncio.to_thread(get_review_signals, place_id)
 
 
 def get_dish_sentiment_scores(place_id: str) -> Dict[str, float]:
@@ -75,7 +164,31 @@ def get_dish_sentiment_scores(place_id: str) -> Dict[str, float]:
 
     Scores are 0.0-1.0 (normalized from review ratings + sentiment).
     """
-    reviews = get_reviews_for_restaurant(place_id)
+    return get_review_signals(place_id).sentiment
+
+
+def get_review_based_popularity(place_id: str) -> Dict[str, float]:
+    """Estimate dish popularity from review mention frequency.
+
+    If 4 out of 5 reviews mention "Margherita Pizza", it's probably the
+    most popular dish. Returns {dish_name: 0.0-1.0} where 1.0 = mentioned
+    in every review.
+
+    This is a FREE popularity signal — no extra API calls beyond the
+    reviews we already fetch and cache.
+    """
+    return get_review_signals(place_id).popularity
+
+
+def get_dish_attributes(place_id: str) -> Dict[str, List[str]]:
+    """Get aggregated attributes per dish from reviews.
+
+    Returns {"Margherita Pizza": ["thin crust", "fresh basil", ...]}
+    """
+    return get_review_signals(place_id).attributes
+
+
+def _sentiment_from_reviews(reviews: List[Dict[str, Any]]) -> Dict[str, float]:
     dish_scores: Dict[str, List[float]] = {}
 
     for review in reviews:
@@ -102,17 +215,7 @@ def get_dish_sentiment_scores(place_id: str) -> Dict[str, float]:
     }
 
 
-def get_review_based_popularity(place_id: str) -> Dict[str, float]:
-    """Estimate dish popularity from review mention frequency.
-
-    If 4 out of 5 reviews mention "Margherita Pizza", it's probably the
-    most popular dish. Returns {dish_name: 0.0-1.0} where 1.0 = mentioned
-    in every review.
-
-    This is a FREE popularity signal — no extra API calls beyond the
-    reviews we already fetch and cache.
-    """
-    reviews = get_reviews_for_restaurant(place_id)
+def _popularity_from_reviews(reviews: List[Dict[str, Any]]) -> Dict[str, float]:
     if not reviews:
         return {}
 
@@ -138,12 +241,7 @@ def get_review_based_popularity(place_id: str) -> Dict[str, float]:
     }
 
 
-def get_dish_attributes(place_id: str) -> Dict[str, List[str]]:
-    """Get aggregated attributes per dish from reviews.
-
-    Returns {"Margherita Pizza": ["thin crust", "fresh basil", ...]}
-    """
-    reviews = get_reviews_for_restaurant(place_id)
+def _attributes_from_reviews(reviews: List[Dict[str, Any]]) -> Dict[str, List[str]]:
     attributes: Dict[str, List[str]] = {}
     for review in reviews:
         for dish_name, attrs in review.get("dish_attributes", {}).items():
@@ -165,7 +263,6 @@ def _fetch_google_reviews(place_id: str) -> List[Dict[str, Any]]:
         logger.warning("GOOGLE_PLACES_API_KEY not set, skipping review fetch")
         return []
 
-    url = "https://maps.googleapis.com/maps/api/place/details/json"
     params = {
         "place_id": place_id,
         "fields": "reviews,name,rating",
@@ -173,10 +270,7 @@ def _fetch_google_reviews(place_id: str) -> List[Dict[str, Any]]:
     }
 
     try:
-        with httpx.Client(timeout=10) as client:
-            resp = client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        data = google_api.get_json(PLACE_DETAILS_URL, params)
 
         if data.get("status") != "OK":
             logger.error("Google Places API error: %s", data.get("status"))
@@ -208,6 +302,48 @@ def _fetch_google_reviews(place_id: str) -> List[Dict[str, Any]]:
 # LLM Enrichment (Gemini)
 # ---------------------------------------------------------------------------
 
+_ENRICHMENT_RULES = """Rules:
+- Only extract actual dish/food names, not generic terms like "food" or "appetizer"
+- Include drinks if specifically named (e.g., "Espresso Martini")
+- Use the dish name as written in the review, capitalized properly
+- If no dishes mentioned, return empty array for dish_mentions and empty object for dish_attributes
+- dish_attributes should contain short descriptive phrases from the review (e.g., "thin crust", "well seasoned", "generous portion")"""
+
+_ENRICHMENT_EXAMPLE = """[
+  {"review_index": 1, "dish_mentions": ["Margherita Pizza", "Tiramisu"], "sentiment_score": 0.8, "dish_attributes": {"Margherita Pizza": ["thin crust", "fresh basil", "perfectly charred"], "Tiramisu": ["creamy", "generous portion"]}},
+  {"review_index": 2, "dish_mentions": [], "sentiment_score": -0.3, "dish_attributes": {}}
+]"""
+
+
+def _review_lines(reviews: List[Dict]) -> List[str]:
+    lines = []
+    for i, r in enumerate(reviews):
+        text = r.get("text", "").strip()
+        if text:
+            rating = r.get("rating", "?")
+            lines.append(f"Review {i+1} ({rating}/5): {text}")
+    return lines
+
+
+def _blank_enrichment(reviews: List[Dict]) -> List[Dict]:
+    for r in reviews:
+        r["dish_mentions"] = []
+        r["sentiment_score"] = None
+        r["dish_attributes"] = {}
+    return reviews
+
+
+def _apply_enrichments(reviews: List[Dict], enrichments: List[Dict]) -> List[Dict]:
+    """Map per-review LLM output (keyed by 1-based review_index) back onto reviews."""
+    enrichment_map = {e["review_index"]: e for e in enrichments}
+    for i, review in enumerate(reviews):
+        e = enrichment_map.get(i + 1, {})
+        review["dish_mentions"] = e.get("dish_mentions", [])
+        review["sentiment_score"] = e.get("sentiment_score")
+        review["dish_attributes"] = e.get("dish_attributes", {})
+    return reviews
+
+
 def _enrich_reviews_batch(reviews: List[Dict], place_id: str) -> List[Dict]:
     """
     Use Gemini to extract dish mentions and sentiment from all reviews at once.
@@ -215,26 +351,12 @@ def _enrich_reviews_batch(reviews: List[Dict], place_id: str) -> List[Dict]:
     """
     if not _gemini_client or not reviews:
         # No LLM available — return reviews with empty dish_mentions
-        for r in reviews:
-            r["dish_mentions"] = []
-            r["sentiment_score"] = None
-            r["dish_attributes"] = {}
-        return reviews
+        return _blank_enrichment(reviews)
 
     # Build a single prompt with all review texts
-    review_texts = []
-    for i, r in enumerate(reviews):
-        text = r.get("text", "").strip()
-        if text:
-            rating = r.get("rating", "?")
-            review_texts.append(f"Review {i+1} ({rating}/5): {text}")
-
+    review_texts = _review_lines(reviews)
     if not review_texts:
-        for r in reviews:
-            r["dish_mentions"] = []
-            r["sentiment_score"] = None
-            r["dish_attributes"] = {}
-        return reviews
+        return _blank_enrichment(reviews)
 
     prompt = f"""Analyze these restaurant reviews. For each review, extract:
 1. Any specific dish/food items mentioned by name
@@ -244,17 +366,9 @@ def _enrich_reviews_batch(reviews: List[Dict], place_id: str) -> List[Dict]:
 {chr(10).join(review_texts)}
 
 Return JSON array with one object per review, in order:
-[
-  {{"review_index": 1, "dish_mentions": ["Margherita Pizza", "Tiramisu"], "sentiment_score": 0.8, "dish_attributes": {{"Margherita Pizza": ["thin crust", "fresh basil", "perfectly charred"], "Tiramisu": ["creamy", "generous portion"]}}}},
-  {{"review_index": 2, "dish_mentions": [], "sentiment_score": -0.3, "dish_attributes": {{}}}}
-]
+{_ENRICHMENT_EXAMPLE}
 
-Rules:
-- Only extract actual dish/food names, not generic terms like "food" or "appetizer"
-- Include drinks if specifically named (e.g., "Espresso Martini")
-- Use the dish name as written in the review, capitalized properly
-- If no dishes mentioned, return empty array for dish_mentions and empty object for dish_attributes
-- dish_attributes should contain short descriptive phrases from the review (e.g., "thin crust", "well seasoned", "generous portion")
+{_ENRICHMENT_RULES}
 - Return ONLY the JSON array, no other text"""
 
     try:
@@ -269,67 +383,327 @@ Rules:
 
         enrichments = json.loads(response.text)
         logger.info("LLM extracted dish mentions for %s: %d reviews processed", place_id, len(enrichments))
-
-        # Map enrichments back to reviews
-        enrichment_map = {e["review_index"]: e for e in enrichments}
-        for i, review in enumerate(reviews):
-            e = enrichment_map.get(i + 1, {})
-            review["dish_mentions"] = e.get("dish_mentions", [])
-            review["sentiment_score"] = e.get("sentiment_score")
-            review["dish_attributes"] = e.get("dish_attributes", {})
+        _apply_enrichments(reviews, enrichments)
 
     except Exception as e:
         logger.error("LLM enrichment failed for %s: %s", place_id, e)
-        for r in reviews:
-            r["dish_mentions"] = []
-            r["sentiment_score"] = None
-            r["dish_attributes"] = {}
+        _blank_enrichment(reviews)
 
     return reviews
 
 
+def _enrich_reviews_for_places(reviews_by_place: Dict[str, List[Dict]]) -> int:
+    """
+    One Gemini call for several restaurants' reviews (bulk warm-up). Falls back
+    to one call per restaurant if the combined response can't be used.
+    Enriches the reviews in place; returns the number of Gemini calls made.
+    """
+    with_text = {pid: reviews for pid, reviews in reviews_by_place.items() if _review_lines(reviews)}
+    for pid, reviews in reviews_by_place.items():
+        if pid not in with_text:
+            _blank_enrichment(reviews)
+    if not with_text:
+        return 0
+    if not _gemini_client:
+        for reviews in with_text.values():
+            _blank_enrichment(reviews)
+        return 0
+    if len(with_text) == 1:
+        for pid, reviews in with_text.items():
+            _enrich_reviews_batch(reviews, pid)
+        return 1
+
+    keys = {f"R{n}": pid for n, pid in enumerate(with_text, start=1)}
+    sections = "\n\n".join(
+        f"Restaurant {key}:\n" + "\n".join(_review_lines(with_text[pid])) for key, pid in keys.items()
+    )
+    prompt = f"""Analyze the reviews of each restaurant below. For each review, extract:
+1. Any specific dish/food items mentioned by name
+2. A sentiment score from -1.0 (very negative) to 1.0 (very positive)
+3. For each dish mentioned, extract descriptive attributes (taste, texture, portion, preparation style)
+
+{sections}
+
+Return one JSON object keyed by restaurant id ({", ".join(keys)}). Each value is an
+array with one object per review of that restaurant, like:
+{_ENRICHMENT_EXAMPLE}
+
+{_ENRICHMENT_RULES}
+- review_index restarts at 1 for every restaurant
+- Return ONLY the JSON object, no other text"""
+
+    try:
+        response = _gemini_client.models.generate_content(
+            model='gemini-2.5-flash',
+            contents=prompt,
+            config=genai.types.GenerateContentConfig(
+                temperature=0.1,
+                response_mime_type="application/json",
+            ),
+        )
+        parsed = json.loads(response.text)
+        if not isinstance(parsed, dict):
+            raise ValueError("expected a JSON object keyed by restaurant id")
+    except Exception as e:
+        logger.error("Multi-restaurant LLM enrichment failed for %d places: %s", len(keys), e)
+        parsed = {}
+
+    calls = 1
+    for key, pid in keys.items():
+        enrichments = parsed.get(key)
+        if isinstance(enrichments, list):
+            _apply_enrichments(with_text[pid], enrichments)
+        else:
+            _enrich_reviews_batch(with_text[pid], pid)
+            calls += 1
+    logger.info("LLM enriched reviews for %d places in one call", sum(isinstance(parsed.get(k), list) for k in keys))
+    return calls
+
+
+# ---------------------------------------------------------------------------
+# Single-flight refresh
+# ---------------------------------------------------------------------------
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[List[Dict[str, Any]]] = None
+
+
+_flights: Dict[str, _Flight] = {}
+_scheduled: set = set()  # place_ids queued on _REFRESH_EXECUTOR
+_flights_lock = threading.Lock()
+
+
+def _single_flight(place_id: str, refresh: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Run `refresh` once per place_id at a time; concurrent callers get its result."""
+    with _flights_lock:
+        flight = _flights.get(place_id)
+        leader = flight is None
+        if leader:
+            flight = _flights[place_id] = _Flight()
+
+    if not leader:
+        if flight.done.wait(REVIEW_REFRESH_WAIT_SECONDS) and flight.result is not None:
+            return flight.result
+        # Leader failed or is still running: serve whatever is cached rather than pile on
+        return _get_cached_reviews(place_id) or []
+
+    try:
+        flight.result = refresh()
+        return flight.result
+    finally:
+        with _flights_lock:
+            _flights.pop(place_id, None)
+        flight.done.set()
+
+
+def _schedule_refresh(place_id: str) -> None:
+    """Refresh in the background unless a refresh is already queued or running,
+    or the last one failed or came back empty less than
+    REVIEW_REFRESH_BACKOFF_SECONDS ago."""
+    if _refresh_backoff.peek(place_id):
+        return
+    with _flights_lock:
+        if place_id in _flights or place_id in _scheduled:
+            return
+        _scheduled.add(place_id)
+
+    def run() -> None:
+        try:
+            if not _single_flight(place_id, lambda: _refresh_reviews(place_id)):
+                logger.info("Background review refresh for %s found no reviews, backing off", place_id)
+                _refresh_backoff.set(place_id, True)
+        except Exception as e:
+            logger.warning("Background review refresh failed for %s, backing off: %s", place_id, e)
+            _refresh_backoff.set(place_id, True)
+        finally:
+            with _flights_lock:
+                _scheduled.discard(place_id)
+
+    _REFRESH_EXECUTOR.submit(run)
+
+
+def _refresh_reviews(place_id: str, force: bool = False) -> List[Dict[str, Any]]:
+    """Google -> Gemini -> cache, guarded by the cross-worker lease."""
+    if not force:
+        # Another flight (or worker) may have finished since our miss; re-read the head
+        _review_heads.discard(place_id)
+        cached = _get_cached_reviews(place_id)
+        if cached is not None:
+            return cached
+
+    started = datetime.now(timezone.utc)
+    if not _acquire_refresh_lease(place_id):
+        reviews = _wait_for_refresh(place_id, newer_than=started)
+        if reviews is not None:
+            return reviews
+        logger.warning("Review refresh for %s by another worker timed out, refreshing here", place_id)
+
+    try:
+        raw_reviews = _fetch_google_reviews(place_id)
+        if not raw_reviews:
+            return []
+
+        # Extract dish mentions + sentiment via LLM
+        enriched = _enrich_reviews_batch(raw_reviews, place_id)
+
+        # Cache in Supabase
+        _cache_reviews(place_id, enriched)
+        return enriched
+    finally:
+        _release_refresh_lease(place_id)
+
+
+def _acquire_refresh_lease(place_id: str) -> bool:
+    """True if this worker may refresh. Fails open so a lease problem never blocks reviews."""
+    if not _sb:
+        return True
+    try:
+        result = _sb.rpc("try_acquire_review_lease", {
+            "p_place_id": place_id,
+            "p_holder": _LEASE_HOLDER,
+            "p_ttl_seconds": REVIEW_REFRESH_LEASE_SECONDS,
+        }).execute()
+        return bool(result.data)
+    except Exception as e:
+        logger.warning("Review refresh lease failed for %s: %s", place_id, e)
+        return True
+
+
+def _release_refresh_lease(place_id: str) -> None:
+    if not _sb:
+        return
+    try:
+        _sb.rpc("release_review_lease", {"p_place_id": place_id, "p_holder": _LEASE_HOLDER}).execute()
+    except Exception as e:
+        logger.warning("Review refresh lease release failed for %s: %s", place_id, e)
+
+
+def _wait_for_refresh(place_id: str, newer_than: datetime) -> Optional[List[Dict]]:
+    """Poll review_cache until the lease holder writes a row newer than `newer_than`."""
+    deadline = time.monotonic() + REVIEW_REFRESH_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(_REFRESH_POLL_SECONDS)
+        try:
+            head = (
+                _sb.table("review_cache")
+                .select("fetched_at")
+                .eq("place_id", place_id)
+                .maybe_single()
+                .execute()
+            )
+        except Exception as e:
+            logger.warning("Cache read failed for %s: %s", place_id, e)
+            continue
+        if head and head.data and _parse_ts(head.data["fetched_at"]) > newer_than:
+            _review_heads.discard(place_id)  # our remembered head predates the refresh
+            _signals_cache.discard(place_id)
+            return _get_cached_reviews(place_id)
+    return None
+
+
 # ---------------------------------------------------------------------------
 # Supabase Cache
 # ---------------------------------------------------------------------------
 
-def _get_cached_reviews(place_id: str) -> Optional[List[Dict]]:
-    """Check Supabase for cached reviews within TTL."""
+def _get_cached_reviews(place_id: str, max_age_days: float = CACHE_TTL_DAYS) -> Optional[List[Dict]]:
+    """
+    Cached reviews no older than `max_age_days`, or None.
+
+    Memory first: `_review_heads` remembers the place's current fetched_at for
+    a short while (no Supabase call at all); past that, only fetched_at is
+    re-read and the parsed blob is reused from `_review_blobs` if unchanged.
+    The reviews JSON is downloaded only when the cache row actually changed.
+    """
+    fetched_at = _review_heads.get(place_id)
+    if fetched_at is None:
+        if not _sb:
+            return None
+        try:
+            head = (
+                _sb.table("review_cache")
+                .select("fetched_at")
+                .eq("place_id", place_id)
+                .maybe_single()
+                .execute()
+            )
+        except Exception as e:
+            logger.warning("Cache read failed for %s: %s", place_id, e)
+            return None
+        if not head or not head.data:
+            return None
+        fetched_at = head.data["fetched_at"]
+        _review_heads.set(place_id, fetched_at)
+
+    if _parse_ts(fetched_at) < datetime.now(timezone.utc) - timedelta(days=max_age_days):
+        return None
+
+    reviews = _review_blobs.get((place_id, fetched_at))
+    if reviews is not None:
+        return reviews
     if not _sb:
         return None
 
     try:
-        cutoff = (datetime.now(timezone.utc) - timedelta(days=CACHE_TTL_DAYS)).isoformat()
         result = (
             _sb.table("review_cache")
             .select("reviews, fetched_at")
             .eq("place_id", place_id)
-            .gte("fetched_at", cutoff)
             .maybe_single()
             .execute()
         )
-        if result.data:
-            return result.data["reviews"]
-        return None
     except Exception as e:
         logger.warning("Cache read failed for %s: %s", place_id, e)
         return None
+    if not result or not result.data:
+        return None
+
+    fetched_at = result.data["fetched_at"]
+    if _parse_ts(fetched_at) < datetime.now(timezone.utc) - timedelta(days=max_age_days):
+        return None
+    _remember_reviews(place_id, fetched_at, result.data["reviews"])
+    return result.data["reviews"]
+
+
+def _remember_reviews(place_id: str, fetched_at: str, reviews: List[Dict]) -> None:
+    _review_heads.set(place_id, fetched_at)
+    _review_blobs.set((place_id, fetched_at), reviews)
+
+
+def _parse_ts(value: str) -> datetime:
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
 
 
 def _cache_reviews(place_id: str, reviews: List[Dict]) -> None:
     """Upsert reviews into Supabase cache."""
+    _cache_reviews_many({place_id: reviews})
+
+
+def _cache_reviews_many(reviews_by_place: Dict[str, List[Dict]]) -> None:
+    """Upsert several restaurants' reviews into the Supabase cache in one request."""
+    if not reviews_by_place:
+        return
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    for place_id, reviews in reviews_by_place.items():
+        _signals_cache.discard(place_id)  # derived signals must follow the new reviews
+        _refresh_backoff.discard(place_id)
+        _remember_reviews(place_id, fetched_at, reviews)
     if not _sb:
         return
 
+    rows = [
+        {
+            "place_id": place_id,
+            "reviews": reviews,
+            "fetched_at": fetched_at,
+            "review_count": len(reviews),
+        }
+        for place_id, reviews in reviews_by_place.items()
+    ]
     try:
-        _sb.table("review_cache").upsert(
-            {
-                "place_id": place_id,
-                "reviews": reviews,
-                "fetched_at": datetime.now(timezone.utc).isoformat(),
-                "review_count": len(reviews),
-            },
-            on_conflict="place_id",
-        ).execute()
-        logger.info("Cached %d reviews for %s", len(reviews), place_id)
+        _sb.table("review_cache").upsert(rows, on_conflict="place_id").execute()
+        logger.info("Cached reviews for %d places", len(rows))
     except Exception as e:
-        logger.warning("Cache write failed for %s: %s", place_id, e)
+        logger.warning("Cache write failed for %s: %s", ", ".join(reviews_by_place), e)
@@ -0,0 +1,182 @@
+"""
+menuto-backend/app/services/review_warmup.py
+
+What this is:
+- Bulk pre-population of `review_cache` for a list of place_ids, or for every
+  restaurant with a parsed menu: Google reviews are fetched concurrently
+  (paced by the shared google_api limiter, so warm-up and live traffic draw
+  on one request rate), enriched several restaurants per Gemini call, and
+  upserted in bulk.
+- Runnable as `python -m app.services.review_warmup [place_id ...]` and via
+  POST /reviews/warm-up.
+
+Why we keep it:
+- Otherwise review_cache only fills on a restaurant's first user request, so
+  the first diners in a new market pay for Google + Gemini. Warming a launch
+  city up front keeps that off the request path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.services import review_ingestion
+
+logger = logging.getLogger(__name__)
+
+WARMUP_CONCURRENCY = int(os.getenv("REVIEW_WARMUP_CONCURRENCY", "8"))
+WARMUP_PLACES_PER_PROMPT = int(os.getenv("REVIEW_WARMUP_PLACES_PER_PROMPT", "8"))
+# Rough cap on review text per Gemini call (~4 chars per token)
+WARMUP_PROMPT_CHAR_BUDGET = int(os.getenv("REVIEW_WARMUP_PROMPT_CHAR_BUDGET", "40000"))
+_PAGE_SIZE = 1000
+
+
+@dataclass
+class WarmupResult:
+    requested: int = 0
+    skipped_fresh: int = 0
+    fetched: int = 0
+    no_reviews: int = 0
+    cached: int = 0
+    llm_calls: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requested": self.requested,
+            "skipped_fresh": self.skipped_fresh,
+            "fetched": self.fetched,
+            "no_reviews": self.no_reviews,
+            "cached": self.cached,
+            "llm_calls": self.llm_calls,
+            "errors": self.errors,
+        }
+
+
+def menu_place_ids() -> List[str]:
+    """Distinct place_ids of every restaurant with a parsed menu."""
+    sb = review_ingestion._sb
+    if not sb:
+        return []
+    place_ids: Dict[str, None] = {}
+    offset = 0
+    while True:
+        page = (
+            sb.table("parsed_menus")
+            .select("place_id")
+            .not_.is_("place_id", "null")
+            .order("place_id")
+            .range(offset, offset + _PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        place_ids.update((r["place_id"], None) for r in page if r.get("place_id"))
+        if len(page) < _PAGE_SIZE:
+            return list(place_ids)
+        offset += _PAGE_SIZE
+
+
+def fresh_place_ids(place_ids: List[str]) -> set:
+    """Which of `place_ids` already have a review_cache row within CACHE_TTL_DAYS."""
+    sb = review_ingestion._sb
+    if not sb or not place_ids:
+        return set()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=review_ingestion.CACHE_TTL_DAYS)
+    fresh = set()
+    for i in range(0, len(place_ids), _PAGE_SIZE // 5):
+        rows = (
+            sb.table("review_cache")
+            .select("place_id, fetched_at")
+            .in_("place_id", place_ids[i:i + _PAGE_SIZE // 5])
+            .execute()
+        ).data or []
+        fresh.update(r["place_id"] for r in rows if review_ingestion._parse_ts(r["fetched_at"]) >= cutoff)
+    return fresh
+
+
+def prompt_batches(
+    reviews_by_place: Dict[str, List[Dict]],
+    max_places: int = WARMUP_PLACES_PER_PROMPT,
+    char_budget: int = WARMUP_PROMPT_CHAR_BUDGET,
+) -> List[Dict[str, List[Dict]]]:
+    """Group restaurants so each Gemini call stays within the place and text budgets."""
+    batches: List[Dict[str, List[Dict]]] = []
+    current: Dict[str, List[Dict]] = {}
+    chars = 0
+    for place_id, reviews in reviews_by_place.items():
+        size = sum(len(r.get("text") or "") for r in reviews)
+        if current and (len(current) >= max_places or chars + size > char_budget):
+            batches.append(current)
+            current, chars = {}, 0
+        current[place_id] = reviews
+        chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def warm_review_cache(
+    place_ids: Optional[Iterable[str]] = None,
+    force: bool = False,
+    concurrency: int = WARMUP_CONCURRENCY,
+    places_per_prompt: int = WARMUP_PLACES_PER_PROMPT,
+) -> WarmupResult:
+    """
+    Fetch, enrich and cache reviews for `place_ids` (default: every parsed menu).
+    Restaurants with a fresh cache row are skipped unless `force`.
+    """
+    ids = list(dict.fromkeys(place_ids if place_ids is not None else menu_place_ids()))
+    result = WarmupResult(requested=len(ids))
+    if not force:
+        fresh = fresh_place_ids(ids)
+        ids = [pid for pid in ids if pid not in fresh]
+        result.skipped_fresh = result.requested - len(ids)
+    if not ids:
+        return result
+
+    # Concurrency bounds in-flight fetches; google_api spaces the requests themselves
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="review-warmup") as pool:
+        fetched = dict(zip(ids, pool.map(review_ingestion._fetch_google_reviews, ids)))
+
+    reviews_by_place = {pid: reviews for pid, reviews in fetched.items() if reviews}
+    result.fetched = len(reviews_by_place)
+    result.no_reviews = len(ids) - result.fetched
+
+    for batch in prompt_batches(reviews_by_place, max_places=places_per_prompt):
+        try:
+            result.llm_calls += review_ingestion._enrich_reviews_for_places(batch)
+            review_ingestion._cache_reviews_many(batch)
+            result.cached += len(batch)
+        except Exception as e:
+            logger.warning("Review warm-up batch of %d places failed: %s", len(batch), e)
+            result.errors.append(f"{', '.join(batch)}: {e}")
+
+    logger.info("Review warm-up: %s", result.as_dict())
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-populate review_cache for restaurants.")
+    parser.add_argument("place_ids", nargs="*", help="Google place_ids (default: every parsed menu)")
+    parser.add_argument("--force", action="store_true", help="Refresh restaurants whose cache is still fresh")
+    parser.add_argument("--concurrency", type=int, default=WARMUP_CONCURRENCY)
+    parser.add_argument("--per-prompt", type=int, default=WARMUP_PLACES_PER_PROMPT, help="Restaurants per Gemini call")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    result = warm_review_cache(
+        args.place_ids or None,
+        force=args.force,
+        concurrency=args.concurrency,
+        places_per_prompt=args.per_prompt,
+    )
+    print(result.as_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+menuto-backend/app/services/rolling_counters.py
+
+What this is:
+- `DailyBuckets`: a fixed ring of per-day counts (newest day first), the
+  Python side of `dish_stats.order_buckets` (migration 007).
+- 7/30-day window sums, least-squares trend slope and a bounded momentum
+  score, all computed from at most 30 integers.
+
+Why we keep it:
+- Trending detection used to count every order with `ordered_at >= now-30d`.
+  With daily buckets the window moves by shifting the array, so readers never
+  scan events and new trend signals are essentially free.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Union
+
+BUCKET_DAYS = 30
+
+
+def _as_date(value: Union[date, datetime, str, None]) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class DailyBuckets:
+    """
+    counts[0] is the number of events on `day`, counts[i] on `day - i days`.
+    Reading "as of" a later day shifts the ring; days that fall off the end
+    are dropped.
+    """
+
+    def __init__(
+        self,
+        counts: Optional[Iterable[int]] = None,
+        day: Union[date, datetime, str, None] = None,
+        size: int = BUCKET_DAYS,
+    ) -> None:
+        self.size = size
+        self.day = _as_date(day)
+        self.counts: List[int] = [int(c or 0) for c in (counts or [])][:size]
+
+    def as_of(self, today: Union[date, datetime, str, None] = None) -> List[int]:
+        """Counts aligned so index 0 is `today` (padded to `size`)."""
+        today = _as_date(today) or date.today()
+        if self.day is None:
+            return [0] * self.size
+        gap = (today - self.day).days
+        if gap >= self.size:
+            return [0] * self.size
+        if gap <= 0:
+            aligned = list(self.counts)
+        else:
+            aligned = [0] * gap + self.counts
+        aligned = aligned[:self.size]
+        return aligned + [0] * (self.size - len(aligned))
+
+    def add(self, n: int = 1, when: Union[date, datetime, str, None] = None) -> None:
+        when = _as_date(when) or date.today()
+        anchor = max(self.day or when, when)
+        counts = self.as_of(anchor)
+        idx = (anchor - when).days
+        if idx < self.size:
+            counts[idx] += n
+        self.day, self.counts = anchor, counts
+
+    def window(self, days: int, today: Union[date, datetime, str, None] = None) -> int:
+        return sum(self.as_of(today)[:days])
+
+    def slope(self, days: int = 14, today: Union[date, datetime, str, None] = None) -> float:
+        """Least-squares change in events/day per day over the last `days` days."""
+        ys = list(reversed(self.as_of(today)[:days]))  # oldest -> newest
+        n = len(ys)
+        if n < 2:
+            return 0.0
+        x_mean = (n - 1) / 2.0
+        y_mean = sum(ys) / n
+        num = sum((x - x_mean) * (y - y_mean) for x, y in enumerate(ys))
+        den = sum((x - x_mean) ** 2 for x in range(n))
+        return num / den
+
+    def momentum(
+        self,
+        short: int = 7,
+        today: Union[date, datetime, str, None] = None,
+    ) -> float:
+        """-1..1: daily rate over the last `short` days vs. the rest of the ring."""
+        counts = self.as_of(today)
+        recent_rate = sum(counts[:short]) / short
+        base_rate = sum(counts[short:]) / max(self.size - short, 1)
+        total = recent_rate + base_rate
+        if total == 0:
+            return 0.0
+        return (recent_rate - base_rate) / total
@@ -8,14 +8,27 @@ this enriches candidates with raw signals and lets a Gemini agent reason
 about what to recommend and why.
 
 Pipeline:
-  Menu items → Dietary filter → Enrich with signals → Agent picks 5
+  Menu items → Dietary filter → Enrich with signals → Local pre-rank
+  (top-K shortlist) → Agent picks 5
+
+With ranker="local" (or when the agent fails) no LLM is on the path: taste
+similarity is lexical and LocalRanker picks a structured, diverse meal.
+The default ranker="auto" runs both and serves the agent's picks only if
+they arrive within the request's latency budget.
 """
 
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
 import json
 import logging
 import os
+import threading
+import time
+
+from supabase import Client, create_client
 
+from app.services.dish_name_index import DishNameIndex
+from app.services.local_ranker import LocalRanker, lexical_taste_similarity, prerank
 from app.services.recommendation_engine import RecommendationEngine
 from app.services.recommendation_types import (
     HungerLevel,
@@ -27,6 +40,31 @@ from app.services.recommendation_types import (
 
 logger = logging.getLogger(__name__)
 
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+# Supabase client (shared by every feedback update instead of one per call)
+_sb: Client | None = None
+if SUPABASE_URL and SUPABASE_KEY:
+    _sb = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# How many pre-ranked candidates the agent gets to see (prompt size / latency knob)
+AGENT_CANDIDATE_LIMIT = int(os.getenv("AGENT_CANDIDATE_LIMIT", "25"))
+
+RANKER_MODES = ("auto", "agent", "local")
+
+# Wall-clock budget for the LLM path in "auto" mode before local results win
+RECOMMENDATION_LATENCY_BUDGET_S = float(os.getenv("RECOMMENDATION_LATENCY_BUDGET_SECONDS", "8"))
+
+# Concurrent LLM pipelines in "auto" mode; past this, requests are served locally
+AGENT_MAX_IN_FLIGHT = int(os.getenv("AGENT_MAX_IN_FLIGHT", "8"))
+
+# Runs the LLM pipeline off the request thread. A pipeline that misses its
+# budget is cancelled (if it hasn't started) or stops at its next stage
+# boundary; its slot is held until then so stragglers can't pile up.
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=AGENT_MAX_IN_FLIGHT, thread_name_prefix="rec-agent")
+_AGENT_SLOTS = threading.BoundedSemaphore(AGENT_MAX_IN_FLIGHT)
+
 if False:  # type-checking helper without runtime import cycles
     from app.services.menu_data_service import MenuDataService
 
@@ -38,9 +76,18 @@ class SmartRecommendationAlgorithm:
         self,
         menu_data_service: Optional["MenuDataService"] = None,
         legacy_engine: Optional[RecommendationEngine] = None,
+        agent_candidate_limit: Optional[int] = None,
+        local_ranker: Optional[LocalRanker] = None,
     ) -> None:
         self.menu_data_service = menu_data_service
         self.legacy_engine = legacy_engine or RecommendationEngine()
+        self.agent_candidate_limit = (
+            AGENT_CANDIDATE_LIMIT if agent_candidate_limit is None else agent_candidate_limit
+        )
+        if self.agent_candidate_limit < 1:
+            raise ValueError(f"agent_candidate_limit must be at least 1, got {self.agent_candidate_limit}")
+        self.local_ranker = local_ranker or LocalRanker()
+        self.last_served_by: Optional[str] = None
 
     # ------------------------------------------------------------------
     # Public entrypoint
@@ -55,7 +102,117 @@ class SmartRecommendationAlgorithm:
         user_dietary_constraints: List[str],
         context: RecommendationContext,
         limit: int = 5,
+        ranker: str = "auto",
+        latency_budget_s: Optional[float] = None,
     ) -> List[ScoredItem]:
+        """
+        ranker:
+          "agent" — LLM pipeline, waits as long as it takes, local on failure
+          "local" — no LLM calls at all
+          "auto"  — local ranking is computed right away while the LLM
+                    pipeline runs in the background; the agent's picks win
+                    only if they arrive within the latency budget
+
+        Which path produced the result is left in `self.last_served_by`.
+        """
+        # Dietary filter (safety — keep this rigid)
+        candidates = self._filter_dietary(menu_items, user_dietary_constraints)
+        if not candidates:
+            self.last_served_by = "legacy"
+            return self._fallback(
+                restaurant_place_id, restaurant_name,
+                user_favorite_dishes, user_dietary_constraints, limit,
+            )
+
+        if ranker == "local":
+            self.last_served_by = "local"
+            return self._rank_locally(candidates, user_favorite_dishes, context, limit)
+
+        if ranker == "agent":
+            agent_picks, enriched_candidates = self._agent_pipeline(
+                candidates, user_favorite_dishes, context, restaurant_name, limit,
+            )
+            if agent_picks:
+                self.last_served_by = "agent"
+                return agent_picks
+            # Deterministic local ranking over every (embedding-enriched) candidate
+            self.last_served_by = "local_fallback"
+            return self.local_ranker.rank(enriched_candidates, context, limit)
+
+        # "auto": hedge the LLM pipeline with the local ranking
+        budget = RECOMMENDATION_LATENCY_BUDGET_S if latency_budget_s is None else latency_budget_s
+        deadline = time.monotonic() + budget
+        if not _AGENT_SLOTS.acquire(blocking=False):
+            logger.info("Agent pipeline saturated, serving local ranking for %s", restaurant_name)
+            self.last_served_by = "local_saturated"
+            return self._rank_locally(candidates, user_favorite_dishes, context, limit)
+
+        cancelled = threading.Event()
+        try:
+            future = _HEDGE_EXECUTOR.submit(
+                self._hedged_pipeline, cancelled,
+                candidates, user_favorite_dishes, context, restaurant_name, limit,
+            )
+        except Exception:
+            _AGENT_SLOTS.release()
+            raise
+        local_picks = self._rank_locally(candidates, user_favorite_dishes, context, limit)
+
+        try:
+            agent_picks, enriched_candidates = future.result(
+                timeout=max(deadline - time.monotonic(), 0.0),
+            )
+        except FutureTimeoutError:
+            cancelled.set()
+            if future.cancel():
+                _AGENT_SLOTS.release()  # never started, so its finally won't run
+            logger.info(
+                "Agent pipeline missed the %.1fs budget for %s, serving local ranking",
+                budget, restaurant_name,
+            )
+            self.last_served_by = "local_budget"
+            return local_picks
+        except Exception as e:
+            logger.warning("Agent pipeline failed: %s", e)
+            self.last_served_by = "local_fallback"
+            return local_picks
+
+        if agent_picks:
+            self.last_served_by = "agent"
+            return agent_picks
+
+        # Agent declined/failed in time: the embedding-based taste signal still
+        # makes a better local ranking than the lexical one.
+        self.last_served_by = "local_fallback"
+        if enriched_candidates:
+            return self.local_ranker.rank(enriched_candidates, context, limit)
+        return local_picks
+
+    def _hedged_pipeline(
+        self,
+        cancelled: threading.Event,
+        *args: Any,
+    ) -> Tuple[Optional[List[ScoredItem]], List[Dict[str, Any]]]:
+        """`_agent_pipeline` on the hedge executor; frees the in-flight slot when done."""
+        try:
+            return self._agent_pipeline(*args, cancelled=cancelled)
+        finally:
+            _AGENT_SLOTS.release()
+
+    def _agent_pipeline(
+        self,
+        candidates: List[ItemFeatures],
+        user_favorite_dishes: List[Dict[str, Any]],
+        context: RecommendationContext,
+        restaurant_name: str,
+        limit: int,
+        cancelled: Optional[threading.Event] = None,
+    ) -> Tuple[Optional[List[ScoredItem]], List[Dict[str, Any]]]:
+        """Taste profile → embeddings → enrich → pre-rank → agent. All LLM calls live here.
+        Once `cancelled` is set (the caller gave up) no further LLM stage starts."""
+        def gave_up() -> bool:
+            return cancelled is not None and cancelled.is_set()
+
         # 1. Build taste profile (Gemini call)
         raw_profile = self.legacy_engine.analyze_user_taste_profile(user_favorite_dishes)
         taste_profile = UserTasteProfile.from_legacy(raw_profile)
@@ -66,43 +223,59 @@ class SmartRecommendationAlgorithm:
         ]
         if rated_dish_names:
             enriched = list(user_favorite_dishes)
+            known = {d.get("dish_name", "").lower() for d in enriched}
             for name in rated_dish_names:
-                if not any(d.get("dish_name", "").lower() == name.lower() for d in enriched):
+                if name.lower() not in known:
+                    known.add(name.lower())
                     enriched.append({"dish_name": name, "restaurant_id": "rated"})
             if len(enriched) > len(user_favorite_dishes):
                 raw_profile = self.legacy_engine.analyze_user_taste_profile(enriched)
                 taste_profile = UserTasteProfile.from_legacy(raw_profile)
 
-        # 2. Dietary filter (safety — keep this rigid)
-        candidates = self._filter_dietary(menu_items, user_dietary_constraints)
-        if not candidates:
-            return self._fallback(
-                restaurant_place_id, restaurant_name,
-                user_favorite_dishes, user_dietary_constraints, limit,
-            )
+        if gave_up():
+            return None, []
 
-        # 3. Compute taste similarity via embeddings (2 Gemini API calls)
+        # 2. Compute taste similarity via embeddings (2 Gemini API calls)
         similarity_scores = self._compute_taste_embeddings(candidates, taste_profile)
 
-        # 4. Enrich candidates with raw signals (no scoring, just data)
+        # 3. Enrich candidates with raw signals (no scoring, just data)
         enriched_candidates = self._enrich_with_signals(
             candidates, taste_profile, context, similarity_scores,
         )
 
+        # 4. Cheap local pre-rank so the agent sees the strongest K dishes
+        #    (not just whatever order the menu rows came back in)
+        shortlist = prerank(enriched_candidates, self.agent_candidate_limit)
+
+        if gave_up():
+            return None, []
+
         # 5. Agent picks the best dishes
         agent_picks = self._agent_select(
-            enriched_candidates, taste_profile, context,
+            shortlist, taste_profile, context,
             restaurant_name, limit,
         )
+        return agent_picks, enriched_candidates
 
-        if agent_picks:
-            return agent_picks
+    def _rank_locally(
+        self,
+        candidates: List[ItemFeatures],
+        user_favorite_dishes: List[Dict[str, Any]],
+        context: RecommendationContext,
+        limit: int,
+    ) -> List[ScoredItem]:
+        """Same signals with no Gemini calls — bounded latency."""
+        liked_names = [d.get("dish_name", "") for d in user_favorite_dishes]
+        liked_names += [name for name, rating in context.user_dish_ratings.items() if rating >= 4]
+        similarity_scores = lexical_taste_similarity(candidates, liked_names)
 
-        # Fallback: simple sort by taste similarity + popularity
-        return self._simple_fallback(enriched_candidates, limit)
+        enriched_candidates = self._enrich_with_signals(
+            candidates, UserTasteProfile.from_legacy({}), context, similarity_scores,
+        )
+        return self.local_ranker.rank(enriched_candidates, context, limit)
 
     # ------------------------------------------------------------------
-    # Step 2: Dietary filter
+    # Dietary filter
     # ------------------------------------------------------------------
 
     def _filter_dietary(
@@ -155,7 +328,7 @@ class SmartRecommendationAlgorithm:
         return [item for item in items if passes(item)]
 
     # ------------------------------------------------------------------
-    # Step 3: Embedding similarity
+    # Embedding similarity
     # ------------------------------------------------------------------
 
     def _compute_taste_embeddings(
@@ -209,7 +382,7 @@ class SmartRecommendationAlgorithm:
         return dot / (na * nb) if na and nb else 0.0
 
     # ------------------------------------------------------------------
-    # Step 4: Enrich candidates with raw signals
+    # Enrich candidates with raw signals
     # ------------------------------------------------------------------
 
     def _enrich_with_signals(
@@ -220,45 +393,39 @@ class SmartRecommendationAlgorithm:
         similarity_scores: Dict[str, float],
     ) -> List[Dict[str, Any]]:
         """Attach raw signals to each candidate — no scoring, just data."""
+        # Index the per-user/per-restaurant name maps once so each candidate
+        # lookup only touches names that can actually match.
+        popularity_index = DishNameIndex(context.dish_popularity)
+        ratings_index = DishNameIndex(context.user_dish_ratings)
+        behavior_index = DishNameIndex(context.user_behavioral_signals)
+        trend_index = DishNameIndex(context.dish_trends)
+
         enriched = []
         for item in candidates:
-            name_lower = item.name.lower()
-
             # Taste similarity (0-1 from embeddings)
             taste_sim = similarity_scores.get(item.item_id, 0.5)
 
             # Popularity
-            pop = 0.0
-            for dish_name, pop_score in context.dish_popularity.items():
-                if dish_name.lower() in name_lower or name_lower in dish_name.lower():
-                    pop = pop_score
-                    break
+            pop = popularity_index.lookup(item.name, 0.0)
+            trending = trend_index.lookup(item.name, 0.0)
 
             # Review sentiment
             sentiment = item.sentiment_score or 0.0
 
             # User's past rating of this/similar dish
-            past_rating = None
-            for rated_name, rating in context.user_dish_ratings.items():
-                if rated_name.lower() in name_lower or name_lower in rated_name.lower():
-                    past_rating = rating
-                    break
+            past_rating = ratings_index.lookup(item.name)
 
             # Behavioral signals
-            behavior = None
-            for dish_name, data in context.user_behavioral_signals.items():
-                if dish_name.lower() in name_lower or name_lower in dish_name.lower():
-                    behavior = data
-                    break
+            behavior = behavior_index.lookup(item.name)
+
+            text_lower = f"{item.name} {item.description}".lower()
 
             # Craving match
             craving_match = any(
-                c.lower() in f"{item.name} {item.description}".lower()
-                for c in context.craving_tags
+                c.lower() in text_lower for c in context.craving_tags
             ) if context.craving_tags else False
 
             # Feedback keywords match
-            text_lower = f"{item.name} {item.description}".lower()
             liked_match = [k for k in context.feedback_liked_keywords if k.lower() in text_lower]
             disliked_match = [k for k in context.feedback_disliked_keywords if k.lower() in text_lower]
 
@@ -266,6 +433,7 @@ class SmartRecommendationAlgorithm:
                 "item": item,
                 "taste_similarity": taste_sim,
                 "popularity": pop,
+                "trending": trending,
                 "review_sentiment": sentiment,
                 "past_rating": past_rating,
                 "behavior": behavior,  # {"views": N, "orders": N, "favorited": bool} or None
@@ -279,7 +447,7 @@ class SmartRecommendationAlgorithm:
         return enriched
 
     # ------------------------------------------------------------------
-    # Step 5: Agent selection
+    # Agent selection
     # ------------------------------------------------------------------
 
     def _agent_select(
@@ -302,7 +470,7 @@ class SmartRecommendationAlgorithm:
 
             # --- Build candidate descriptions with signals ---
             dish_lines = []
-            for i, e in enumerate(enriched[:25]):  # cap at 25 for prompt size
+            for i, e in enumerate(enriched):  # already pre-ranked to top-K
                 item: ItemFeatures = e["item"]
                 signals = []
 
@@ -310,6 +478,8 @@ class SmartRecommendationAlgorithm:
                     signals.append("MATCHES YOUR TASTE")
                 if e["popularity"] >= 0.5:
                     signals.append(f"POPULAR ({int(e['popularity']*100)}%)")
+                if e.get("trending", 0.0) >= 0.5:
+                    signals.append("TRENDING THIS WEEK")
                 if e["review_sentiment"] >= 0.7:
                     signals.append("WELL-REVIEWED")
                 if e["craving_match"]:
@@ -373,6 +543,8 @@ class SmartRecommendationAlgorithm:
 
             popular = sorted(context.dish_popularity.items(), key=lambda x: -x[1])[:5]
             popular_text = ", ".join(f"{n} ({int(s*100)}%)" for n, s in popular) if popular else "no data"
+            trending = sorted(context.dish_trends.items(), key=lambda x: -x[1])[:3]
+            trending_text = ", ".join(n for n, _ in trending)
 
             prompt = f"""You are a personal food advisor for someone dining at {restaurant_name}. Pick the best {limit} dishes for them.
 
@@ -399,6 +571,7 @@ HISTORY AT THIS RESTAURANT:
 
 WHAT'S POPULAR HERE:
 {popular_text}
+{f'- Trending this week: {trending_text}' if trending_text else ''}
 
 MENU (with signals — read these carefully):
 {chr(10).join(dish_lines)}
@@ -474,36 +647,6 @@ number = dish number from the list (1-indexed). Return ONLY the JSON array."""
     # Fallback (no Gemini / agent fails)
     # ------------------------------------------------------------------
 
-    def _simple_fallback(
-        self,
-        enriched: List[Dict[str, Any]],
-        limit: int,
-    ) -> List[ScoredItem]:
-        """Sort by taste similarity + popularity. No LLM needed."""
-        scored = []
-        for e in enriched:
-            simple_score = 0.5 * e["taste_similarity"] + 0.3 * e["popularity"] + 0.2 * (e["review_sentiment"] or 0)
-            scored.append((simple_score, e))
-
-        scored.sort(key=lambda x: -x[0])
-
-        results = []
-        for score, e in scored[:limit]:
-            item = e["item"]
-            results.append(
-                ScoredItem(
-                    item=item,
-                    components={
-                        "taste_similarity": e["taste_similarity"],
-                        "popularity": e["popularity"],
-                        "review_sentiment": e["review_sentiment"] or 0,
-                    },
-                    score=round(score, 3),
-                    explanations=["Recommended based on your taste and popularity"],
-                )
-            )
-        return results
-
     def _fallback(
         self,
         restaurant_place_id: str,
@@ -539,51 +682,65 @@ number = dish number from the list (1-indexed). Return ONLY the JSON array."""
     # Thompson Sampling (kept for feedback loop — lightweight)
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def weight_prior_deltas(
+        component_scores: Dict[str, float],
+        outcome: str,
+    ) -> Dict[str, Dict[str, float]]:
+        """Beta increments per component: strong components (score > 0.3) earn
+        alpha on a positive outcome and half their score as beta otherwise."""
+        deltas: Dict[str, Dict[str, float]] = {}
+        for component, score in component_scores.items():
+            if score <= 0.3:
+                continue
+            if outcome == "positive":
+                deltas[component] = {"alpha": score, "beta": 0.0}
+            else:
+                deltas[component] = {"alpha": 0.0, "beta": score * 0.5}
+        return deltas
+
     @staticmethod
     def update_weight_priors(
         user_id: str,
         component_scores: Dict[str, float],
         outcome: str,
+        sb: Any = None,
     ) -> None:
         """Update per-user Beta priors from feedback. Kept for future use
-        when we want to learn which signals matter most per user."""
+        when we want to learn which signals matter most per user.
+
+        One RPC applies every increment atomically (migration 009); if the
+        function isn't deployed yet, falls back to one read + one bulk upsert."""
+        sb = sb or _sb
+        deltas = SmartRecommendationAlgorithm.weight_prior_deltas(component_scores, outcome)
+        if not sb or not deltas:
+            return
+
         try:
-            from supabase import create_client
-
-            sb_url = os.getenv("SUPABASE_URL")
-            sb_key = os.getenv("SUPABASE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-            if not sb_url or not sb_key:
-                return
-            sb = create_client(sb_url, sb_key)
-
-            for component, score in component_scores.items():
-                if score <= 0.3:
-                    continue
-                existing = (
-                    sb.table("user_weight_priors")
-                    .select("alpha, beta")
-                    .eq("user_id", user_id)
-                    .eq("component", component)
-                    .maybe_single()
-                    .execute()
-                )
-                alpha = existing.data["alpha"] if existing.data else 2.0
-                beta_val = existing.data["beta"] if existing.data else 2.0
+            sb.rpc("increment_weight_priors", {"p_user_id": user_id, "p_deltas": deltas}).execute()
+            return
+        except Exception as e:
+            logger.warning("increment_weight_priors RPC failed, using bulk upsert: %s", e)
 
-                if outcome == "positive":
-                    alpha += score
-                else:
-                    beta_val += score * 0.5
-
-                sb.table("user_weight_priors").upsert(
-                    {
-                        "user_id": user_id,
-                        "component": component,
-                        "alpha": alpha,
-                        "beta": beta_val,
-                        "updated_at": "now()",
-                    },
-                    on_conflict="user_id,component",
-                ).execute()
+        try:
+            existing = (
+                sb.table("user_weight_priors")
+                .select("component, alpha, beta")
+                .eq("user_id", user_id)
+                .in_("component", list(deltas))
+                .execute()
+            )
+            current = {r["component"]: r for r in (existing.data or [])}
+            rows = [
+                {
+                    "user_id": user_id,
+                    "component": component,
+                    "alpha": current.get(component, {}).get("alpha", 2.0) + d["alpha"],
+                    "beta": current.get(component, {}).get("beta", 2.0) + d["beta"],
+                    "updated_at": "now()",
+                }
+                for component, d in deltas.items()
+            ]
+            sb.table("user_weight_priors").upsert(rows, on_conflict="user_id,component").execute()
         except Exception as e:
             logger.warning("Failed to update weight priors: %s", e)
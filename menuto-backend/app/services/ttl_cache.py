@@ -0,0 +1,156 @@
+"""
+menuto-backend/app/services/ttl_cache.py
+
+What this is:
+- A small thread-safe in-process cache with per-entry TTL and LRU eviction,
+  hit/miss counters, and a registry of named caches for metrics.
+- Optionally backed by a shared store (anything implementing `CacheBackend`,
+  e.g. a thin Redis adapter) so several API instances see the same entries.
+
+Why we keep it:
+- Several endpoints recompute slow-changing results (LLM recommendations,
+  aggregate stats, third-party lookups) on every hit. This gives them one
+  shared, dependency-free caching primitive.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Protocol, Tuple
+
+_MISSING = object()
+
+
+class CacheBackend(Protocol):
+    """Shared second tier. Keys are strings; values must be serializable by the backend."""
+
+    def get(self, key: str) -> Any: ...  # None on miss
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+_registry: Dict[str, "TTLCache"] = {}
+_registry_lock = threading.Lock()
+
+
+class TTLCache:
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl_seconds: float = 60.0,
+        name: Optional[str] = None,
+        backend: Optional[CacheBackend] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self.backend = backend
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if name:
+            with _registry_lock:
+                _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at >= time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+
+        if self.backend is not None:
+            value = self._backend_call(self.backend.get, str(key))
+            if value is not None:
+                self._store(key, value, self.ttl_seconds)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Local lookup that doesn't count as a hit/miss or refresh LRU order."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+        if entry is _MISSING or entry[0] < time.monotonic():
+            return default
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._store(key, value, ttl)
+        if self.backend is not None:
+            self._backend_call(self.backend.set, str(key), value, ttl)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+        if self.backend is not None:
+            self._backend_call(self.backend.delete, str(key))
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every local key matching `predicate`. Returns how many were dropped.
+        Shared-backend entries are left to expire (the backend can't be scanned)."""
+        with self._lock:
+            doomed = [k for k in self._data if predicate(k)]
+            for k in doomed:
+                del self._data[k]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "shared_backend": self.backend is not None,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    @staticmethod
+    def _backend_call(fn: Callable[..., Any], *args: Any) -> Any:
+        # A flaky shared tier must never fail the request; fall back to local only.
+        try:
+            return fn(*args)
+        except Exception:
+            return None
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every named cache, for the metrics endpoint."""
+    with _registry_lock:
+        caches = dict(_registry)
+    return {name: cache.stats() for name, cache in sorted(caches.items())}
@@ -0,0 +1,71 @@
+"""
+menuto-backend/app/services/user_profile_cache.py
+
+What this is:
+- Short-lived cache of `user_profiles` rows shared by the users router
+  (preferences) and places search (home_base), with an async lookup that
+  keeps the Supabase call off the event loop.
+
+Why we keep it:
+- Every authenticated places search read the user's home_base with a
+  blocking query inside the async handler. Profiles change rarely, and every
+  write through /users drops or refreshes the cached row.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from supabase import Client
+
+from app.services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+USER_PROFILE_CACHE_TTL_SECONDS = float(os.getenv("USER_PROFILE_CACHE_TTL_SECONDS", "120"))
+TABLE = "user_profiles"
+
+# user_id -> profile row; {} remembers "no profile yet"
+_profiles = TTLCache(maxsize=4096, ttl_seconds=USER_PROFILE_CACHE_TTL_SECONDS, name="user_profiles")
+
+
+def get_user_profile(sb: Optional[Client], user_id: str, fresh: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    The user's profile row (a copy), or None if there is none. Pass fresh=True
+    for read-modify-write paths so another instance's recent write isn't lost.
+    """
+    row = None if fresh else _profiles.get(user_id)
+    if row is None:
+        if not sb:
+            return None
+        r = sb.table(TABLE).select("*").eq("id", user_id).maybe_single().execute()
+        row = (r.data if r else None) or {}
+        _profiles.set(user_id, row)
+    return dict(row) if row else None
+
+
+async def aget_home_base(sb: Optional[Client], user_id: str) -> Optional[str]:
+    """home_base without blocking the event loop; None on any failure."""
+    row = _profiles.get(user_id)
+    try:
+        if row is None:
+            profile = await asyncio.to_thread(get_user_profile, sb, user_id)
+        else:
+            profile = row or None
+    except Exception as e:
+        logger.warning("home_base lookup failed for %s: %s", user_id, e)
+        return None
+    return profile.get("home_base") if profile else None
+
+
+def remember_user_profile(row: Optional[Dict[str, Any]]) -> None:
+    """Store a freshly written row so the next read skips Supabase."""
+    if row and row.get("id"):
+        _profiles.set(row["id"], dict(row))
+
+
+def invalidate_user_profile(user_id: str) -> None:
+    _profiles.discard(user_id)
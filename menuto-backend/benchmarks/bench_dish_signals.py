@@ -0,0 +1,130 @@
+"""
+Benchmark: EnhancedRecommendationAlgorithm.get_dish_signals
+
+Seeds a local SQLite database (or DATABASE_URL, e.g. a scratch Postgres) with
+one restaurant of N dishes and M behavioral events, then times the grouped
+aggregate implementation against the previous per-dish query loop
+(4 queries per dish).
+
+    python benchmarks/bench_dish_signals.py                 # 200 dishes × 100k events, SQLite
+    python benchmarks/bench_dish_signals.py --dishes 500 --events 250000
+    DATABASE_URL=postgresql://localhost/menuto_bench python benchmarks/bench_dish_signals.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models import Base, ParsedDish, ParsedMenu  # noqa: E402
+from app.services.enhanced_recommendation_algorithm import EnhancedRecommendationAlgorithm  # noqa: E402
+
+PLACE_ID = "bench-place"
+
+_EVENT_TABLES = """
+CREATE TABLE IF NOT EXISTS dish_orders (id INTEGER PRIMARY KEY, dish_id INTEGER, user_id TEXT, ordered_at TIMESTAMP);
+CREATE TABLE IF NOT EXISTS dish_views (id INTEGER PRIMARY KEY, dish_id INTEGER, user_id TEXT, viewed_at TIMESTAMP);
+CREATE TABLE IF NOT EXISTS dish_ratings (id INTEGER PRIMARY KEY, dish_id INTEGER, user_id TEXT, rating FLOAT, rated_at TIMESTAMP);
+CREATE INDEX IF NOT EXISTS idx_dish_orders_dish ON dish_orders(dish_id);
+CREATE INDEX IF NOT EXISTS idx_dish_views_dish ON dish_views(dish_id);
+CREATE INDEX IF NOT EXISTS idx_dish_ratings_dish ON dish_ratings(dish_id);
+"""
+
+
+def seed(session, n_dishes: int, n_events: int) -> None:
+    rng = random.Random(42)
+    menu = ParsedMenu(place_id=PLACE_ID, restaurant_name="Bench", restaurant_url="x", menu_url="x")
+    session.add(menu)
+    session.flush()
+    session.add_all([
+        ParsedDish(menu_id=menu.id, name=f"Dish {i}", category="main", price=10 + i % 20)
+        for i in range(n_dishes)
+    ])
+    session.flush()
+    dish_ids = [d.id for d in session.query(ParsedDish).filter(ParsedDish.menu_id == menu.id)]
+
+    for stmt in filter(None, (s.strip() for s in _EVENT_TABLES.split(";"))):
+        session.execute(text(stmt))
+
+    now = datetime.utcnow()
+
+    def when():
+        return now - timedelta(days=rng.randint(0, 120))
+
+    # Events split 30% orders / 60% views / 10% ratings
+    orders = [{"d": rng.choice(dish_ids), "t": when()} for _ in range(int(n_events * 0.3))]
+    views = [{"d": rng.choice(dish_ids), "t": when()} for _ in range(int(n_events * 0.6))]
+    ratings = [{"d": rng.choice(dish_ids), "r": rng.randint(1, 5), "t": when()} for _ in range(int(n_events * 0.1))]
+    session.execute(text("INSERT INTO dish_orders (dish_id, user_id, ordered_at) VALUES (:d, 'u', :t)"), orders)
+    session.execute(text("INSERT INTO dish_views (dish_id, user_id, viewed_at) VALUES (:d, 'u', :t)"), views)
+    session.execute(text("INSERT INTO dish_ratings (dish_id, user_id, rating, rated_at) VALUES (:d, 'u', :r, :t)"), ratings)
+    session.commit()
+
+
+def per_dish_signals(db, restaurant_place_id: str) -> dict:
+    """The previous implementation: 4 queries per dish."""
+    dishes = db.query(ParsedDish).join(ParsedMenu, ParsedDish.menu_id == ParsedMenu.id) \
+        .filter(ParsedMenu.place_id == restaurant_place_id).all()
+    since = datetime.utcnow() - timedelta(days=30)
+    out = {}
+    for dish in dishes:
+        oc = db.execute(text("SELECT COUNT(*) FROM dish_orders WHERE dish_id = :did"), {"did": dish.id}).scalar() or 0
+        vc = db.execute(text("SELECT COUNT(*) FROM dish_views WHERE dish_id = :did"), {"did": dish.id}).scalar() or 0
+        rr = db.execute(text("SELECT AVG(rating), COUNT(*) FROM dish_ratings WHERE dish_id = :did"), {"did": dish.id}).first()
+        ro = db.execute(
+            text("SELECT COUNT(*) FROM dish_orders WHERE dish_id = :did AND ordered_at >= :since"),
+            {"did": dish.id, "since": since},
+        ).scalar() or 0
+        out[str(dish.id)] = (oc, vc, rr[1] or 0, ro)
+    return out
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dishes", type=int, default=200)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    url = os.getenv("DATABASE_URL") or "sqlite://"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    print(f"Seeding {args.dishes} dishes × {args.events} events into {engine.dialect.name}...")
+    seed(session, args.dishes, args.events)
+
+    algo = EnhancedRecommendationAlgorithm(session)
+    grouped = algo.get_dish_signals(PLACE_ID)
+    legacy = per_dish_signals(session, PLACE_ID)
+    for dish_id, (oc, vc, rc, _) in legacy.items():
+        s = grouped[dish_id]
+        assert (s.order_count, s.view_count, s.rating_count) == (oc, vc, rc), dish_id
+
+    t_legacy = best_of(lambda: per_dish_signals(session, PLACE_ID), args.repeat)
+    t_grouped = best_of(lambda: algo.get_dish_signals(PLACE_ID), args.repeat)
+    print(f"{f'per-dish queries ({4 * args.dishes + 1} round trips):':<42}{t_legacy * 1000:9.1f} ms")
+    print(f"{'grouped aggregates (4 round trips):':<42}{t_grouped * 1000:9.1f} ms")
+    print(f"speedup: {t_legacy / t_grouped:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
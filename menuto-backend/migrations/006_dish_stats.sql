@@ -0,0 +1,136 @@
+-- Migration 006: Per-dish popularity rollup
+-- Popularity readers (dish stats, popular dishes, smart recommendations) used to
+-- recount raw dish_orders / dish_views / dish_ratings rows on every call.
+-- dish_stats keeps one row of counters per dish, maintained by triggers on every
+-- tracking insert, so reads are O(dishes) instead of O(events).
+-- Safe to run multiple times.
+
+CREATE TABLE IF NOT EXISTS public.dish_stats (
+    dish_id BIGINT PRIMARY KEY REFERENCES public.parsed_dishes(id) ON DELETE CASCADE,
+    restaurant_place_id TEXT,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    view_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    recent_order_count INTEGER NOT NULL DEFAULT 0,  -- orders in the last 30 days (re-windowed by compact_dish_stats)
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_dish_stats_restaurant ON dish_stats (restaurant_place_id);
+
+ALTER TABLE public.dish_stats ENABLE ROW LEVEL SECURITY;
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_policies WHERE tablename = 'dish_stats' AND policyname = 'Service role full access') THEN
+        CREATE POLICY "Service role full access" ON public.dish_stats FOR ALL USING (true);
+    END IF;
+END $$;
+
+-- ============================================================
+-- Incremental maintenance (one atomic upsert per tracking insert)
+-- ============================================================
+CREATE OR REPLACE FUNCTION public.bump_dish_stats(
+    p_dish_id BIGINT,
+    p_restaurant_place_id TEXT,
+    p_orders INTEGER DEFAULT 0,
+    p_views INTEGER DEFAULT 0,
+    p_rating_sum DOUBLE PRECISION DEFAULT 0,
+    p_rating_count INTEGER DEFAULT 0
+) RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO public.dish_stats AS s (
+        dish_id, restaurant_place_id, order_count, view_count,
+        rating_sum, rating_count, recent_order_count, updated_at
+    )
+    VALUES (
+        p_dish_id, p_restaurant_place_id, p_orders, p_views,
+        p_rating_sum, p_rating_count, p_orders, now()
+    )
+    ON CONFLICT (dish_id) DO UPDATE SET
+        restaurant_place_id = COALESCE(EXCLUDED.restaurant_place_id, s.restaurant_place_id),
+        order_count = s.order_count + EXCLUDED.order_count,
+        view_count = s.view_count + EXCLUDED.view_count,
+        rating_sum = s.rating_sum + EXCLUDED.rating_sum,
+        rating_count = s.rating_count + EXCLUDED.rating_count,
+        recent_order_count = s.recent_order_count + EXCLUDED.recent_order_count,
+        updated_at = now();
+$$;
+
+CREATE OR REPLACE FUNCTION public.dish_stats_on_event() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'dish_orders' THEN
+        PERFORM public.bump_dish_stats(NEW.dish_id, NEW.restaurant_place_id, p_orders => 1);
+    ELSIF TG_TABLE_NAME = 'dish_views' THEN
+        PERFORM public.bump_dish_stats(NEW.dish_id, NEW.restaurant_place_id, p_views => 1);
+    ELSIF TG_TABLE_NAME = 'dish_ratings' THEN
+        PERFORM public.bump_dish_stats(
+            NEW.dish_id, NEW.restaurant_place_id,
+            p_rating_sum => NEW.rating, p_rating_count => 1
+        );
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_dish_stats_orders ON public.dish_orders;
+CREATE TRIGGER trg_dish_stats_orders AFTER INSERT ON public.dish_orders
+    FOR EACH ROW EXECUTE FUNCTION public.dish_stats_on_event();
+
+DROP TRIGGER IF EXISTS trg_dish_stats_views ON public.dish_views;
+CREATE TRIGGER trg_dish_stats_views AFTER INSERT ON public.dish_views
+    FOR EACH ROW EXECUTE FUNCTION public.dish_stats_on_event();
+
+DROP TRIGGER IF EXISTS trg_dish_stats_ratings ON public.dish_ratings;
+CREATE TRIGGER trg_dish_stats_ratings AFTER INSERT ON public.dish_ratings
+    FOR EACH ROW EXECUTE FUNCTION public.dish_stats_on_event();
+
+-- ============================================================
+-- Compaction: rebuild every row from the raw event tables.
+-- Re-windows recent_order_count (which only ever grows between runs) and
+-- repairs drift from deletes. Schedule daily, e.g. with pg_cron:
+--   SELECT cron.schedule('compact-dish-stats', '15 3 * * *', 'SELECT public.compact_dish_stats()');
+-- ============================================================
+CREATE OR REPLACE FUNCTION public.compact_dish_stats() RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO public.dish_stats AS s (
+        dish_id, restaurant_place_id, order_count, view_count,
+        rating_sum, rating_count, recent_order_count, updated_at
+    )
+    SELECT
+        d.id,
+        m.place_id,
+        COALESCE(o.order_count, 0),
+        COALESCE(v.view_count, 0),
+        COALESCE(r.rating_sum, 0),
+        COALESCE(r.rating_count, 0),
+        COALESCE(o.recent_order_count, 0),
+        now()
+    FROM public.parsed_dishes d
+    JOIN public.parsed_menus m ON m.id = d.menu_id
+    LEFT JOIN (
+        SELECT dish_id,
+               COUNT(*) AS order_count,
+               COUNT(*) FILTER (WHERE ordered_at >= now() - interval '30 days') AS recent_order_count
+        FROM public.dish_orders GROUP BY dish_id
+    ) o ON o.dish_id = d.id
+    LEFT JOIN (
+        SELECT dish_id, COUNT(*) AS view_count FROM public.dish_views GROUP BY dish_id
+    ) v ON v.dish_id = d.id
+    LEFT JOIN (
+        SELECT dish_id, SUM(rating) AS rating_sum, COUNT(*) AS rating_count
+        FROM public.dish_ratings GROUP BY dish_id
+    ) r ON r.dish_id = d.id
+    WHERE o.dish_id IS NOT NULL OR v.dish_id IS NOT NULL OR r.dish_id IS NOT NULL
+    ON CONFLICT (dish_id) DO UPDATE SET
+        restaurant_place_id = EXCLUDED.restaurant_place_id,
+        order_count = EXCLUDED.order_count,
+        view_count = EXCLUDED.view_count,
+        rating_sum = EXCLUDED.rating_sum,
+        rating_count = EXCLUDED.rating_count,
+        recent_order_count = EXCLUDED.recent_order_count,
+        updated_at = now();
+$$;
+
+-- Backfill from existing events
+SELECT public.compact_dish_stats();
@@ -0,0 +1,166 @@
+-- Migration 007: Daily order buckets on dish_stats
+-- Adds a 30-slot ring of per-day order counts (index 1 = buckets_day, index i =
+-- buckets_day - (i-1) days) so 7/30-day windows and trend slopes are read from
+-- at most 30 integers per dish instead of scanning dish_orders.
+-- Depends on 006_dish_stats.sql. Safe to run multiple times.
+
+ALTER TABLE public.dish_stats ADD COLUMN IF NOT EXISTS order_buckets INTEGER[] NOT NULL DEFAULT '{}';
+ALTER TABLE public.dish_stats ADD COLUMN IF NOT EXISTS buckets_day DATE;
+
+-- Re-align a ring to a later day: prepend one zero per elapsed day, keep 30.
+CREATE OR REPLACE FUNCTION public.shift_order_buckets(p_buckets INTEGER[], p_from DATE, p_to DATE)
+RETURNS INTEGER[]
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN p_from IS NULL OR p_to - p_from >= 30 THEN '{}'::INTEGER[]
+        WHEN p_to <= p_from THEN p_buckets
+        ELSE (array_fill(0, ARRAY[p_to - p_from]) || p_buckets)[1:30]
+    END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.add_to_order_buckets(
+    p_buckets INTEGER[],
+    p_buckets_day DATE,
+    p_day DATE,
+    p_orders INTEGER
+) RETURNS INTEGER[]
+LANGUAGE plpgsql IMMUTABLE AS $$
+DECLARE
+    v_day DATE := GREATEST(COALESCE(p_buckets_day, p_day), p_day);
+    v_buckets INTEGER[] := public.shift_order_buckets(p_buckets, p_buckets_day, v_day);
+    v_idx INTEGER := v_day - p_day + 1;
+BEGIN
+    IF p_orders = 0 OR v_idx > 30 THEN
+        RETURN v_buckets;
+    END IF;
+    WHILE COALESCE(array_length(v_buckets, 1), 0) < v_idx LOOP
+        v_buckets := v_buckets || 0;
+    END LOOP;
+    v_buckets[v_idx] := v_buckets[v_idx] + p_orders;
+    RETURN v_buckets;
+END;
+$$;
+
+-- bump_dish_stats gains the event day; drop the 006 signature so calls stay unambiguous.
+DROP FUNCTION IF EXISTS public.bump_dish_stats(BIGINT, TEXT, INTEGER, INTEGER, DOUBLE PRECISION, INTEGER);
+
+CREATE OR REPLACE FUNCTION public.bump_dish_stats(
+    p_dish_id BIGINT,
+    p_restaurant_place_id TEXT,
+    p_orders INTEGER DEFAULT 0,
+    p_views INTEGER DEFAULT 0,
+    p_rating_sum DOUBLE PRECISION DEFAULT 0,
+    p_rating_count INTEGER DEFAULT 0,
+    p_day DATE DEFAULT CURRENT_DATE
+) RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO public.dish_stats AS s (
+        dish_id, restaurant_place_id, order_count, view_count,
+        rating_sum, rating_count, recent_order_count,
+        order_buckets, buckets_day, updated_at
+    )
+    VALUES (
+        p_dish_id, p_restaurant_place_id, p_orders, p_views,
+        p_rating_sum, p_rating_count, p_orders,
+        public.add_to_order_buckets('{}', NULL, p_day, p_orders), p_day, now()
+    )
+    ON CONFLICT (dish_id) DO UPDATE SET
+        restaurant_place_id = COALESCE(EXCLUDED.restaurant_place_id, s.restaurant_place_id),
+        order_count = s.order_count + EXCLUDED.order_count,
+        view_count = s.view_count + EXCLUDED.view_count,
+        rating_sum = s.rating_sum + EXCLUDED.rating_sum,
+        rating_count = s.rating_count + EXCLUDED.rating_count,
+        order_buckets = public.add_to_order_buckets(s.order_buckets, s.buckets_day, p_day, p_orders),
+        recent_order_count = (
+            SELECT COALESCE(SUM(x), 0)
+            FROM unnest(public.add_to_order_buckets(s.order_buckets, s.buckets_day, p_day, p_orders)) AS x
+        ),
+        buckets_day = GREATEST(COALESCE(s.buckets_day, p_day), p_day),
+        updated_at = now();
+$$;
+
+CREATE OR REPLACE FUNCTION public.dish_stats_on_event() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'dish_orders' THEN
+        PERFORM public.bump_dish_stats(
+            NEW.dish_id, NEW.restaurant_place_id, p_orders => 1,
+            p_day => COALESCE(NEW.ordered_at, now())::date
+        );
+    ELSIF TG_TABLE_NAME = 'dish_views' THEN
+        PERFORM public.bump_dish_stats(NEW.dish_id, NEW.restaurant_place_id, p_views => 1);
+    ELSIF TG_TABLE_NAME = 'dish_ratings' THEN
+        PERFORM public.bump_dish_stats(
+            NEW.dish_id, NEW.restaurant_place_id,
+            p_rating_sum => NEW.rating, p_rating_count => 1
+        );
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+-- ============================================================
+-- Compaction now also rebuilds the bucket ring from the last 30 days.
+-- ============================================================
+CREATE OR REPLACE FUNCTION public.compact_dish_stats() RETURNS void
+LANGUAGE sql AS $$
+    WITH daily AS (
+        SELECT dish_id, CURRENT_DATE - ordered_at::date AS age, COUNT(*) AS n
+        FROM public.dish_orders
+        WHERE ordered_at >= CURRENT_DATE - 29
+        GROUP BY 1, 2
+    ),
+    rings AS (
+        SELECT ids.dish_id, array_agg(COALESCE(daily.n, 0)::INTEGER ORDER BY g.i) AS order_buckets
+        FROM (SELECT DISTINCT dish_id FROM daily) ids
+        CROSS JOIN generate_series(0, 29) AS g(i)
+        LEFT JOIN daily ON daily.dish_id = ids.dish_id AND daily.age = g.i
+        GROUP BY ids.dish_id
+    )
+    INSERT INTO public.dish_stats AS s (
+        dish_id, restaurant_place_id, order_count, view_count,
+        rating_sum, rating_count, recent_order_count,
+        order_buckets, buckets_day, updated_at
+    )
+    SELECT
+        d.id,
+        m.place_id,
+        COALESCE(o.order_count, 0),
+        COALESCE(v.view_count, 0),
+        COALESCE(r.rating_sum, 0),
+        COALESCE(r.rating_count, 0),
+        COALESCE(o.recent_order_count, 0),
+        COALESCE(rings.order_buckets, '{}'),
+        CURRENT_DATE,
+        now()
+    FROM public.parsed_dishes d
+    JOIN public.parsed_menus m ON m.id = d.menu_id
+    LEFT JOIN (
+        SELECT dish_id,
+               COUNT(*) AS order_count,
+               COUNT(*) FILTER (WHERE ordered_at >= CURRENT_DATE - 29) AS recent_order_count
+        FROM public.dish_orders GROUP BY dish_id
+    ) o ON o.dish_id = d.id
+    LEFT JOIN (
+        SELECT dish_id, COUNT(*) AS view_count FROM public.dish_views GROUP BY dish_id
+    ) v ON v.dish_id = d.id
+    LEFT JOIN (
+        SELECT dish_id, SUM(rating) AS rating_sum, COUNT(*) AS rating_count
+        FROM public.dish_ratings GROUP BY dish_id
+    ) r ON r.dish_id = d.id
+    LEFT JOIN rings ON rings.dish_id = d.id
+    WHERE o.dish_id IS NOT NULL OR v.dish_id IS NOT NULL OR r.dish_id IS NOT NULL
+    ON CONFLICT (dish_id) DO UPDATE SET
+        restaurant_place_id = EXCLUDED.restaurant_place_id,
+        order_count = EXCLUDED.order_count,
+        view_count = EXCLUDED.view_count,
+        rating_sum = EXCLUDED.rating_sum,
+        rating_count = EXCLUDED.rating_count,
+        recent_order_count = EXCLUDED.recent_order_count,
+        order_buckets = EXCLUDED.order_buckets,
+        buckets_day = EXCLUDED.buckets_day,
+        updated_at = now();
+$$;
+
+-- Backfill the rings
+SELECT public.compact_dish_stats();
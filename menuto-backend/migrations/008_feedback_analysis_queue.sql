@@ -0,0 +1,33 @@
+-- Migration 008: Queue columns for background feedback analysis
+-- Rating submissions no longer wait on Gemini. A rating with feedback_text is
+-- stored with taste_signals_status = 'pending' and the FeedbackAnalysisWorker
+-- fills in taste_signals later, so dish_ratings itself is the persistent queue.
+-- Safe to run multiple times.
+
+-- 'pending' -> 'done' on success, 'failed' after max attempts; NULL = nothing to analyze
+ALTER TABLE public.dish_ratings ADD COLUMN IF NOT EXISTS
+    taste_signals_status TEXT DEFAULT NULL;
+
+ALTER TABLE public.dish_ratings ADD COLUMN IF NOT EXISTS
+    taste_signals_attempts INTEGER NOT NULL DEFAULT 0;
+
+-- Earliest time a worker may (re)claim the row; also acts as the claim lease
+ALTER TABLE public.dish_ratings ADD COLUMN IF NOT EXISTS
+    taste_signals_next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE INDEX IF NOT EXISTS idx_dish_ratings_taste_signals_pending
+    ON dish_ratings (taste_signals_next_attempt_at)
+    WHERE taste_signals_status = 'pending';
+
+-- Enqueue feedback that was never analyzed (e.g. Gemini errors before this migration)
+UPDATE public.dish_ratings
+SET taste_signals_status = 'pending'
+WHERE taste_signals IS NULL
+  AND taste_signals_status IS NULL
+  AND feedback_text IS NOT NULL
+  AND btrim(feedback_text) <> '';
+
+UPDATE public.dish_ratings
+SET taste_signals_status = 'done'
+WHERE taste_signals IS NOT NULL
+  AND taste_signals_status IS NULL;
@@ -0,0 +1,24 @@
+-- Migration 009: Atomic Thompson Sampling prior updates
+-- One feedback event used to cost a select + upsert per scoring component and
+-- lost updates when two ratings for the same user landed together.
+-- increment_weight_priors applies every component's Beta increment in one
+-- statement, starting new rows from the Beta(2, 2) default.
+-- Depends on 004_user_weight_priors.sql. Safe to run multiple times.
+
+-- p_deltas: {"<component>": {"alpha": <increment>, "beta": <increment>}, ...}
+CREATE OR REPLACE FUNCTION public.increment_weight_priors(p_user_id TEXT, p_deltas JSONB)
+RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO public.user_weight_priors AS p (user_id, component, alpha, beta, updated_at)
+    SELECT
+        p_user_id,
+        d.key,
+        2.0 + COALESCE((d.value->>'alpha')::DOUBLE PRECISION, 0),
+        2.0 + COALESCE((d.value->>'beta')::DOUBLE PRECISION, 0),
+        now()
+    FROM jsonb_each(p_deltas) AS d
+    ON CONFLICT (user_id, component) DO UPDATE SET
+        alpha = p.alpha + (EXCLUDED.alpha - 2.0),
+        beta = p.beta + (EXCLUDED.beta - 2.0),
+        updated_at = now();
+$$;
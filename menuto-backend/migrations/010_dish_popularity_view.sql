@@ -0,0 +1,56 @@
+-- Migration 010: Per-dish popularity computed in Postgres
+-- The popular-dishes endpoint used to fetch per-dish rows for every dish on a
+-- restaurant's menus (a huge `in` filter on busy restaurants) and score them in
+-- Python. dish_popularity exposes the aggregates plus the popularity score so
+-- the endpoint can filter by place, order by score and page with one query.
+-- Depends on 006/007. Safe to run multiple times.
+--
+-- popularity_score mirrors app/services/popularity.py (keep them in sync):
+--   min(orders/10, 1)                              (orders, weight 1.0)
+-- + ((avg_rating - 1) / 4) * 0.8   if ratings >= 3 (ratings, weight 0.8)
+-- + min(views/50, 1) * 0.3                        (views, weight 0.3)
+-- + recent_order_boost * 0.2                      (trending, weight 0.2)
+-- capped at 1.0, where recent_order_boost = min(orders_30d / orders, 1) * 0.3.
+
+CREATE OR REPLACE VIEW public.dish_popularity AS
+WITH base AS (
+    SELECT
+        d.id AS dish_id,
+        m.place_id,
+        d.name,
+        d.description,
+        d.category,
+        d.price,
+        s.order_count,
+        s.view_count,
+        s.rating_count,
+        s.order_buckets,
+        s.buckets_day,
+        CASE WHEN s.rating_count > 0 THEN s.rating_sum / s.rating_count ELSE 0 END AS avg_rating,
+        -- Re-window the daily ring to today so stale rows don't overstate trends
+        (
+            SELECT COALESCE(SUM(x), 0)
+            FROM unnest(public.shift_order_buckets(s.order_buckets, s.buckets_day, CURRENT_DATE)) AS x
+        ) AS recent_order_count
+    FROM public.dish_stats s
+    JOIN public.parsed_dishes d ON d.id = s.dish_id
+    JOIN public.parsed_menus m ON m.id = d.menu_id
+)
+SELECT
+    base.*,
+    CASE WHEN order_count > 0
+        THEN LEAST(recent_order_count::DOUBLE PRECISION / order_count, 1.0) * 0.3
+        ELSE 0
+    END AS recent_order_boost,
+    LEAST(
+        LEAST(order_count / 10.0, 1.0)
+        + CASE WHEN rating_count >= 3 THEN ((avg_rating - 1.0) / 4.0) * 0.8 ELSE 0 END
+        + LEAST(view_count / 50.0, 1.0) * 0.3
+        + CASE WHEN order_count > 0
+            THEN LEAST(recent_order_count::DOUBLE PRECISION / order_count, 1.0) * 0.3 * 0.2
+            ELSE 0
+          END,
+        1.0
+    ) AS popularity_score
+FROM base
+WHERE order_count > 0 OR view_count > 0 OR rating_count > 0;
@@ -0,0 +1,45 @@
+-- Migration 011: Single-flight leases for review refreshes
+-- When a popular restaurant's review_cache row expires, every API worker used
+-- to call Google Places + Gemini at once. A worker must now hold the
+-- place's lease to refresh; the others wait for the new cache row.
+-- Leases expire on their own, so a crashed holder never blocks refreshes.
+-- Safe to run multiple times.
+
+CREATE TABLE IF NOT EXISTS public.review_refresh_leases (
+    place_id TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+ALTER TABLE public.review_refresh_leases ENABLE ROW LEVEL SECURITY;
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_policies WHERE tablename = 'review_refresh_leases' AND policyname = 'Service role full access') THEN
+        CREATE POLICY "Service role full access" ON public.review_refresh_leases FOR ALL USING (true);
+    END IF;
+END $$;
+
+-- TRUE if p_holder now holds the lease (new, expired, or already its own)
+CREATE OR REPLACE FUNCTION public.try_acquire_review_lease(
+    p_place_id TEXT,
+    p_holder TEXT,
+    p_ttl_seconds INTEGER DEFAULT 60
+) RETURNS BOOLEAN
+LANGUAGE sql AS $$
+    WITH acquired AS (
+        INSERT INTO public.review_refresh_leases AS l (place_id, holder, expires_at)
+        VALUES (p_place_id, p_holder, now() + make_interval(secs => p_ttl_seconds))
+        ON CONFLICT (place_id) DO UPDATE SET
+            holder = EXCLUDED.holder,
+            expires_at = EXCLUDED.expires_at
+        WHERE l.expires_at < now() OR l.holder = EXCLUDED.holder
+        RETURNING 1
+    )
+    SELECT EXISTS (SELECT 1 FROM acquired);
+$$;
+
+CREATE OR REPLACE FUNCTION public.release_review_lease(p_place_id TEXT, p_holder TEXT)
+RETURNS void
+LANGUAGE sql AS $$
+    DELETE FROM public.review_refresh_leases WHERE place_id = p_place_id AND holder = p_holder;
+$$;
@@ -0,0 +1,51 @@
+import random
+
+from app.services.dish_name_index import DishNameIndex
+
+
+def _nested_scan(entries: dict, name: str):
+    name_lower = name.lower()
+    for known, value in entries.items():
+        if known.lower() in name_lower or name_lower in known.lower():
+            return value
+    return None
+
+
+def test_lookup_matches_in_both_directions():
+    index = DishNameIndex({"Margherita Pizza": 0.9, "Tiramisu": 0.7})
+
+    assert index.lookup("Margherita Pizza with Basil") == 0.9  # known name inside item
+    assert index.lookup("tiramisu") == 0.7  # case-insensitive exact
+    assert index.lookup("Pizza") == 0.9  # item inside known name
+    assert index.lookup("Caesar Salad") is None
+    assert index.lookup("Caesar Salad", 0.0) == 0.0
+
+
+def test_lookup_returns_first_match_in_insertion_order():
+    index = DishNameIndex({"Pizza": 1, "Margherita Pizza": 2})
+
+    assert index.lookup("Margherita Pizza") == 1
+
+
+def test_short_names_and_queries():
+    index = DishNameIndex({"Pho": 1, "BLT": 2, "Ta": 3})
+
+    assert index.lookup("Beef Pho") == 1
+    assert index.lookup("ta") == 3
+    assert index.lookup("Tacos") == 3
+    assert index.lookup("") == 1  # empty string is inside every name
+
+
+def test_lookup_agrees_with_nested_scan():
+    rng = random.Random(7)
+    words = ["pizza", "pasta", "truffle", "spicy", "tuna", "roll", "salad", "soup", "pho", "ramen", "bao"]
+
+    def random_name():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(1, 3))).title()
+
+    entries = {random_name(): i for i in range(60)}
+    index = DishNameIndex(entries)
+
+    for _ in range(300):
+        query = random_name()
+        assert index.lookup(query) == _nested_scan(entries, query)
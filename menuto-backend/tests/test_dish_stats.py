@@ -0,0 +1,22 @@
+from app.services.dish_stats import DishStats
+
+
+def test_from_row_tolerates_nulls_and_derives_rating():
+    stats = DishStats.from_row({
+        "dish_id": "7", "order_count": 4, "view_count": None,
+        "rating_sum": 13.0, "rating_count": 3, "recent_order_count": 3,
+    })
+
+    assert stats.dish_id == 7
+    assert stats.view_count == 0
+    assert round(stats.avg_rating, 3) == 4.333
+    assert stats.is_trending
+    assert stats.recent_order_boost == 0.3 * 0.75
+
+
+def test_missing_dish_reads_as_zeros():
+    stats = DishStats(dish_id=1)
+
+    assert stats.avg_rating == 0.0
+    assert stats.recent_order_boost == 0.0
+    assert not stats.is_trending
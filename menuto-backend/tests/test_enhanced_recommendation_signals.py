@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, ParsedDish, ParsedMenu
+from app.services.enhanced_recommendation_algorithm import EnhancedRecommendationAlgorithm
+
+
+def _session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE dish_orders (id INTEGER PRIMARY KEY, dish_id INTEGER, ordered_at TIMESTAMP)"))
+        conn.execute(text("CREATE TABLE dish_views (id INTEGER PRIMARY KEY, dish_id INTEGER)"))
+        conn.execute(text("CREATE TABLE dish_ratings (id INTEGER PRIMARY KEY, dish_id INTEGER, rating FLOAT)"))
+    return engine, sessionmaker(bind=engine)()
+
+
+def test_get_dish_signals_aggregates_with_constant_query_count():
+    engine, db = _session()
+    menu = ParsedMenu(place_id="p1", restaurant_name="R", restaurant_url="x", menu_url="x")
+    db.add(menu)
+    db.flush()
+    popular = ParsedDish(menu_id=menu.id, name="Popular", category="main, pasta", price=12)
+    quiet = ParsedDish(menu_id=menu.id, name="Quiet", category="starter")
+    db.add_all([popular, quiet])
+    db.flush()
+
+    now = datetime.utcnow()
+    for days_ago in (1, 2, 60, 90):
+        db.execute(text("INSERT INTO dish_orders (dish_id, ordered_at) VALUES (:d, :t)"),
+                   {"d": popular.id, "t": now - timedelta(days=days_ago)})
+    for _ in range(3):
+        db.execute(text("INSERT INTO dish_views (dish_id) VALUES (:d)"), {"d": popular.id})
+    for rating in (4, 5):
+        db.execute(text("INSERT INTO dish_ratings (dish_id, rating) VALUES (:d, :r)"), {"d": popular.id, "r": rating})
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    signals = EnhancedRecommendationAlgorithm(db).get_dish_signals("p1")
+
+    assert len(statements) == 4  # dishes + one GROUP BY per event table
+    s = signals[str(popular.id)]
+    assert (s.order_count, s.view_count, s.rating_count) == (4, 3, 2)
+    assert s.avg_rating == 4.5
+    assert s.recent_order_boost == 0.15  # 2 of 4 orders in the last 30 days → 0.5 × 0.3
+    assert s.categories == ["main", "pasta"]
+
+    q = signals[str(quiet.id)]
+    assert (q.order_count, q.view_count, q.rating_count, q.avg_rating) == (0, 0, 0, 0.0)
@@ -0,0 +1,109 @@
+import threading
+
+from app.services.event_buffer import WriteBehindBuffer
+
+
+class _Writer:
+    def __init__(self, fail_times=0, poison=()):
+        self.batches = []
+        self.calls = 0
+        self.fail_times = fail_times
+        self.poison = set(poison)
+        self.wrote = threading.Event()
+
+    def __call__(self, rows):
+        self.calls += 1
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("db down")
+        if any(r["id"] in self.poison for r in rows):
+            raise RuntimeError("foreign key violation")
+        self.batches.append(list(rows))
+        self.wrote.set()
+
+
+def test_unstarted_buffer_writes_through():
+    writer = _Writer()
+    buf = WriteBehindBuffer("views", writer)
+
+    buf.add({"id": 1})
+
+    assert writer.batches == [[{"id": 1}]]
+    assert len(buf) == 0
+
+
+def test_background_flush_on_batch_size_and_close():
+    writer = _Writer()
+    buf = WriteBehindBuffer("views", writer, batch_size=3, flush_interval_s=60)
+    buf.start()
+
+    for i in range(3):
+        buf.add({"id": i})
+    assert writer.wrote.wait(2)
+    assert writer.batches[0] == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+    buf.add({"id": 3})
+    buf.close()
+    assert writer.batches[-1] == [{"id": 3}]
+
+
+def test_failed_flush_requeues_and_caps_pending():
+    writer = _Writer(fail_times=1)
+    buf = WriteBehindBuffer("views", writer, batch_size=10, max_pending=2)
+
+    buf.add({"id": 1})  # write-through fails -> requeued
+    assert len(buf) == 1
+
+    buf.add({"id": 2})  # retried together
+    assert writer.batches == [[{"id": 1}, {"id": 2}]]
+
+    buf.max_row_attempts = 100
+    writer.fail_times = 10_000  # outage
+    for i in range(4):
+        buf.add({"id": 10 + i})
+    assert [r["id"] for r in buf._pending] == [12, 13]  # oldest dropped
+
+
+def test_poison_row_is_isolated_then_dropped():
+    written = []
+    writer = _Writer(poison={3})
+    buf = WriteBehindBuffer("views", writer, batch_size=8, max_row_attempts=2, on_written=written.extend)
+    buf._thread = threading.Thread(target=lambda: None)  # started, but drive flushes by hand
+    buf._stopped.set()
+
+    for i in range(8):
+        buf.add({"id": i})
+    assert buf.flush() == 7
+    assert sorted(r["id"] for r in written) == [0, 1, 2, 4, 5, 6, 7]
+    assert [r["id"] for r in buf._pending] == [3]  # retried next cycle
+
+    buf.flush()
+    assert len(buf) == 0  # gave up after max_row_attempts
+    assert buf._attempts == {}
+
+
+def test_outage_does_not_bisect_every_row():
+    writer = _Writer(fail_times=10_000)
+    buf = WriteBehindBuffer("views", writer, batch_size=100)
+    buf._thread = threading.Thread(target=lambda: None)
+    buf._stopped.set()
+
+    for i in range(100):
+        buf.add({"id": i})
+    buf.flush()
+
+    assert writer.calls <= 1 + 16
+    assert len(buf) == 100
+
+
+def test_started_buffer_never_flushes_inline_under_backpressure():
+    writer = _Writer()
+    buf = WriteBehindBuffer("views", writer, batch_size=100, max_pending=3)
+    buf._thread = threading.Thread(target=lambda: None)
+    buf._stopped.set()
+
+    for i in range(5):
+        buf.add({"id": i})
+
+    assert writer.calls == 0
+    assert [r["id"] for r in buf._pending] == [2, 3, 4]
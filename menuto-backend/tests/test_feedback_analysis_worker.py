@@ -0,0 +1,118 @@
+import json
+from types import SimpleNamespace
+
+from app.services.feedback_analysis import FeedbackAnalysisWorker, build_batch_prompt
+
+
+class _Query:
+    """Just enough of the Supabase query builder for the worker."""
+
+    def __init__(self, db, table):
+        self.db, self.table, self.filters, self.patch, self.n = db, table, [], None, None
+
+    def select(self, *_):
+        return self
+
+    def update(self, patch):
+        self.patch = patch
+        return self
+
+    def eq(self, col, val):
+        self.filters.append(lambda r: r.get(col) == val)
+        return self
+
+    def lte(self, col, val):
+        self.filters.append(lambda r: r.get(col) <= val)
+        return self
+
+    def in_(self, col, vals):
+        self.filters.append(lambda r: r.get(col) in vals)
+        return self
+
+    def order(self, *_):
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    def execute(self):
+        rows = [r for r in self.db[self.table] if all(f(r) for f in self.filters)][: self.n]
+        if self.patch is not None:
+            for r in rows:
+                r.update(self.patch)
+        return SimpleNamespace(data=[dict(r) for r in rows])
+
+
+class _FakeSupabase:
+    def __init__(self, db):
+        self.db = db
+
+    def table(self, name):
+        return _Query(self.db, name)
+
+
+def _db():
+    past = "2000-01-01T00:00:00+00:00"
+    return {
+        "dish_ratings": [
+            {"id": i, "dish_id": 10 + i, "rating": 4, "feedback_text": f"loved it {i}",
+             "taste_signals_status": "pending", "taste_signals_attempts": 0,
+             "taste_signals_next_attempt_at": past}
+            for i in range(1, 4)
+        ] + [
+            {"id": 9, "dish_id": 19, "rating": 5, "feedback_text": "done already",
+             "taste_signals_status": "done", "taste_signals_attempts": 0,
+             "taste_signals_next_attempt_at": past},
+        ],
+        "parsed_dishes": [{"id": 11, "name": "Cacio e Pepe"}],
+    }
+
+
+def test_batch_prompt_keys_each_feedback_by_rating_id():
+    prompt = build_batch_prompt([
+        {"id": 7, "dish_name": "Ramen", "rating": 5, "feedback_text": "rich broth"},
+        {"id": 8, "dish_name": "Gyoza", "rating": 2, "feedback_text": "soggy"},
+    ])
+
+    assert "[7]\nDish: Ramen" in prompt
+    assert "[8]\nDish: Gyoza" in prompt
+
+
+def test_worker_analyzes_pending_rows_in_one_call():
+    db = _db()
+    calls = []
+
+    def analyze(items):
+        calls.append(items)
+        return {str(i["id"]): {"liked": [i["feedback_text"]]} for i in items}
+
+    worker = FeedbackAnalysisWorker(_FakeSupabase(db), batch_size=10, analyze=analyze)
+    assert worker.run_once() == 3
+
+    assert len(calls) == 1
+    assert calls[0][0]["dish_name"] == "Cacio e Pepe"
+    rows = {r["id"]: r for r in db["dish_ratings"]}
+    assert rows[1]["taste_signals_status"] == "done"
+    assert json.loads(rows[2]["taste_signals"]) == {"liked": ["loved it 2"]}
+    assert worker.run_once() == 0  # nothing left to claim
+
+
+def test_worker_backs_off_then_gives_up():
+    db = _db()
+
+    def analyze(items):
+        raise RuntimeError("quota")
+
+    worker = FeedbackAnalysisWorker(_FakeSupabase(db), batch_size=10, max_attempts=2, analyze=analyze)
+    worker.run_once()
+
+    row = db["dish_ratings"][0]
+    assert row["taste_signals_status"] == "pending"
+    assert row["taste_signals_attempts"] == 1
+    assert row["taste_signals_next_attempt_at"] > "2000-01-01"
+    assert worker.run_once() == 0  # backing off
+
+    row["taste_signals_next_attempt_at"] = "2000-01-01T00:00:00+00:00"
+    worker.run_once()
+    assert row["taste_signals_status"] == "failed"
@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.google_client import GoogleApiClient
+
+
+def _client(responses, calls):
+    def handler(request):
+        calls.append(dict(request.url.params))
+        status, body = responses.pop(0)
+        return httpx.Response(status, json=body)
+
+    return GoogleApiClient(backoff_base_s=0.001, requests_per_second=0, transport=httpx.MockTransport(handler))
+
+
+def test_retries_server_errors_and_quota_statuses_then_succeeds():
+    calls = []
+    client = _client([(503, {}), (200, {"status": "OVER_QUERY_LIMIT"}), (200, {"status": "OK", "result": {}})], calls)
+    try:
+        assert client.get_json("https://example.test/details", {"place_id": "p1"}) == {"status": "OK", "result": {}}
+    finally:
+        client.close()
+    assert len(calls) == 3
+    assert calls[0] == {"place_id": "p1"}
+
+
+def test_gives_up_after_max_retries():
+    calls = []
+    client = _client([(500, {})] * 3, calls)
+    client.max_retries = 2
+    try:
+        with pytest.raises(httpx.HTTPStatusError):
+            client.get_json("https://example.test/details", {})
+    finally:
+        client.close()
+    assert len(calls) == 3
+
+
+def test_async_callers_share_the_pool_from_another_loop():
+    calls = []
+    client = _client([(200, {"status": "OK", "n": i}) for i in range(5)], calls)
+
+    async def search():
+        return await asyncio.gather(*(client.aget_json("https://example.test/search", {"q": i}) for i in range(5)))
+
+    try:
+        results = asyncio.run(search())
+    finally:
+        client.close()
+    assert sorted(r["n"] for r in results) == [0, 1, 2, 3, 4]
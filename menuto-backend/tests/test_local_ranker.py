@@ -0,0 +1,97 @@
+from app.services.local_ranker import prerank, score_candidate
+from app.services.recommendation_types import ItemFeatures
+
+
+def _enriched(name: str, course: str, taste: float = 0.5, popularity: float = 0.0, **overrides):
+    item = ItemFeatures(
+        item_id=name, name=name, description="", price=None, cuisine=None,
+        spice_level=None, richness=None, textures=[], protein=None,
+        is_shareable=False, course=course, sentiment_score=None,
+    )
+    e = {
+        "item": item,
+        "taste_similarity": taste,
+        "popularity": popularity,
+        "review_sentiment": 0.0,
+        "past_rating": None,
+        "behavior": None,
+        "craving_match": False,
+        "liked_keywords_found": [],
+        "disliked_keywords_found": [],
+        "course": course,
+        "cuisine": "unknown",
+    }
+    e.update(overrides)
+    return e
+
+
+def test_score_candidate_rewards_cravings_and_penalizes_dislikes():
+    base = _enriched("Plain", "main")
+    craving = _enriched("Craved", "main", craving_match=True)
+    disliked = _enriched("Disliked", "main", disliked_keywords_found=["too salty"])
+
+    assert score_candidate(craving) > score_candidate(base) > score_candidate(disliked)
+
+
+def test_prerank_keeps_top_k_by_score_regardless_of_menu_order():
+    menu = [_enriched(f"Main {i}", "main", taste=i / 10) for i in range(10)]
+
+    shortlist = prerank(menu, 3)
+
+    assert [e["item"].name for e in shortlist] == ["Main 9", "Main 8", "Main 7"]
+
+
+def test_prerank_keeps_best_dish_of_each_course():
+    menu = [_enriched(f"Main {i}", "main", taste=0.9) for i in range(5)]
+    menu.append(_enriched("Tiramisu", "dessert", taste=0.1))
+
+    shortlist = prerank(menu, 3)
+
+    assert len(shortlist) == 3
+    assert "Tiramisu" in [e["item"].name for e in shortlist]
+
+
+def test_local_ranker_builds_a_structured_meal_and_respects_history():
+    from app.services.local_ranker import LocalRanker
+    from app.services.recommendation_types import RecommendationContext
+
+    menu = [_enriched(f"Pasta {i}", "main", taste=0.9) for i in range(6)]
+    menu += [
+        _enriched("Burrata", "starter", taste=0.6),
+        _enriched("Tiramisu", "dessert", taste=0.5),
+        _enriched("Spicy Arrabbiata", "main", taste=0.3, craving_match=True),
+        _enriched("Carbonara", "main", taste=1.0, past_rating=1),
+    ]
+    context = RecommendationContext(craving_tags=["spicy"])
+
+    picks = LocalRanker().rank(menu, context, 5)
+    names = [p.item.name for p in picks]
+
+    assert len(picks) == 5
+    assert "Carbonara" not in names  # rated 1★
+    assert "Spicy Arrabbiata" in names  # craving honored
+    assert sum(1 for p in picks if p.item.course == "main") <= 3
+    assert all(p.explanations for p in picks)
+
+
+def test_lexical_taste_similarity_is_neutral_without_history():
+    from app.services.local_ranker import lexical_taste_similarity
+
+    items = [_enriched("Truffle Mushroom Risotto", "main")["item"], _enriched("Fish Tacos", "main")["item"]]
+
+    assert lexical_taste_similarity(items, []) == {}
+    scores = lexical_taste_similarity(items, ["Mushroom Risotto"])
+    assert scores["Truffle Mushroom Risotto"] > scores["Fish Tacos"]
+    assert scores["Fish Tacos"] == 0.5  # no overlap is neutral, not a penalty
+
+
+def test_validate_weights_accepts_known_numeric_overrides_only():
+    import pytest
+
+    from app.services.local_ranker import validate_weights
+
+    assert validate_weights(None) is None
+    assert validate_weights({"popularity": 1, "disliked_keywords": -0.5}) == {"popularity": 1.0, "disliked_keywords": -0.5}
+    for bad in (["popularity"], {"popularityy": 0.2}, {"popularity": "high"}, {"popularity": True}, {"popularity": float("nan")}):
+        with pytest.raises(ValueError):
+            validate_weights(bad)
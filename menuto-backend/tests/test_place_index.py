@@ -0,0 +1,107 @@
+from app.services.place_index import PlaceIndex
+
+_MENUS = [
+    {"id": 1, "place_id": "g-joes", "restaurant_name": "Joe's Pizza", "cuisine_type": "pizza"},
+    {"id": 2, "place_id": "g-joes", "restaurant_name": "Joe's Pizza", "cuisine_type": "italian"},
+    {"id": 3, "place_id": None, "restaurant_name": "Pizzeria Delfina", "restaurant_url": "delfina.com"},
+    {"id": 4, "place_id": "g-nagi", "restaurant_name": "Ramen Nagi", "cuisine_type": "japanese"},
+]
+
+
+def _index():
+    index = PlaceIndex()
+    index.build(_MENUS)
+    return index
+
+
+def test_newest_menu_per_place_wins_and_unplaced_menus_get_menu_ids():
+    index = _index()
+
+    assert len(index) == 3
+    names = {e.key: e.cuisine_type for e, _ in index.search("pizz")}
+    assert names == {"g-joes": "italian", "menu_3": "restaurant"}
+
+
+def test_search_ranks_substring_and_prefix_matches_and_tolerates_typos():
+    index = _index()
+
+    assert [e.name for e, _ in index.search("ramen")] == ["Ramen Nagi"]
+    assert index.search("ra")[0][0].name == "Ramen Nagi"  # short queries: word prefixes
+    typo = index.search("ramne nagi")
+    assert typo and typo[0][0].name == "Ramen Nagi" and typo[0][1] < 1.0
+    assert index.search("sushi") == []
+
+
+def test_has_menu_and_merge_with_google_results():
+    index = _index()
+    local = [e.as_search_result() for e, _ in index.search("pizza")]
+    google = [
+        {"place_id": "g-joes", "name": "Joe's Pizza"},
+        {"place_id": "g-delfina", "name": "Pizzeria Delfina"},
+        {"place_id": "g-tonys", "name": "Tony's Pizza"},
+    ]
+
+    merged = index.merge_results(local, google)
+
+    assert [r["place_id"] for r in merged] == [r["place_id"] for r in local] + ["g-tonys"]
+    assert merged[-1]["has_menu"] is False
+    assert index.has_menu("g-nagi") and index.has_menu(None, "pizzeria  delfina")
+    assert not index.has_menu("g-other", "Joe's Pizza")  # named matches only for menus without a place_id
+
+
+class _FakeSupabase:
+    def __init__(self, rows, fail=False):
+        self.rows, self.fail = rows, fail
+        self.calls = 0
+        self.selected = None
+
+    def table(self, name):
+        return self
+
+    def select(self, columns):
+        self.selected = columns
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self._page = self.rows[start:end + 1]
+        return self
+
+    def execute(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("supabase down")
+        return type("Result", (), {"data": self._page})()
+
+
+def test_failed_build_backs_off_before_retrying():
+    sb = _FakeSupabase(_MENUS, fail=True)
+    index = PlaceIndex(retry_seconds=60)
+
+    assert index.ensure_fresh(sb) is False
+    assert index.ensure_fresh(sb) is False
+    assert sb.calls == 1
+
+    index._failed_at -= 61
+    sb.fail = False
+    assert index.ensure_fresh(sb) is True
+    assert sb.selected == "*"  # tolerates tables without a place_id column
+    assert len(index) == 3
+
+
+def test_saved_menu_counts_immediately_and_triggers_a_rebuild():
+    sb = _FakeSupabase(list(_MENUS))
+    index = PlaceIndex(refresh_seconds=3600)
+    index.ensure_fresh(sb)
+
+    index.mark_stale("g-new", "New Place")
+    sb.rows.append({"id": 5, "place_id": "g-new", "restaurant_name": "New Place"})
+
+    assert index.has_menu("g-new")
+    assert index.ensure_fresh(sb) is True
+    with index._refreshing:  # waits for the background rebuild
+        pass
+    assert [e.key for e, _ in index.search("new place")] == ["g-new"]
+    assert not index._stale
@@ -0,0 +1,40 @@
+from app.services.place_search_cache import PlaceSearchCache, geohash, location_cell
+
+
+def _places(*names):
+    return [{"place_id": n.lower().replace(" ", "-"), "name": n} for n in names]
+
+
+def test_geohash_matches_reference_and_groups_nearby_locations():
+    assert geohash(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+    assert location_cell("37.7749,-122.4194") == location_cell("37.7755,-122.4188")
+    assert location_cell("37.7749,-122.4194") != location_cell("40.7128,-74.0060")
+    assert location_cell(None) == ""
+
+
+def test_key_normalizes_query_and_home_base():
+    assert PlaceSearchCache.key("  Joe's   PIZZA ", None, "New York") == ("joe's pizza", "", "new york")
+
+
+def test_exact_hit_returns_copies():
+    cache = PlaceSearchCache(maxsize=10, ttl_seconds=60)
+    key = cache.key("ramen", "37.7749,-122.4194", None)
+    cache.set(key, _places("Ramen Nagi"))
+
+    first, status = cache.get(key)
+    assert status == "hit"
+    first[0]["name"] = "mutated"
+    assert cache.get(key)[0][0]["name"] == "Ramen Nagi"
+
+
+def test_longer_query_reuses_prefix_results_only_when_enough_still_match():
+    cache = PlaceSearchCache(maxsize=10, ttl_seconds=60, prefix_min_results=2)
+    loc = "37.7749,-122.4194"
+    cache.set(cache.key("piz", loc, None), _places("Pizza Hut", "Tony's Pizza", "Pizzeria Delfina", "Pho 24"))
+
+    narrowed, status = cache.get(cache.key("pizz", loc, None))
+    assert status == "prefix"
+    assert [r["name"] for r in narrowed] == ["Pizza Hut", "Tony's Pizza", "Pizzeria Delfina"]
+
+    assert cache.get(cache.key("pizza hut", loc, None)) == (None, "miss")  # one match is too few
+    assert cache.get(cache.key("pizz", "40.7128,-74.0060", None)) == (None, "miss")  # other cell
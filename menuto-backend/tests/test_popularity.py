@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.services.enhanced_recommendation_algorithm import DishSignals, EnhancedRecommendationAlgorithm
+from app.services.popularity import popularity_score, popularity_scores
+
+
+def _reference(oc, vc, avg, rc, roc):
+    """The per-dish formula as it used to be written inline."""
+    boost = min(roc / max(oc, 1), 1.0) * 0.3 if oc > 0 else 0.0
+    rating = ((avg - 1.0) / 4.0) * 0.8 if rc >= 3 else 0.0
+    return min(min(oc / 10.0, 1.0) + rating + min(vc / 50.0, 1.0) * 0.3 + boost * 0.2, 1.0)
+
+
+def test_vectorized_scores_match_per_dish_formula():
+    rng = np.random.default_rng(7)
+    n = 200
+    oc = rng.integers(0, 20, n)
+    roc = np.minimum(rng.integers(0, 20, n), oc)
+    vc = rng.integers(0, 120, n)
+    rc = rng.integers(0, 6, n)
+    avg = rng.uniform(1, 5, n)
+
+    scores = popularity_scores(oc, vc, avg * rc, rc, roc)
+
+    expected = [_reference(*args) for args in zip(oc, vc, avg, rc, roc)]
+    assert np.allclose(scores, expected)
+
+
+def test_single_dish_wrapper_and_edge_cases():
+    assert popularity_score(0, 0, 0.0, 0, 0) == 0.0
+    assert popularity_score(50, 500, 25.0, 5, 50) == 1.0
+    # Two 5-star ratings are not enough to count
+    assert popularity_score(0, 0, 10.0, 2, 0) == 0.0
+
+
+def test_enhanced_algorithm_uses_shared_scores():
+    signals = [
+        DishSignals(dish_id="1", dish_name="A", order_count=5, view_count=10,
+                    avg_rating=4.5, rating_count=4, recent_order_count=2),
+        DishSignals(dish_id="2", dish_name="B"),
+    ]
+    scores = EnhancedRecommendationAlgorithm.calculate_popularity_scores(signals)
+
+    assert np.allclose(scores, [_reference(5, 10, 4.5, 4, 2), 0.0])
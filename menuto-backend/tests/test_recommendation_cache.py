@@ -0,0 +1,114 @@
+import time
+
+from app.services.recommendation_cache import (
+    cache_response,
+    get_cached_response,
+    invalidate_restaurant_recommendations,
+    invalidate_user_recommendations,
+    recommendation_cache_key,
+)
+from app.services.ttl_cache import TTLCache, cache_stats
+
+
+def _key(context_weights, user_id="u1", place_id="place-1", **overrides):
+    kwargs = dict(
+        restaurant_place_id=place_id,
+        user_id=user_id,
+        context_weights=context_weights,
+        user_favorite_dishes=[{"dish_name": "Pad Thai"}],
+        user_dietary_constraints=["vegetarian"],
+        friend_selections=[],
+        meal_period="dinner",
+        hunger=4,
+    )
+    kwargs.update(overrides)
+    return recommendation_cache_key(**kwargs)
+
+
+def test_cache_key_ignores_cosmetic_differences():
+    a = {"selectedCravings": ["Spicy", "noodles"], "freeTextMood": "Feeling  adventurous"}
+    b = {"selectedCravings": ["noodles ", "spicy"], "freeTextMood": "feeling adventurous"}
+
+    assert _key(a) == _key(b)
+    assert _key(a) != _key({"selectedCravings": ["sweet"]})
+    assert _key(a) != _key(a, meal_period="lunch")
+    assert _key(a) != _key(a, user_favorite_dishes=[{"dish_name": "Green Curry"}])
+
+
+def test_cache_key_changes_after_user_invalidation():
+    before = _key({}, user_id="u-invalidate")
+
+    invalidate_user_recommendations("u-invalidate")
+    after = _key({}, user_id="u-invalidate")
+    invalidate_user_recommendations("u-invalidate")
+
+    assert after != before
+    assert _key({}, user_id="u-invalidate") not in (before, after)
+
+
+def test_saved_menu_drops_only_that_restaurants_responses():
+    menu_key = _key({}, place_id="place-menu")
+    other_key = _key({}, place_id="place-other")
+    cache_response(menu_key, {"recommendations": [1]})
+    cache_response(other_key, {"recommendations": [2]})
+
+    invalidate_restaurant_recommendations("place-menu")
+
+    assert get_cached_response(menu_key) is None
+    assert get_cached_response(other_key) == {"recommendations": [2]}
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # touch → "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    cache.set("short", 4, ttl_seconds=0.01)
+    time.sleep(0.02)
+    assert cache.get("short", "gone") == "gone"
+
+
+def test_ttl_cache_counts_hits_misses_and_evictions():
+    cache = TTLCache(maxsize=2, ttl_seconds=60, name="test_stats")
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    stats = cache_stats()["test_stats"]
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert stats["size"] == 2
+
+
+class _DictBackend:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl_seconds):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def test_ttl_cache_shares_entries_through_backend():
+    backend = _DictBackend()
+    writer = TTLCache(ttl_seconds=60, backend=backend)
+    reader = TTLCache(ttl_seconds=60, backend=backend)
+
+    writer.set(42, {"order_count": 3})
+    assert reader.get(42) == {"order_count": 3}  # filled from the shared tier
+
+    writer.discard(42)
+    reader.clear()
+    assert reader.get(42) is None
@@ -0,0 +1,281 @@
+from app.services import review_ingestion
+from app.services.review_ingestion import ReviewSignals, get_dish_attributes, get_review_signals
+
+_REVIEWS = [
+    {"rating": 5.0, "sentiment_score": 1.0, "dish_mentions": ["margherita pizza", "Tiramisu"],
+     "dish_attributes": {"margherita pizza": ["thin crust"]}},
+    {"rating": 3.0, "sentiment_score": None, "dish_mentions": ["Margherita Pizza", "Margherita Pizza"],
+     "dish_attributes": {"Margherita Pizza": ["fresh basil", "thin crust"]}},
+]
+
+
+def test_signals_derive_popularity_sentiment_and_attributes():
+    signals = ReviewSignals.from_reviews("p1", _REVIEWS)
+
+    assert signals.review_count == 2
+    assert signals.popularity == {"Margherita Pizza": 1.0, "Tiramisu": 0.5}
+    assert signals.sentiment["Tiramisu"] == 1.0
+    assert signals.sentiment["Margherita Pizza"] == round((1.0 + 0.6 + 0.6) / 3, 3)
+    assert sorted(signals.attributes["Margherita Pizza"]) == ["fresh basil", "thin crust"]
+
+
+def test_signals_fetch_reviews_once_per_place(monkeypatch):
+    calls = []
+
+    def fake_fetch(place_id):
+        calls.append(place_id)
+        return _REVIEWS
+
+    monkeypatch.setattr(review_ingestion, "get_reviews_for_restaurant", fake_fetch)
+    review_ingestion._signals_cache.clear()
+
+    get_review_signals("p1")
+    review_ingestion.get_review_based_popularity("p1")
+    review_ingestion.get_dish_sentiment_scores("p1")
+    get_dish_attributes("p1")
+    assert calls == ["p1"]
+
+    review_ingestion._cache_reviews("p1", _REVIEWS)  # re-cached reviews drop derived signals
+    get_review_signals("p1")
+    assert calls == ["p1", "p1"]
+
+
+class _FakeReviewCache:
+    def __init__(self, fetched_at):
+        self.row = {"fetched_at": fetched_at, "reviews": _REVIEWS}
+        self.selects = []
+
+    def table(self, _name):
+        return self
+
+    def select(self, columns):
+        self.selects.append(columns)
+        self._columns = columns
+        return self
+
+    def eq(self, *_):
+        return self
+
+    def maybe_single(self):
+        return self
+
+    def upsert(self, rows, **_):
+        self.row = rows[-1] if isinstance(rows, list) else rows
+        self.selects.append("upsert")
+        return self
+
+    def rpc(self, _name, _params):
+        return _Granted()
+
+    def execute(self):
+        from types import SimpleNamespace
+
+        return SimpleNamespace(data={c.strip(): self.row[c.strip()] for c in self._columns.split(",")})
+
+
+def _reset_memory_tier():
+    review_ingestion._review_heads.clear()
+    review_ingestion._review_blobs.clear()
+
+
+def test_memory_tier_skips_supabase_and_reuses_blob_on_revalidation(monkeypatch):
+    from datetime import datetime, timezone
+
+    fake = _FakeReviewCache(datetime.now(timezone.utc).isoformat())
+    monkeypatch.setattr(review_ingestion, "_sb", fake)
+    _reset_memory_tier()
+
+    assert review_ingestion._get_cached_reviews("p1") == _REVIEWS
+    assert fake.selects == ["fetched_at", "reviews, fetched_at"]
+
+    review_ingestion._get_cached_reviews("p1")
+    assert len(fake.selects) == 2  # served from memory
+
+    review_ingestion._review_heads.clear()  # head expired: re-read only fetched_at
+    review_ingestion._get_cached_reviews("p1")
+    assert fake.selects[2:] == ["fetched_at"]
+
+
+def test_memory_tier_treats_expired_row_as_miss(monkeypatch):
+    fake = _FakeReviewCache("2020-01-01T00:00:00+00:00")
+    monkeypatch.setattr(review_ingestion, "_sb", fake)
+    _reset_memory_tier()
+
+    assert review_ingestion._get_cached_reviews("p1") is None  # older than CACHE_TTL_DAYS
+    assert fake.selects == ["fetched_at"]
+
+
+def _slow_refresh(monkeypatch, calls):
+    import time
+
+    def fake_google(place_id):
+        calls.append(place_id)
+        time.sleep(0.2)
+        return [{"rating": 5.0, "text": "great"}]
+
+    monkeypatch.setattr(review_ingestion, "_fetch_google_reviews", fake_google)
+    monkeypatch.setattr(review_ingestion, "_enrich_reviews_batch", lambda raw, _pid: _REVIEWS)
+    monkeypatch.setattr(review_ingestion, "_sb", None)
+    _reset_memory_tier()
+
+
+def test_concurrent_misses_share_one_refresh(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = []
+    _slow_refresh(monkeypatch, calls)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(review_ingestion.get_reviews_for_restaurant, ["p1"] * 8))
+
+    assert calls == ["p1"]
+    assert all(r == _REVIEWS for r in results)
+
+
+def test_lease_held_elsewhere_waits_for_that_workers_row(monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    calls = []
+    _slow_refresh(monkeypatch, calls)
+    fake = _FakeReviewCache((datetime.now(timezone.utc) + timedelta(seconds=5)).isoformat())
+    fake.rpc = lambda name, params: fake if name != "try_acquire_review_lease" else _Denied()
+    monkeypatch.setattr(review_ingestion, "_sb", fake)
+    monkeypatch.setattr(review_ingestion, "_REFRESH_POLL_SECONDS", 0.01)
+
+    assert review_ingestion.refresh_reviews("p1") == _REVIEWS
+    assert calls == []  # the other worker's refresh was reused
+
+
+class _Denied:
+    def execute(self):
+        from types import SimpleNamespace
+
+        return SimpleNamespace(data=False)
+
+
+class _Granted:
+    def execute(self):
+        from types import SimpleNamespace
+
+        return SimpleNamespace(data=True)
+
+
+def test_stale_reviews_are_served_while_refreshing_in_background(monkeypatch):
+    import time
+    from datetime import datetime, timedelta, timezone
+
+    calls = []
+    _slow_refresh(monkeypatch, calls)
+    stale_row = (datetime.now(timezone.utc) - timedelta(days=review_ingestion.CACHE_TTL_DAYS + 1)).isoformat()
+    fake = _FakeReviewCache(stale_row)
+    fake.row["reviews"] = [{"rating": 2.0, "dish_mentions": []}]
+    monkeypatch.setattr(review_ingestion, "_sb", fake)
+
+    assert review_ingestion.get_reviews_for_restaurant("p1") == fake.row["reviews"]  # no wait on Google
+
+    deadline = time.monotonic() + 5
+    while review_ingestion._scheduled and time.monotonic() < deadline:  # let the refresh finish
+        time.sleep(0.01)
+    assert calls == ["p1"]
+    assert review_ingestion.get_reviews_for_restaurant("p1") == _REVIEWS
+
+
+def test_prompt_batches_respect_place_and_text_budgets():
+    from app.services.review_warmup import prompt_batches
+
+    reviews = {f"p{i}": [{"text": "x" * 100}] for i in range(5)}
+
+    assert [list(b) for b in prompt_batches(reviews, max_places=2, char_budget=10_000)] == [
+        ["p0", "p1"], ["p2", "p3"], ["p4"],
+    ]
+    assert [len(b) for b in prompt_batches(reviews, max_places=10, char_budget=250)] == [2, 2, 1]
+
+
+def test_warm_up_fetches_all_places_and_enriches_them_together(monkeypatch):
+    from app.services import review_warmup
+
+    enrich_calls = []
+    monkeypatch.setattr(review_ingestion, "_sb", None)
+    monkeypatch.setattr(review_ingestion, "_fetch_google_reviews",
+                        lambda pid: [] if pid == "empty" else [{"rating": 4.0, "text": f"good {pid}"}])
+    monkeypatch.setattr(review_ingestion, "_enrich_reviews_for_places",
+                        lambda batch: enrich_calls.append(sorted(batch)) or 1)
+    _reset_memory_tier()
+
+    result = review_warmup.warm_review_cache(["a", "b", "empty", "a"])
+
+    assert (result.requested, result.fetched, result.no_reviews, result.cached, result.llm_calls) == (3, 2, 1, 2, 1)
+    assert enrich_calls == [["a", "b"]]
+    assert review_ingestion._get_cached_reviews("b") == [{"rating": 4.0, "text": "good b"}]
+
+
+def test_multi_place_enrichment_falls_back_per_place_for_missing_keys(monkeypatch):
+    import json
+    from types import SimpleNamespace
+
+    prompts = []
+
+    def generate_content(model, contents, config):
+        prompts.append(contents)
+        if contents.startswith("Analyze the reviews of each restaurant"):
+            return SimpleNamespace(text=json.dumps({"R1": [{"review_index": 1, "dish_mentions": ["Ramen"]}]}))
+        return SimpleNamespace(text=json.dumps([{"review_index": 1, "dish_mentions": ["Gyoza"]}]))
+
+    client = SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+    monkeypatch.setattr(review_ingestion, "_gemini_client", client)
+    batch = {"a": [{"text": "ramen!"}], "b": [{"text": "gyoza!"}], "c": [{"text": ""}]}
+
+    calls = review_ingestion._enrich_reviews_for_places(batch)
+
+    assert calls == len(prompts) == 2  # one combined call + one retry for the place it skipped
+    assert batch["a"][0]["dish_mentions"] == ["Ramen"]
+    assert batch["b"][0]["dish_mentions"] == ["Gyoza"]
+    assert batch["c"][0]["dish_mentions"] == []
+
+
+def test_async_signals_keep_the_event_loop_running_during_a_refresh(monkeypatch):
+    import asyncio
+    import threading
+
+    calls = []
+    _slow_refresh(monkeypatch, calls)
+    review_ingestion._signals_cache.clear()
+    leader = threading.Thread(target=review_ingestion.get_reviews_for_restaurant, args=("p1",))
+    leader.start()  # holds the single flight for ~0.2s
+
+    async def main():
+        ticks = 0
+        waiter = asyncio.create_task(review_ingestion.aget_review_signals("p1"))
+        while not waiter.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return ticks, await waiter
+
+    ticks, signals = asyncio.run(main())
+    leader.join()
+
+    assert ticks >= 5  # other coroutines ran while this one waited on the flight
+    assert calls == ["p1"]
+    assert signals.popularity == {"Margherita Pizza": 1.0, "Tiramisu": 0.5}
+
+
+def test_empty_background_refresh_backs_off_instead_of_rescheduling(monkeypatch):
+    import time
+    from datetime import datetime, timedelta, timezone
+
+    calls = []
+    stale_row = (datetime.now(timezone.utc) - timedelta(days=review_ingestion.CACHE_TTL_DAYS + 1)).isoformat()
+    fake = _FakeReviewCache(stale_row)
+    monkeypatch.setattr(review_ingestion, "_sb", fake)
+    monkeypatch.setattr(review_ingestion, "_fetch_google_reviews", lambda pid: calls.append(pid) or [])
+    _reset_memory_tier()
+    review_ingestion._refresh_backoff.clear()
+
+    for _ in range(3):
+        assert review_ingestion.get_reviews_for_restaurant("p1") == _REVIEWS  # stale, served as-is
+        deadline = time.monotonic() + 5
+        while review_ingestion._scheduled and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert calls == ["p1"]  # the empty refresh wasn't retried on every request
+    review_ingestion._refresh_backoff.clear()
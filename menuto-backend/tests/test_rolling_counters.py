@@ -0,0 +1,48 @@
+from datetime import date
+
+from app.services.dish_stats import DishStats
+from app.services.rolling_counters import DailyBuckets
+
+
+def test_as_of_shifts_ring_and_drops_old_days():
+    buckets = DailyBuckets([5, 1, 2], day="2026-03-10")
+
+    assert buckets.as_of(date(2026, 3, 10))[:4] == [5, 1, 2, 0]
+    assert buckets.as_of(date(2026, 3, 12))[:5] == [0, 0, 5, 1, 2]
+    assert buckets.window(30, date(2026, 4, 8)) == 5  # only 3/10 is still inside the ring
+    assert buckets.window(30, date(2026, 4, 9)) == 0
+
+
+def test_add_advances_anchor_and_backfills_past_days():
+    buckets = DailyBuckets()
+    buckets.add(2, when=date(2026, 3, 10))
+    buckets.add(1, when=date(2026, 3, 12))
+    buckets.add(1, when=date(2026, 3, 11))  # late-arriving event
+
+    assert buckets.day == date(2026, 3, 12)
+    assert buckets.as_of(date(2026, 3, 12))[:3] == [1, 1, 2]
+    assert buckets.window(7, date(2026, 3, 12)) == 4
+
+
+def test_slope_and_momentum_follow_the_trend():
+    today = date(2026, 3, 31)
+    rising = DailyBuckets(list(range(14, 0, -1)), day=today)  # newest day has the most orders
+    flat = DailyBuckets([2] * 30, day=today)
+
+    assert rising.slope(14, today) == 1.0
+    assert flat.slope(14, today) == 0.0
+    assert rising.momentum(7, today) > 0.5
+    assert flat.momentum(7, today) == 0.0
+
+
+def test_dish_stats_recent_count_comes_from_the_ring():
+    row = {
+        "dish_id": 3, "order_count": 40, "recent_order_count": 99,
+        "order_buckets": [3, 2, 1] + [0] * 27, "buckets_day": "2026-03-31",
+    }
+    stats = DishStats.from_row(row, today=date(2026, 3, 31))
+
+    assert stats.recent_order_count == 6
+    assert stats.orders_last_7_days(date(2026, 3, 31)) == 6
+    assert stats.trend_score(date(2026, 3, 31)) == 1.0  # all orders this week
+    assert stats.trend_score(date(2026, 4, 30)) == 0.0  # quiet week: below the noise floor
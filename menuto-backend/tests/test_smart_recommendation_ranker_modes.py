@@ -0,0 +1,207 @@
+import time
+
+from app.services.recommendation_types import ItemFeatures, RecommendationContext, ScoredItem
+from app.services.smart_recommendation_algorithm import SmartRecommendationAlgorithm
+
+
+class _SlowEngine:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def analyze_user_taste_profile(self, favorite_dishes):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {}
+
+
+def _menu():
+    dishes = [("Pad Thai", "main"), ("Spring Rolls", "starter"), ("Green Curry", "main"), ("Mango Sticky Rice", "dessert")]
+    return [
+        ItemFeatures(
+            item_id=str(i), name=name, description="", price=None, cuisine=None,
+            spice_level=None, richness=None, textures=[], protein=None,
+            is_shareable=False, course=course, sentiment_score=None,
+        )
+        for i, (name, course) in enumerate(dishes)
+    ]
+
+
+def _generate(algorithm, **kwargs):
+    return algorithm.generate_recommendations_from_payload(
+        menu_items=_menu(),
+        restaurant_place_id="place-1",
+        restaurant_name="Thai Place",
+        user_favorite_dishes=[],
+        user_dietary_constraints=[],
+        context=RecommendationContext(),
+        limit=3,
+        **kwargs,
+    )
+
+
+def test_local_mode_makes_no_llm_calls():
+    engine = _SlowEngine()
+    algorithm = SmartRecommendationAlgorithm(legacy_engine=engine)
+
+    picks = _generate(algorithm, ranker="local")
+
+    assert len(picks) == 3
+    assert engine.calls == 0
+    assert algorithm.last_served_by == "local"
+
+
+def test_auto_mode_serves_local_ranking_when_agent_misses_budget():
+    algorithm = SmartRecommendationAlgorithm(legacy_engine=_SlowEngine(delay=1.0))
+
+    started = time.monotonic()
+    picks = _generate(algorithm, ranker="auto", latency_budget_s=0.1)
+
+    assert time.monotonic() - started < 0.8
+    assert len(picks) == 3
+    assert algorithm.last_served_by == "local_budget"
+
+
+def test_auto_mode_prefers_agent_picks_within_budget():
+    algorithm = SmartRecommendationAlgorithm(legacy_engine=_SlowEngine())
+    algorithm._compute_taste_embeddings = lambda candidates, profile: {}
+
+    def _fake_agent(enriched, taste_profile, context, restaurant_name, limit):
+        return [ScoredItem(item=e["item"], components={}, score=1.0) for e in enriched[:limit]]
+
+    algorithm._agent_select = _fake_agent
+
+    picks = _generate(algorithm, ranker="auto", latency_budget_s=5)
+
+    assert len(picks) == 3
+    assert algorithm.last_served_by == "agent"
+
+
+class _FakePriorsClient:
+    def __init__(self, rpc_fails=False):
+        self.rpc_fails = rpc_fails
+        self.calls = []
+        self.rows = {"taste_similarity": {"component": "taste_similarity", "alpha": 3.0, "beta": 2.5}}
+
+    def rpc(self, name, params):
+        self.calls.append(("rpc", name, params))
+        if self.rpc_fails:
+            raise RuntimeError("function not found")
+        return self
+
+    def table(self, name):
+        self.calls.append(("table", name))
+        return self
+
+    def select(self, *_):
+        return self
+
+    def eq(self, *_):
+        return self
+
+    def in_(self, _col, components):
+        self._components = components
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.upserted = rows
+        return self
+
+    def execute(self):
+        from types import SimpleNamespace
+
+        return SimpleNamespace(data=[self.rows[c] for c in getattr(self, "_components", []) if c in self.rows])
+
+
+def test_weight_priors_update_is_one_rpc():
+    client = _FakePriorsClient()
+    SmartRecommendationAlgorithm.update_weight_priors(
+        "u1", {"taste_similarity": 0.8, "popularity": 0.2, "craving": 0.5}, "negative", sb=client,
+    )
+
+    assert client.calls == [(
+        "rpc", "increment_weight_priors",
+        {"p_user_id": "u1", "p_deltas": {
+            "taste_similarity": {"alpha": 0.0, "beta": 0.4},
+            "craving": {"alpha": 0.0, "beta": 0.25},
+        }},
+    )]
+
+
+def test_weight_priors_fall_back_to_one_read_and_one_bulk_upsert():
+    client = _FakePriorsClient(rpc_fails=True)
+    SmartRecommendationAlgorithm.update_weight_priors(
+        "u1", {"taste_similarity": 0.8, "craving": 0.5}, "positive", sb=client,
+    )
+
+    assert [c for c in client.calls if c[0] == "table"] == [
+        ("table", "user_weight_priors"), ("table", "user_weight_priors"),
+    ]
+    by_component = {r["component"]: r for r in client.upserted}
+    assert by_component["taste_similarity"]["alpha"] == 3.8
+    assert by_component["taste_similarity"]["beta"] == 2.5
+    assert by_component["craving"]["alpha"] == 2.5
+
+
+def test_auto_mode_serves_local_ranking_when_agent_slots_are_saturated(monkeypatch):
+    import threading
+
+    from app.services import smart_recommendation_algorithm as sra
+
+    monkeypatch.setattr(sra, "_AGENT_SLOTS", threading.BoundedSemaphore(1))
+    sra._AGENT_SLOTS.acquire()
+    engine = _SlowEngine()
+    algorithm = SmartRecommendationAlgorithm(legacy_engine=engine)
+
+    picks = _generate(algorithm, ranker="auto", latency_budget_s=5)
+
+    assert len(picks) == 3
+    assert engine.calls == 0
+    assert algorithm.last_served_by == "local_saturated"
+
+
+def test_timed_out_pipeline_stops_before_next_llm_stage_and_frees_its_slot(monkeypatch):
+    import threading
+
+    from app.services import smart_recommendation_algorithm as sra
+
+    monkeypatch.setattr(sra, "_AGENT_SLOTS", threading.BoundedSemaphore(1))
+    algorithm = SmartRecommendationAlgorithm(legacy_engine=_SlowEngine(delay=0.3))
+    embedded = []
+    algorithm._compute_taste_embeddings = lambda candidates, profile: embedded.append(1) or {}
+
+    _generate(algorithm, ranker="auto", latency_budget_s=0.05)
+    assert algorithm.last_served_by == "local_budget"
+
+    deadline = time.monotonic() + 2
+    while not sra._AGENT_SLOTS.acquire(blocking=False):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert embedded == []
+
+
+def test_local_mode_marks_a_popular_dish_outside_their_taste_as_discovery():
+    algorithm = SmartRecommendationAlgorithm(legacy_engine=_SlowEngine())
+
+    picks = algorithm.generate_recommendations_from_payload(
+        menu_items=_menu(),
+        restaurant_place_id="place-1",
+        restaurant_name="Thai Place",
+        user_favorite_dishes=[{"dish_name": "Pad See Ew"}],
+        user_dietary_constraints=[],
+        context=RecommendationContext(dish_popularity={"Mango Sticky Rice": 0.9}),
+        ranker="local",
+        limit=4,
+    )
+
+    discoveries = [p.item.name for p in picks if p.is_discovery]
+    assert discoveries == ["Mango Sticky Rice"]
+
+
+def test_agent_candidate_limit_is_explicit_and_at_least_one():
+    import pytest
+
+    assert SmartRecommendationAlgorithm(legacy_engine=_SlowEngine(), agent_candidate_limit=1).agent_candidate_limit == 1
+    for bad in (0, -3):
+        with pytest.raises(ValueError):
+            SmartRecommendationAlgorithm(legacy_engine=_SlowEngine(), agent_candidate_limit=bad)
@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services import user_profile_cache
+from app.services.user_profile_cache import (
+    aget_home_base,
+    get_user_profile,
+    invalidate_user_profile,
+    remember_user_profile,
+)
+
+
+class _FakeProfiles:
+    def __init__(self, rows):
+        self.rows = rows
+        self.reads = 0
+
+    def table(self, _name):
+        return self
+
+    def select(self, _columns):
+        return self
+
+    def eq(self, _col, value):
+        self._id = value
+        return self
+
+    def maybe_single(self):
+        return self
+
+    def execute(self):
+        self.reads += 1
+        return SimpleNamespace(data=self.rows.get(self._id))
+
+
+def test_profile_reads_are_cached_until_invalidated():
+    user_profile_cache._profiles.clear()
+    sb = _FakeProfiles({"u1": {"id": "u1", "home_base": "Boston"}})
+
+    assert get_user_profile(sb, "u1")["home_base"] == "Boston"
+    get_user_profile(sb, "u1")["home_base"] = "mutated"  # callers get copies
+    assert get_user_profile(sb, "u1")["home_base"] == "Boston"
+    assert sb.reads == 1
+
+    sb.rows["u1"]["home_base"] = "Austin"
+    invalidate_user_profile("u1")
+    assert get_user_profile(sb, "u1")["home_base"] == "Austin"
+    assert get_user_profile(sb, "u1", fresh=True)["home_base"] == "Austin"
+    assert sb.reads == 3
+
+
+def test_missing_profiles_are_cached_too():
+    user_profile_cache._profiles.clear()
+    sb = _FakeProfiles({})
+
+    assert get_user_profile(sb, "ghost") is None
+    assert get_user_profile(sb, "ghost") is None
+    assert sb.reads == 1
+
+
+def test_async_home_base_uses_written_row_without_a_read():
+    user_profile_cache._profiles.clear()
+    sb = _FakeProfiles({})
+    remember_user_profile({"id": "u2", "home_base": "Seattle"})
+
+    assert asyncio.run(aget_home_base(sb, "u2")) == "Seattle"
+    assert asyncio.run(aget_home_base(sb, "nobody")) is None
+    assert sb.reads == 1